@@ -0,0 +1,60 @@
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from uml_dataset import xml_backend
+from uml_dataset.xmi import parse_document
+from uml_dataset.fingerprint import document_fingerprint
+
+# Checks that the diagram fingerprints follow the inheritance of the classes: every XMI file is
+# fingerprinted as it is and with its generalization elements removed. A file with generalizations
+# must get a different fingerprint without them, on every parser backend. Exits with 1 otherwise.
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def without_generalizations(xmi_content):
+    try:
+        root = xml_backend.ElementTreeBackend().parse(xmi_content)
+    except xml_backend.ET.ParseError:  # Broken fixtures have nothing to compare
+        return xmi_content, 0
+    removed = 0
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if isinstance(child.tag, str) and child.tag.rpartition('}')[2] == 'generalization':
+                parent.remove(child)
+                removed += 1
+    return xml_backend.ET.tostring(root), removed
+
+def check_file(filepath, backend):
+    with open(filepath, 'rb') as file:
+        content = file.read()
+    stripped_content, removed = without_generalizations(content)
+    if not removed:
+        return True
+    fingerprint, _ = document_fingerprint(parse_document(content, backend), backend)
+    stripped_fingerprint, _ = document_fingerprint(parse_document(stripped_content, backend), backend)
+    print(f"{filepath} ({backend.name}): {removed} generalizations - fingerprint {fingerprint}, without them {stripped_fingerprint}")
+    return fingerprint != stripped_fingerprint
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that diagrams differing only in inheritance get different fingerprints.")
+    parser.add_argument("folders", type=str, nargs="*", default=[FIXTURES_FOLDER], help="Folders with XMI/UML files, defaults to the bundled fixtures")
+    args = parser.parse_args()
+
+    backends = [xml_backend.get_backend(name) for name in xml_backend.available_backends()]
+    failures = []
+    for folder in args.folders:
+        files = sorted(os.path.join(dirpath, filename) for dirpath, _, filenames in os.walk(folder)
+                       for filename in filenames if filename.endswith((".xmi", ".uml")))
+        for filepath in files:
+            for backend in backends:
+                if not check_file(filepath, backend):
+                    failures.append(f"{filepath} ({backend.name})")
+    for failure in failures:
+        print(f"  Same fingerprint without the generalizations: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import os
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+BENCHMARKS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_FOLDER = os.path.dirname(BENCHMARKS_FOLDER)
+
+from synthetic_corpus import PROFILES, build_profile, generate_diagram
+
+# Local stand-in for the services the downloaders talk to, so they can be load tested offline:
+#
+#   /api/projects/public?limit=&page=     GenMyModel public project listing (paginated JSON)
+#   /api/projects/<id>/custom-xmi         GenMyModel XMI export
+#   /raw/<user>/<repository>/<branch>/... raw.githubusercontent.com files (Lindholmen and ModelSet links)
+#   /__stats                              request counters of the server
+#
+# Latency, server errors, 429 rate limiting and truncated bodies are injected per request.
+# Whether a request fails depends only on the seed, the path and the attempt number, so a
+# run is reproducible regardless of the order in which concurrent requests arrive.
+#
+# "bench" starts the server and runs the real download scripts against it:
+#   GENMYMODEL_API_URL redirects data/genmymodel/scripts/1_crawlAllDiagrams.py,
+#   GITHUB_RAW_URL redirects data/lindholmendb/scripts/1_downloadUmlAndXmiFiles.py,
+#   the modelsdb spreadsheet is generated with links to the server.
+
+DOWNLOAD_SCRIPTS = {
+    "genmymodel": os.path.join(REPOSITORY_FOLDER, "data", "genmymodel", "scripts", "1_crawlAllDiagrams.py"),
+    "modelsdb": os.path.join(REPOSITORY_FOLDER, "data", "modelsdb", "scripts", "1_downloadUmlAndXmiFiles.py"),
+    "lindholmendb": os.path.join(REPOSITORY_FOLDER, "data", "lindholmendb", "scripts", "1_downloadUmlAndXmiFiles.py"),
+}
+DEFAULT_CONFIG = {
+    "projects": 1000,
+    "seed": 0,
+    "scale": 1.0,
+    "raw_profile": "lindholmendb",
+    "latency_ms": 0.0,
+    "latency_jitter_ms": 0.0,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "retry_after": 1,
+    "truncate_rate": 0.0,
+}
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # The downloaders open up to 20 connections at once
+
+    def __init__(self, address, config):
+        super().__init__(address, MockRequestHandler)
+        self.config = config
+        self.profiles = {name: build_profile(name) for name in PROFILES}
+        self.bodies = {}
+        self.attempts = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "connections": 0, "in_flight": 0, "peak_in_flight": 0, "bytes_sent": 0,
+                      "status": {}, "truncated": 0}
+
+    def next_attempt(self, path):
+        with self.lock:
+            attempt = self.attempts.get(path, 0)
+            self.attempts[path] = attempt + 1
+            return attempt
+
+    def draw_fault(self, path):
+        """Returns None, "error", "rate_limit" or "truncate" for this attempt of the path."""
+        value = random.Random(f"{self.config['seed']}-{path}-{self.next_attempt(path)}").random()
+        for fault in ("error", "rate_limit", "truncate"):
+            value -= self.config[f"{fault}_rate"]
+            if value < 0:
+                return fault
+        return None
+
+    def body(self, key, profile_name):
+        # Bodies are generated from the key, a repeated request gets the same diagram
+        content = self.bodies.get(key)
+        if content is None:
+            rng = random.Random(f"{self.config['seed']}-{key}")
+            content = generate_diagram(rng, self.profiles[profile_name], self.config["scale"])[1].encode('utf-8')
+            self.bodies[key] = content
+        return content
+
+    def count(self, **increments):
+        with self.lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse of the clients shows in the stats
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        self.server.count(connections=1)
+        super().handle()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/__stats":
+            with self.server.lock:
+                self.send_body(200, json.dumps(self.server.stats).encode('utf-8'), "application/json", count=False)
+            return
+
+        self.server.count(requests=1, in_flight=1)
+        try:
+            config = self.server.config
+            latency = config["latency_ms"] + random.uniform(-1, 1) * config["latency_jitter_ms"]
+            if latency > 0:
+                time.sleep(latency / 1000)
+
+            fault = self.server.draw_fault(url.path + "?" + url.query)
+            if fault == "error":
+                self.send_body(500, b"Internal Server Error")
+            elif fault == "rate_limit":
+                self.send_body(429, b"Too Many Requests", headers={"Retry-After": str(config["retry_after"])})
+            else:
+                self.route(url, truncate=fault == "truncate")
+        finally:
+            self.server.count(in_flight=-1)
+
+    def route(self, url, truncate):
+        parts = url.path.strip("/").split("/")
+        if url.path == "/api/projects/public":
+            self.send_body(200, self.project_listing(parse_qs(url.query)), "application/json", truncate=truncate)
+        elif len(parts) == 4 and parts[:2] == ["api", "projects"] and parts[3] == "custom-xmi":
+            self.send_body(200, self.server.body(parts[2], "genmymodel"), "application/xml", truncate=truncate)
+        elif len(parts) >= 5 and parts[0] == "raw":
+            self.send_body(200, self.server.body(url.path, self.server.config["raw_profile"]), "text/plain", truncate=truncate)
+        else:
+            self.send_body(404, b"Not Found")
+
+    def project_listing(self, query):
+        limit = int(query.get("limit", ["12"])[0])
+        page = int(query.get("page", ["0"])[0])
+        total = self.server.config["projects"]
+        base_url = f"http://{self.headers.get('Host')}/api/projects"
+        elements = [{"links": [{"rel": "self", "href": f"{base_url}/_mock{index:08d}"}]}
+                    for index in range(page * limit, min(total, (page + 1) * limit))]
+        return json.dumps({
+            "links": [{"rel": "next", "href": f"?limit={limit}&page={page + 1}"}],
+            "elements": elements,
+            "totalPages": (total + limit - 1) // limit,
+            "pageNumber": page,
+            "rowsPerPage": 0,
+            "totalElements": total,
+        }).encode('utf-8')
+
+    def send_body(self, status, body, content_type="text/plain", headers=None, truncate=False, count=True):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if truncate:
+            # The announced length is not delivered and the connection is dropped, like an aborted transfer
+            body = body[:len(body) // 2]
+            self.close_connection = True
+        self.wfile.write(body)
+        if count:
+            with self.server.lock:
+                self.server.stats["status"][str(status)] = self.server.stats["status"].get(str(status), 0) + 1
+                self.server.stats["bytes_sent"] += len(body)
+                self.server.stats["truncated"] += truncate
+
+def serve(config, port=0, ready=None):
+    server = MockServer(("127.0.0.1", port), config)
+    if ready is not None:
+        ready.send(server.server_address[1])
+    else:
+        print(f"Serving on http://127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
+
+def start_server_process(config):
+    """Starts the server in its own process so it does not compete with the client for the GIL, returns (process, base_url)."""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=serve, args=(config, 0, sender), daemon=True)
+    process.start()
+    port = receiver.recv()
+    return process, f"http://127.0.0.1:{port}"
+
+def fetch_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/__stats") as response:
+        return json.load(response)
+
+def write_lindholmen_csv(path, files):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Model Link - Github"])
+        for index in range(files):
+            writer.writerow([f"https://github.com/mock/repository{index % 50}/tree/master/models/diagram_{index}.uml"])
+
+def write_modelsdb_summary(path, base_url, files):
+    import pandas as pd
+
+    # Same layout as the Summary-*.xlsx files: one sheet per file type, the URL in the first column, no header
+    with pd.ExcelWriter(path) as writer:
+        for sheet_name, extension in (("xmi", ".xmi"), ("uml", ".uml")):
+            urls = [f"{base_url}/raw/mock/repository{index % 50}/master/models/{sheet_name}_diagram_{index}{extension}"
+                    for index in range(files) if (index % 2 == 0) == (sheet_name == "xmi")]
+            pd.DataFrame(urls).to_excel(writer, sheet_name=sheet_name, header=False, index=False)
+
+def folder_size(path_to_folder):
+    files = 0
+    total_bytes = 0
+    for dirpath, dirnames, filenames in os.walk(path_to_folder):
+        files += len(filenames)
+        total_bytes += sum(os.path.getsize(os.path.join(dirpath, filename)) for filename in filenames)
+    return files, total_bytes
+
+def run_benchmark(source_name, files, config, verbose=False):
+    """Runs the download script of a source against a fresh mock server, returns its measurement."""
+    config = dict(config, projects=files, raw_profile=source_name if source_name != "genmymodel" else config["raw_profile"])
+    process, base_url = start_server_process(config)
+    try:
+        with tempfile.TemporaryDirectory() as work_folder:
+            output_folder = os.path.join(work_folder, "1_UML-Diagrams")
+            environment = dict(os.environ)
+            script = DOWNLOAD_SCRIPTS[source_name]
+            if source_name == "genmymodel":
+                environment["GENMYMODEL_API_URL"] = f"{base_url}/api"
+                command = [sys.executable, script, "0", "--output_folder", output_folder]
+            elif source_name == "lindholmendb":
+                environment["GITHUB_RAW_URL"] = f"{base_url}/raw"
+                csv_file_path = os.path.join(work_folder, "lindholmen.csv")
+                write_lindholmen_csv(csv_file_path, files)
+                command = [sys.executable, script, csv_file_path, output_folder]
+            else:
+                input_path = os.path.join(work_folder, "input")
+                os.makedirs(input_path)
+                write_modelsdb_summary(os.path.join(input_path, "Summary-mock.xlsx"), base_url, files)
+                command = [sys.executable, script, input_path, output_folder]
+
+            # The scripts write failed_downloads.txt into the working directory
+            start_time = time.perf_counter()
+            completed = subprocess.run(command, env=environment, cwd=work_folder,
+                                       stdout=None if verbose else subprocess.DEVNULL, stderr=None if verbose else subprocess.DEVNULL)
+            elapsed_time = time.perf_counter() - start_time
+            downloaded_files, downloaded_bytes = folder_size(output_folder)
+        stats = fetch_stats(base_url)
+    finally:
+        process.terminate()
+        process.join()
+
+    return {
+        "exit_code": completed.returncode,
+        "files": files,
+        "downloaded_files": downloaded_files,
+        "megabytes": downloaded_bytes / 1024 / 1024,
+        "seconds": elapsed_time,
+        "files_per_second": downloaded_files / elapsed_time if elapsed_time > 0 else None,
+        "megabytes_per_second": downloaded_bytes / 1024 / 1024 / elapsed_time if elapsed_time > 0 else None,
+        "server": stats,
+    }
+
+def format_measurement(source_name, measurement):
+    server = measurement["server"]
+    requests_per_connection = server["requests"] / server["connections"] if server["connections"] else 0
+    line = (f"{source_name:<13} {measurement['downloaded_files']:>6}/{measurement['files']} files {measurement['megabytes']:>8.2f} MB "
+            f"{measurement['seconds']:>8.2f} s {measurement['files_per_second'] or 0:>8.1f} files/s {measurement['megabytes_per_second'] or 0:>6.2f} MB/s - "
+            f"requests: {server['requests']} {server['status']} truncated: {server['truncated']} - "
+            f"connections: {server['connections']} ({requests_per_connection:.1f} requests each) - peak concurrency: {server['peak_in_flight']}")
+    if measurement["exit_code"] != 0:
+        line += f" - script exited with {measurement['exit_code']}"
+    return line
+
+def add_fault_arguments(parser):
+    parser.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"], help="Seed of the diagram bodies and of the injected faults")
+    parser.add_argument("--scale", type=float, default=DEFAULT_CONFIG["scale"], help="Multiplier for the element counts of the served diagrams")
+    parser.add_argument("--latency_ms", type=float, default=DEFAULT_CONFIG["latency_ms"], help="Delay added to every response")
+    parser.add_argument("--latency_jitter_ms", type=float, default=DEFAULT_CONFIG["latency_jitter_ms"], help="Random +/- variation of the delay")
+    parser.add_argument("--error_rate", type=float, default=DEFAULT_CONFIG["error_rate"], help="Share of requests answered with 500")
+    parser.add_argument("--rate_limit_rate", type=float, default=DEFAULT_CONFIG["rate_limit_rate"], help="Share of requests answered with 429")
+    parser.add_argument("--retry_after", type=int, default=DEFAULT_CONFIG["retry_after"], help="Retry-After seconds sent with 429")
+    parser.add_argument("--truncate_rate", type=float, default=DEFAULT_CONFIG["truncate_rate"], help="Share of responses cut off after half of the body")
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the GenMyModel API and GitHub raw files for offline downloader load tests.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the mock server until interrupted.")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on, 0 picks a free one")
+    serve_parser.add_argument("--projects", type=int, default=DEFAULT_CONFIG["projects"], help="Number of projects in the GenMyModel listing")
+    serve_parser.add_argument("--raw_profile", type=str, choices=sorted(PROFILES), default=DEFAULT_CONFIG["raw_profile"], help="Corpus format of the /raw files")
+    add_fault_arguments(serve_parser)
+
+    bench_parser = commands.add_parser("bench", help="Run the download scripts against the mock server and report their throughput.")
+    bench_parser.add_argument("--sources", type=str, nargs="+", choices=sorted(DOWNLOAD_SCRIPTS), default=sorted(DOWNLOAD_SCRIPTS), help="Download scripts to run")
+    bench_parser.add_argument("--files", type=int, default=500, help="Diagrams offered to each script")
+    bench_parser.add_argument("--verbose", action="store_true", help="Show the output of the download scripts")
+    add_fault_arguments(bench_parser)
+
+    args = parser.parse_args()
+    config = dict(DEFAULT_CONFIG, **{key: getattr(args, key) for key in DEFAULT_CONFIG if hasattr(args, key)})
+
+    if args.command == "serve":
+        try:
+            serve(config, args.port)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    for source_name in args.sources:
+        print(format_measurement(source_name, run_benchmark(source_name, args.files, config, args.verbose)))
+
+if __name__ == "__main__":
+    main()
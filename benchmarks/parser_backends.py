@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from uml_dataset.xml_backend import get_backend, available_backends
+from uml_dataset.xmi import is_uml_class_diagram, extract_class_details
+
+# Compares the XML parser backends on a folder of XMI/UML files:
+# verdict and extracted classes must be identical, the timings show the per-file speedup.
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def run_backend(backend, content, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        verdict = is_uml_class_diagram(content, backend)
+        class_details = extract_class_details(content, backend) if verdict else {}
+    return verdict, class_details, (time.perf_counter() - start_time) / repeat
+
+def compare_backends(path_to_folder, repeat=1, reference_name="etree", candidate_name="lxml"):
+    reference = get_backend(reference_name)
+    candidate = get_backend(candidate_name)
+
+    mismatches = []
+    total_time = {reference.name: 0.0, candidate.name: 0.0}
+    total_bytes = 0
+    files = sorted(os.path.join(dirpath, filename) for dirpath, _, filenames in os.walk(path_to_folder)
+                   for filename in filenames if filename.endswith((".xmi", ".uml")))
+
+    for filepath in files:
+        with open(filepath, 'rb') as file:
+            content = file.read()  # Same byte input as the filter stage
+        total_bytes += len(content)
+
+        reference_verdict, reference_classes, reference_time = run_backend(reference, content, repeat)
+        candidate_verdict, candidate_classes, candidate_time = run_backend(candidate, content, repeat)
+        total_time[reference.name] += reference_time
+        total_time[candidate.name] += candidate_time
+
+        same = reference_verdict == candidate_verdict and reference_classes == candidate_classes
+        if not same:
+            mismatches.append(filepath)
+        speedup = reference_time / candidate_time if candidate_time > 0 else float("inf")
+        print(f"{'OK      ' if same else 'MISMATCH'} {os.path.relpath(filepath, path_to_folder)} - class diagram: {reference_verdict} - {reference.name}: {reference_time * 1000:.2f} ms - {candidate.name}: {candidate_time * 1000:.2f} ms - speedup: {speedup:.2f}x")
+
+    if files:
+        speedup = total_time[reference.name] / total_time[candidate.name] if total_time[candidate.name] > 0 else float("inf")
+        print(f"{len(files)} files, {total_bytes / 1024 / 1024:.2f} MB - {reference.name}: {total_time[reference.name]:.3f} s - {candidate.name}: {total_time[candidate.name]:.3f} s - speedup: {speedup:.2f}x")
+    print(f"Mismatches: {len(mismatches)}")
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the XML parser backends agree and measure their speed.")
+    parser.add_argument("path_to_folder", type=str, nargs="?", default=FIXTURES_FOLDER, help="Folder with XMI/UML files, defaults to the bundled fixtures")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per file and backend, the mean is reported")
+    args = parser.parse_args()
+
+    if "lxml" not in available_backends():
+        print("lxml is not installed, nothing to compare")
+        sys.exit(1)
+
+    mismatches = compare_backends(args.path_to_folder, args.repeat)
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
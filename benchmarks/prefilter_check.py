@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from uml_dataset import prefilter
+from uml_dataset.xmi import is_uml_class_diagram
+
+# Checks the byte prefilter against the full parse on XMI/UML folders: reports how many files it
+# rejects, how many of the remaining candidates are class diagrams and every false negative
+# (a class diagram the prefilter would have rejected). Exits with 1 if there is any.
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def check_folder(path_to_folder):
+    files = sorted(os.path.join(dirpath, filename) for dirpath, _, filenames in os.walk(path_to_folder)
+                   for filename in filenames if filename.endswith((".xmi", ".uml")))
+
+    rejected = 0
+    class_diagrams = 0
+    candidate_class_diagrams = 0
+    false_negatives = []
+    prefilter_time = 0.0
+    rejected_parse_time = 0.0
+    for filepath in files:
+        start_time = time.perf_counter()
+        is_candidate = prefilter.file_may_contain_class(filepath)
+        prefilter_time += time.perf_counter() - start_time
+
+        with open(filepath, 'rb') as file:
+            content = file.read()  # Same byte input as the filter stage
+        prefilter.enabled = False
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # Parse errors of broken files are expected
+            start_time = time.perf_counter()
+            is_class_diagram = is_uml_class_diagram(content)
+            parse_time = time.perf_counter() - start_time
+        prefilter.enabled = True
+
+        class_diagrams += is_class_diagram
+        if is_candidate:
+            candidate_class_diagrams += is_class_diagram
+        else:
+            rejected += 1
+            rejected_parse_time += parse_time
+            if is_class_diagram:
+                false_negatives.append(filepath)
+
+    candidates = len(files) - rejected
+    print(f"{path_to_folder}: {len(files)} files - class diagrams: {class_diagrams} - rejected by the prefilter: {rejected} "
+          f"({rejected / len(files) if files else 0:.1%}) - hit rate: {candidate_class_diagrams}/{candidates} candidates "
+          f"({candidate_class_diagrams / candidates if candidates else 0:.1%}) - prefilter: {prefilter_time * 1000:.1f} ms, "
+          f"parsing the rejected files: {rejected_parse_time * 1000:.1f} ms - false negatives: {len(false_negatives)}")
+    for filepath in false_negatives:
+        print(f"  False negative: {filepath}")
+    return false_negatives
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the byte prefilter never rejects a class diagram.")
+    parser.add_argument("folders", type=str, nargs="*", default=[FIXTURES_FOLDER], help="Folders with XMI/UML files, defaults to the bundled fixtures")
+    args = parser.parse_args()
+
+    false_negatives = []
+    for folder in args.folders:
+        false_negatives += check_folder(folder)
+    sys.exit(1 if false_negatives else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import platform
+import tempfile
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, peak RSS is then not reported
+    resource = None
+
+BENCHMARKS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_FOLDER = os.path.dirname(BENCHMARKS_FOLDER)
+sys.path.insert(0, REPOSITORY_FOLDER)
+sys.path.insert(0, os.path.join(REPOSITORY_FOLDER, "zipScripts"))
+
+from synthetic_corpus import PROFILES, generate_corpus
+from uml_dataset import filter as filter_stage
+from uml_dataset import extract as extract_stage
+from uml_dataset.sources import get_source
+from uml_dataset.xmi import is_uml_class_diagram, extract_class_details, set_default_backend
+from uml_dataset.xml_backend import get_backend
+from splitZip import split_file
+
+# Runs every processing stage on synthetic corpora and reports files/s, MB/s and peak RSS.
+# Each stage runs in a fresh process so the peak RSS belongs to that stage alone.
+# Results can be stored as a baseline (benchmarks/baselines/<name>.json) and compared against later.
+
+BASELINES_FOLDER = os.path.join(BENCHMARKS_FOLDER, "baselines")
+STAGES = ["detect", "extract_classes", "filter", "extract", "split"]
+SPLIT_PART_SIZE = 256 * 1024
+
+def read_corpus(path_to_folder):
+    for filename in sorted(os.listdir(path_to_folder)):
+        with open(os.path.join(path_to_folder, filename), 'rb') as file:
+            yield file.read()
+
+def folder_size(path_to_folder):
+    files = [os.path.join(path_to_folder, filename) for filename in os.listdir(path_to_folder)]
+    return len(files), sum(os.path.getsize(filepath) for filepath in files)
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KiB on Linux
+
+def run_stage(stage, source_name, corpus_folder, work_folder, xml_backend, repeat=3):
+    """Runs one stage in the current (fresh) process, returns its measurement."""
+    set_default_backend(xml_backend)
+    source = get_source(source_name)
+    files, total_bytes = folder_size(corpus_folder)
+
+    # Inputs that are not part of the measured stage are prepared before the timer starts
+    filtered_folder = os.path.join(work_folder, "filtered")
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if stage == "extract":
+            filter_stage.process_folder(corpus_folder, filtered_folder, source.EXTENSIONS)
+            files, total_bytes = folder_size(filtered_folder)
+        if stage == "extract_classes":
+            contents = [content for content in read_corpus(corpus_folder) if is_uml_class_diagram(content)]
+            files, total_bytes = len(contents), sum(len(content) for content in contents)
+    archive_path = os.path.join(work_folder, "corpus.zip")
+    if stage == "split":
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_STORED) as archive:
+            for filename in sorted(os.listdir(corpus_folder)):
+                archive.write(os.path.join(corpus_folder, filename), filename)
+        total_bytes = os.path.getsize(archive_path)
+
+    # The stages print a progress line per file, like in a real run; that output is discarded.
+    # The fastest of the repeats is reported, the first run also pays for the cold page cache.
+    elapsed_time = None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            if stage == "detect":
+                for content in read_corpus(corpus_folder):
+                    is_uml_class_diagram(content)
+            elif stage == "extract_classes":
+                for content in contents:
+                    extract_class_details(content)
+            elif stage == "filter":
+                filter_stage.process_folder(corpus_folder, os.path.join(work_folder, "filter_output"), source.EXTENSIONS)
+            elif stage == "extract":
+                extract_stage.process_folder(filtered_folder, os.path.join(work_folder, "extract_output"), source.EXTENSIONS)
+            elif stage == "split":
+                split_file(archive_path, os.path.join(work_folder, "split_output"), SPLIT_PART_SIZE)
+            run_time = time.perf_counter() - start_time
+            elapsed_time = run_time if elapsed_time is None else min(elapsed_time, run_time)
+
+    return {
+        "files": files,
+        "megabytes": total_bytes / 1024 / 1024,
+        "seconds": elapsed_time,
+        "files_per_second": files / elapsed_time if elapsed_time > 0 else None,
+        "megabytes_per_second": total_bytes / 1024 / 1024 / elapsed_time if elapsed_time > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def run_benchmarks(sources, stages, files, seed, scale, xml_backend, repeat=3, corpus_root=None):
+    """Generates a corpus per source and measures every stage on it, returns {source: {stage: measurement}}."""
+    results = {}
+    with tempfile.TemporaryDirectory() as temporary_folder:
+        corpus_root = corpus_root or os.path.join(temporary_folder, "corpora")
+        for source_name in sources:
+            corpus_folder = os.path.join(corpus_root, f"{source_name}_{files}_{seed}_{scale}")
+            if not os.path.exists(corpus_folder):
+                generate_corpus(corpus_folder, source_name, files, seed, scale)
+
+            results[source_name] = {}
+            for stage in stages:
+                work_folder = os.path.join(temporary_folder, "work", source_name, stage)
+                os.makedirs(work_folder)
+                # A spawned process starts without the memory of the previous stages
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    measurement = executor.submit(run_stage, stage, source_name, corpus_folder, work_folder, xml_backend, repeat).result()
+                shutil.rmtree(work_folder)
+                results[source_name][stage] = measurement
+                print(format_measurement(source_name, stage, measurement))
+    return results
+
+def format_measurement(source_name, stage, measurement, baseline=None):
+    line = (f"{source_name:<13} {stage:<16} {measurement['files']:>6} files {measurement['megabytes']:>8.2f} MB "
+            f"{measurement['seconds']:>8.3f} s {measurement['files_per_second'] or 0:>10.1f} files/s "
+            f"{measurement['megabytes_per_second'] or 0:>8.2f} MB/s")
+    if measurement["peak_rss_mb"] is not None:
+        line += f" {measurement['peak_rss_mb']:>8.1f} MB peak RSS"
+    if baseline:
+        line += f" - {relative_change(baseline['files_per_second'], measurement['files_per_second']):+.1%} files/s vs. baseline"
+    return line
+
+def relative_change(before, after):
+    if not before or after is None:
+        return 0.0
+    return after / before - 1
+
+def find_regressions(results, baseline, tolerance):
+    """Returns the (source, stage, change) whose throughput dropped by more than tolerance."""
+    regressions = []
+    for source_name, stages in results.items():
+        for stage, measurement in stages.items():
+            reference = baseline["results"].get(source_name, {}).get(stage)
+            if reference is None:
+                continue
+            change = relative_change(reference["files_per_second"], measurement["files_per_second"])
+            if change < -tolerance:
+                regressions.append((source_name, stage, change))
+    return regressions
+
+def baseline_path(name):
+    return os.path.join(BASELINES_FOLDER, f"{name}.json")
+
+def corpus_parameters(args):
+    """The parameters a measurement depends on besides the machine, they have to match to compare throughput."""
+    return {"files": args.files, "seed": args.seed, "scale": args.scale, "repeat": args.repeat,
+            "xml_backend": get_backend(args.xml_backend).name}
+
+def parameter_mismatches(baseline, parameters):
+    return [f"{key}={baseline.get(key)} (this run: {value})" for key, value in parameters.items() if baseline.get(key) != value]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the processing stages on synthetic corpora.")
+    parser.add_argument("--sources", type=str, nargs="+", choices=sorted(PROFILES), default=sorted(PROFILES), help="Corpus formats to benchmark")
+    parser.add_argument("--stages", type=str, nargs="+", choices=STAGES, default=STAGES, help="Stages to benchmark")
+    parser.add_argument("--files", type=int, default=1000, help="Diagrams per synthetic corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed, keep it fixed when comparing against a baseline")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the element counts of the corpus")
+    parser.add_argument("--xml_backend", type=str, choices=["auto", "lxml", "etree"], default="auto", help="XML parser used by the stages")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, the fastest one is reported")
+    parser.add_argument("--corpus_folder", type=str, default=None, help="Keep the generated corpora here and reuse them on later runs")
+    parser.add_argument("--save_baseline", type=str, default=None, metavar="NAME", help="Store the results as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", type=str, default=None, metavar="NAME", help="Compare against benchmarks/baselines/NAME.json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop against the baseline before the run fails")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(baseline_path(args.compare), 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        # Throughput of another corpus or backend says nothing about a regression
+        mismatches = parameter_mismatches(baseline, corpus_parameters(args))
+        if mismatches:
+            parser.error(f"baseline '{args.compare}' was measured with {', '.join(mismatches)}, "
+                         f"run with the same parameters or save a new baseline")
+
+    results = run_benchmarks(args.sources, args.stages, args.files, args.seed, args.scale, args.xml_backend, args.repeat, args.corpus_folder)
+
+    if args.save_baseline:
+        os.makedirs(BASELINES_FOLDER, exist_ok=True)
+        with open(baseline_path(args.save_baseline), 'w', encoding='utf-8') as f:
+            json.dump({
+                **corpus_parameters(args),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved baseline {baseline_path(args.save_baseline)}")
+
+    if baseline:
+        print(f"Compared with baseline '{args.compare}':")
+        for source_name, stages in results.items():
+            for stage, measurement in stages.items():
+                print(format_measurement(source_name, stage, measurement, baseline["results"].get(source_name, {}).get(stage)))
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for source_name, stage, change in regressions:
+            print(f"Regression: {source_name} {stage} {change:+.1%} files/s")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import os
+import random
+import argparse
+
+# Generates synthetic UML XMI corpora shaped like the downloaded sources, so the processing
+# stages can be benchmarked without the real multi-GB datasets. Every count is drawn from a
+# log-normal distribution (median, sigma) and the output is reproducible for a given seed.
+
+XMI_NAMESPACE = "http://schema.omg.org/spec/XMI/2.1"
+UML_NAMESPACE = "http://www.eclipse.org/uml2/5.0.0/UML"
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+PROFILES = {
+    # GenMyModel custom-xmi exports: xmi:XMI root, xsi:type, flat models, short documentation
+    "genmymodel": {
+        "extensions": [(".xmi", 1.0)],
+        "root": "xmi",
+        "type_attribute": "xsi",
+        "class_diagram_ratio": 0.7,
+        "malformed_ratio": 0.0,
+        "classes": (6, 0.8),
+        "attributes": (3, 0.7),
+        "operations": (1, 0.9),
+        "parameters": (1, 0.8),
+        "generalization_ratio": 0.2,
+        "package_depth": 1,
+        "nested_classifier_ratio": 0.0,
+        "documentation": (40, 1.0),
+    },
+    # ModelSet (modelsdb) files: mixed .xmi/.uml, xmi:type, nested packages, larger models and a few broken files
+    "modelsdb": {
+        "extensions": [(".xmi", 0.6), (".uml", 0.4)],
+        "root": "mixed",
+        "type_attribute": "xmi",
+        "class_diagram_ratio": 0.45,
+        "malformed_ratio": 0.02,
+        "classes": (12, 1.0),
+        "attributes": (3, 0.9),
+        "operations": (2, 1.0),
+        "parameters": (1, 0.9),
+        "generalization_ratio": 0.3,
+        "package_depth": 3,
+        "nested_classifier_ratio": 0.05,
+        "documentation": (120, 1.2),
+    },
+    # Lindholmen GitHub files: mostly Eclipse .uml models with a uml:Model root and xmi:type
+    "lindholmendb": {
+        "extensions": [(".uml", 0.8), (".xmi", 0.2)],
+        "root": "model",
+        "type_attribute": "xmi",
+        "class_diagram_ratio": 0.5,
+        "malformed_ratio": 0.01,
+        "classes": (9, 1.1),
+        "attributes": (2, 1.0),
+        "operations": (2, 1.0),
+        "parameters": (1, 1.0),
+        "generalization_ratio": 0.25,
+        "package_depth": 2,
+        "nested_classifier_ratio": 0.1,
+        "documentation": (60, 1.3),
+    },
+}
+
+NON_CLASS_TYPES = ["uml:StateMachine", "uml:Activity", "uml:UseCase", "uml:Actor", "uml:Interaction"]
+VISIBILITIES = [None, "public", "private", "protected"]
+WORDS = ["customer", "order", "street", "city", "zip", "name", "id", "date", "amount", "price", "account",
+         "owner", "start", "end", "title", "isbn", "year", "member", "item", "quantity", "status", "email",
+         "phone", "country", "currency", "balance", "user", "group", "role", "session", "token", "path"]
+MAX_COUNT = 500
+
+def draw(rng, distribution, scale=1.0):
+    """Draws a count from a (median, sigma) log-normal distribution."""
+    median, sigma = distribution
+    if median <= 0:
+        return 0
+    return min(MAX_COUNT, int(round(median * scale * rng.lognormvariate(0, sigma))))
+
+def identifier(rng, words=2):
+    parts = rng.sample(WORDS, words)
+    return parts[0] + "".join(part.capitalize() for part in parts[1:])
+
+class DiagramWriter:
+    def __init__(self, rng, profile, scale):
+        self.rng = rng
+        self.profile = profile
+        self.scale = scale
+        self.next_id = 0
+        self.parts = []
+
+    def new_id(self):
+        self.next_id += 1
+        return f"_id{self.next_id}"
+
+    def type_attribute(self, uml_type):
+        prefix = self.profile["type_attribute"]
+        return f'{prefix}:type="{uml_type}"'
+
+    def visibility(self):
+        visibility = self.rng.choice(VISIBILITIES)
+        return f' visibility="{visibility}"' if visibility else ""
+
+    def documentation(self, indent):
+        length = draw(self.rng, self.profile["documentation"], self.scale)
+        if length:
+            text = " ".join(self.rng.choice(WORDS) for _ in range(max(1, length // 6)))
+            self.parts.append(f'{indent}<ownedComment xmi:id="{self.new_id()}" body="{text}"/>\n')
+
+    def write_class(self, indent, class_ids, element="packagedElement"):
+        rng = self.rng
+        class_id = self.new_id()
+        name = identifier(rng).capitalize()
+        self.parts.append(f'{indent}<{element} {self.type_attribute("uml:Class")} xmi:id="{class_id}" name="{name}"{self.visibility()}>\n')
+        inner = indent + "  "
+        self.documentation(inner)
+        if class_ids and rng.random() < self.profile["generalization_ratio"]:
+            self.parts.append(f'{inner}<generalization xmi:id="{self.new_id()}" general="{rng.choice(class_ids)}"/>\n')
+        for _ in range(draw(rng, self.profile["attributes"], self.scale)):
+            self.parts.append(f'{inner}<ownedAttribute xmi:id="{self.new_id()}" name="{identifier(rng, 1)}"{self.visibility()}/>\n')
+        for _ in range(draw(rng, self.profile["operations"], self.scale)):
+            self.parts.append(f'{inner}<ownedOperation xmi:id="{self.new_id()}" name="{identifier(rng)}"{self.visibility()}>\n')
+            for _ in range(draw(rng, self.profile["parameters"], self.scale)):
+                self.parts.append(f'{inner}  <ownedParameter xmi:id="{self.new_id()}" name="{identifier(rng, 1)}"/>\n')
+            if rng.random() < 0.5:
+                self.parts.append(f'{inner}  <ownedParameter xmi:id="{self.new_id()}" name="result" direction="return"/>\n')
+            self.parts.append(f'{inner}</ownedOperation>\n')
+        if rng.random() < self.profile["nested_classifier_ratio"]:
+            self.write_class(inner, class_ids, element="nestedClassifier")
+        self.parts.append(f'{indent}</{element}>\n')
+        class_ids.append(class_id)
+
+    def write_non_class(self, indent):
+        uml_type = self.rng.choice(NON_CLASS_TYPES)
+        self.parts.append(f'{indent}<packagedElement {self.type_attribute(uml_type)} xmi:id="{self.new_id()}" name="{identifier(self.rng)}">\n')
+        self.documentation(indent + "  ")
+        self.parts.append(f'{indent}</packagedElement>\n')
+
+    def write_elements(self, indent, is_class_diagram):
+        rng = self.rng
+        depth = rng.randint(0, self.profile["package_depth"])
+        for level in range(depth):
+            self.parts.append(f'{indent}<packagedElement {self.type_attribute("uml:Package")} xmi:id="{self.new_id()}" name="{identifier(rng, 1)}">\n')
+            indent += "  "
+        class_ids = []
+        for _ in range(max(1, draw(rng, self.profile["classes"], self.scale))):
+            if is_class_diagram:
+                self.write_class(indent, class_ids)
+            else:
+                self.write_non_class(indent)
+        for level in range(depth):
+            indent = indent[:-2]
+            self.parts.append(f'{indent}</packagedElement>\n')
+
+    def render(self, is_class_diagram):
+        root = self.profile["root"]
+        if root == "mixed":
+            root = self.rng.choice(["xmi", "model"])
+        namespaces = f'xmlns:xmi="{XMI_NAMESPACE}" xmlns:xsi="{XSI_NAMESPACE}" xmlns:uml="{UML_NAMESPACE}"'
+        self.parts.append('<?xml version="1.0" encoding="UTF-8"?>\n')
+        if root == "xmi":
+            self.parts.append(f'<xmi:XMI xmi:version="2.1" {namespaces}>\n')
+            self.parts.append(f'  <uml:Model xmi:id="{self.new_id()}" name="{identifier(self.rng, 1)}">\n')
+            self.write_elements("    ", is_class_diagram)
+            self.parts.append('  </uml:Model>\n</xmi:XMI>\n')
+        else:
+            self.parts.append(f'<uml:Model xmi:version="2.1" {namespaces} xmi:id="{self.new_id()}" name="{identifier(self.rng, 1)}">\n')
+            self.write_elements("  ", is_class_diagram)
+            self.parts.append('</uml:Model>\n')
+        return "".join(self.parts)
+
+def choose_extension(rng, extensions):
+    value = rng.random()
+    for extension, weight in extensions:
+        value -= weight
+        if value < 0:
+            return extension
+    return extensions[-1][0]
+
+def generate_diagram(rng, profile, scale=1.0):
+    """Returns (extension, content, is_class_diagram) of one synthetic diagram."""
+    is_class_diagram = rng.random() < profile["class_diagram_ratio"]
+    content = DiagramWriter(rng, profile, scale).render(is_class_diagram)
+    if rng.random() < profile["malformed_ratio"]:
+        content = content[:rng.randint(len(content) // 4, len(content) - 1)]  # Truncated download
+        is_class_diagram = False
+    return choose_extension(rng, profile["extensions"]), content, is_class_diagram
+
+def build_profile(source, overrides=None):
+    """Returns the profile of a source with (median, sigma) or scalar overrides applied."""
+    profile = dict(PROFILES[source])
+    for key, value in (overrides or {}).items():
+        if value is None:
+            continue
+        if isinstance(profile[key], tuple) and not isinstance(value, tuple):
+            value = (value, profile[key][1])  # Override the median, keep the spread
+        profile[key] = value
+    return profile
+
+def generate_corpus(output_folder, source, files, seed=0, scale=1.0, overrides=None):
+    """Writes `files` synthetic diagrams of a source, returns (total_bytes, class_diagrams)."""
+    profile = build_profile(source, overrides)
+    rng = random.Random(f"{source}-{seed}")
+    os.makedirs(output_folder, exist_ok=True)
+
+    total_bytes = 0
+    class_diagrams = 0
+    for index in range(files):
+        extension, content, is_class_diagram = generate_diagram(rng, profile, scale)
+        data = content.encode('utf-8')
+        with open(os.path.join(output_folder, f"{source}_{index:06d}{extension}"), 'wb') as file:
+            file.write(data)
+        total_bytes += len(data)
+        class_diagrams += is_class_diagram
+    return total_bytes, class_diagrams
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic UML XMI corpus modeled on one of the dataset sources.")
+    parser.add_argument("output_folder", type=str, help="Folder to write the diagrams to")
+    parser.add_argument("--source", type=str, choices=sorted(PROFILES), default="genmymodel", help="Source whose file format and size distribution is imitated")
+    parser.add_argument("--files", type=int, default=1000, help="Number of diagrams")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed, the same seed gives the same corpus")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for all element counts, e.g. 10 for large models")
+    parser.add_argument("--classes", type=float, default=None, help="Median number of classes per diagram")
+    parser.add_argument("--attributes", type=float, default=None, help="Median number of attributes per class")
+    parser.add_argument("--operations", type=float, default=None, help="Median number of operations per class")
+    parser.add_argument("--package_depth", type=int, default=None, help="Maximum package nesting depth")
+    parser.add_argument("--class_diagram_ratio", type=float, default=None, help="Share of diagrams that contain classes")
+    args = parser.parse_args()
+
+    overrides = {key: getattr(args, key) for key in ("classes", "attributes", "operations", "package_depth", "class_diagram_ratio")}
+    total_bytes, class_diagrams = generate_corpus(args.output_folder, args.source, args.files, args.seed, args.scale, overrides)
+    print(f"Generated {args.files} {args.source} diagrams ({class_diagrams} class diagrams, {total_bytes / 1024 / 1024:.2f} MB) in {args.output_folder}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# Thin wrapper, the implementation lives in the shared uml_dataset package at the repository root
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")))
+
+from uml_dataset.cli import main
+
+if __name__ == "__main__":
+    main(["genmymodel", "mine-data-clumps"] + sys.argv[1:])
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from uml_dataset.xml_backend import get_backend
+from uml_dataset import xmi
+
+# The lxml backend has to give the same results as xml.etree.ElementTree on every bundled fixture:
+# class diagram verdict, class count, extracted classes and generalizations.
+
+pytest.importorskip("lxml")
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "fixtures")
+FIXTURES = sorted(filename for filename in os.listdir(FIXTURES_FOLDER) if filename.endswith((".xmi", ".uml")))
+
+def backend_results(content, backend):
+    verdict = xmi.is_uml_class_diagram(content, backend)
+    try:
+        generalizations = xmi.extract_generalization_map(xmi.parse_document(content, backend), backend)
+    except Exception:  # Broken files fail on both backends, the parse error messages differ
+        generalizations = None
+    return verdict, xmi.count_class_elements(content, backend), xmi.extract_class_details(content, backend), generalizations
+
+@pytest.mark.parametrize("filename", FIXTURES)
+def test_backends_agree(filename):
+    with open(os.path.join(FIXTURES_FOLDER, filename), 'rb') as file:
+        content = file.read()
+    assert backend_results(content, get_backend("lxml")) == backend_results(content, get_backend("etree"))
+
+def test_fixtures_cover_class_diagrams():
+    class_diagrams = 0
+    for filename in FIXTURES:
+        with open(os.path.join(FIXTURES_FOLDER, filename), 'rb') as file:
+            class_diagrams += xmi.is_uml_class_diagram(file.read(), get_backend("etree"))
+    assert class_diagrams >= 1
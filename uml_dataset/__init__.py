@@ -0,0 +1,7 @@
+"""Shared processing code for the UML Class Diagram Dataset.
+
+The per-source scripts under data/<source>/scripts are thin wrappers around this package,
+run it directly with ``python -m uml_dataset <source> <command> ...``.
+"""
+from .xmi import is_uml_class_diagram, extract_class_details
+from .sources import SOURCES, get_source
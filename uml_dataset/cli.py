@@ -0,0 +1,262 @@
+import os
+import json
+import argparse
+
+from .sources import SOURCES
+from . import filter as filter_stage
+from . import extract as extract_stage
+from . import pipeline
+from . import supervisor
+from . import xmi
+from . import instrumentation
+from . import prefilter
+from . import manifest
+from . import search
+from . import dataset
+from . import fingerprint
+from . import graph
+from . import stats
+from . import sharding
+from . import merge
+from .xml_backend import BACKEND_ENVIRONMENT_VARIABLE
+from .dataclumps import runner, fix_reports, miner
+
+def run_download(args, source):
+    source.download(args)
+
+def run_filter(args, source):
+    known_negatives = source.filter_known_negatives(args) if hasattr(source, "filter_known_negatives") else None
+    filter_stage.process_folder(args.path_to_folder, args.output_folder, source.EXTENSIONS, args.layout, known_negatives)
+
+def run_extract(args, source):
+    if args.supervised:
+        supervisor.process_folder(args.path_to_folder, args.output_folder, source.EXTENSIONS, args.workers,
+                                  args.timeout, args.memory_limit, args.quarantine_folder, args.layout)
+    else:
+        extract_stage.process_folder(args.path_to_folder, args.output_folder, source.EXTENSIONS, args.layout)
+
+def run_pipeline(args, source):
+    raw_folder, jobs = source.download_jobs(args)
+    pipeline.run_pipeline(jobs, raw_folder, args.extracted_folder, args.download_workers, args.process_workers, args.queue_size, args.layout)
+
+def load_skipped_diagrams(args, source):
+    return fingerprint.load_duplicates(args.skip_duplicates, source.NAME) if args.skip_duplicates else None
+
+def run_analyse_data_clumps(args, source):
+    if not os.path.exists(args.output_directory):
+        os.makedirs(args.output_directory)
+
+    runner.run_command_for_projects(args.projects_directory, args.output_directory, args.analyzer_path, args.batch_size,
+                                    args.max_workers, args.engine, metadata_provider=source.get_project_metadata,
+                                    skip=load_skipped_diagrams(args, source))
+
+def run_fix_reports(args, source):
+    fix_reports.fix_reports(args.projects_directory, source.get_project_metadata, args.streaming, args.json_backend, args.max_workers)
+
+def run_mine_data_clumps(args, source):
+    report = miner.mine_corpus(args.extracted_directory, args.bands, args.rows_per_band, args.min_shared,
+                               args.min_diagrams, args.ignore_case, args.max_bucket_size, args.max_workers,
+                               skip=load_skipped_diagrams(args, source))
+
+    with open(args.output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+def run_fingerprint_diagrams(args, source):
+    fingerprint.build_index([args.class_diagrams_directory] + args.compare_with, args.output_file, source.NAME, args.max_workers)
+
+def run_stats(args, source):
+    if not (args.raw_directory or args.class_diagrams_directory or args.extracted_directory):
+        print("Pass at least one of --raw_directory, --class_diagrams_directory and --extracted_directory")
+        return
+    uml_files = source.uml_diagram_files(args) if hasattr(source, "uml_diagram_files") else None
+    stats.corpus_stats(args.output_file or args.source + "_stats.json", args.include, raw_folder=args.raw_directory,
+                       class_diagrams_folder=args.class_diagrams_directory, extracted_folder=args.extracted_directory,
+                       extensions=source.EXTENSIONS, uml_files=uml_files, max_workers=args.max_workers, source=source.NAME)
+
+def run_merge_shards(args, source):
+    if args.shard_folders:
+        if not args.output_folder:
+            print("Pass --output_folder to merge the shard folders into")
+            return
+        merge.merge_shards(args.shard_folders, args.output_folder, args.layout, args.move)
+    if args.stats_files:
+        stats.merge_stats_files(args.stats_files, args.stats_output or args.source + "_stats.json")
+
+def run_export_graph(args, source):
+    try:
+        graph.export_graph(args.class_diagrams_directory, args.output_directory or args.source + "_graph", source.EXTENSIONS, args.max_workers, source.NAME)
+    except ImportError as e:
+        print(e)
+
+def run_pack_dataset(args, source):
+    dataset.pack_dataset(args.extracted_directory, args.output_file or args.source + dataset.DEFAULT_PACK_EXTENSION, source.NAME)
+
+def run_build_search_index(args, source):
+    search.build_index(args.extracted_directory, args.index_file, args.max_workers)
+
+def run_search(args, source):
+    try:
+        search.search(args.index_file, args.query, args.limit, args.json)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+
+def add_command_parsers(subparsers, source):
+    parser = subparsers.add_parser("download", help="Stage 1: download the raw diagrams of this source.")
+    source.add_download_arguments(parser)
+    parser.set_defaults(func=run_download)
+
+    parser = subparsers.add_parser("filter", help="Stage 2: copy the UML class diagrams into a separate folder.")
+    parser.add_argument("path_to_folder", type=str, help="Path to the folder containing the XMI files")
+    parser.add_argument("--output_folder", type=str, default="2_UML-Class-Diagrams", help="Path to the output folder")
+    parser.add_argument("--layout", type=str, choices=manifest.LAYOUTS, default="flat", help="'sharded' spreads the output over 256 subfolders by a hash of the name")
+    if hasattr(source, "add_filter_arguments"):
+        source.add_filter_arguments(parser)
+    parser.set_defaults(func=run_filter)
+
+    parser = subparsers.add_parser("extract", help="Stage 3: extract the class information as one JSON file per class.")
+    parser.add_argument("path_to_folder", type=str, help="Path to the folder containing the XMI files")
+    parser.add_argument("--output_folder", type=str, default="./3_Extracted-Class-Informations", help="Path to the output folder")
+    parser.add_argument("--layout", type=str, choices=manifest.LAYOUTS, default="flat", help="'sharded' spreads the output over 256 subfolders by a hash of the name")
+    parser.add_argument("--supervised", action="store_true", help="Extract in worker processes with per-file limits, offending files are quarantined")
+    parser.add_argument("--workers", type=int, default=None, help="Number of supervised worker processes")
+    parser.add_argument("--timeout", type=float, default=supervisor.DEFAULT_TIMEOUT, help="Seconds a supervised worker may spend on one file")
+    parser.add_argument("--memory_limit", type=int, default=supervisor.DEFAULT_MEMORY_LIMIT, help="Address space in MB of a supervised worker, 0 for no limit")
+    parser.add_argument("--quarantine_folder", type=str, default=None, help="Where failing files and failures.jsonl are stored, defaults to <output_folder>_quarantine")
+    parser.set_defaults(func=run_extract)
+
+    parser = subparsers.add_parser("pipeline", help="Stages 1-3 streamed in memory: download, detect and extract without the intermediate folders.")
+    source.add_download_arguments(parser)
+    parser.add_argument("--extracted_folder", type=str, default="./3_Extracted-Class-Informations", help="Path to the extracted class information")
+    parser.add_argument("--download_workers", type=int, default=pipeline.DOWNLOAD_WORKERS, help="Number of concurrent downloads")
+    parser.add_argument("--process_workers", type=int, default=None, help="Number of processes detecting and extracting class diagrams")
+    parser.add_argument("--queue_size", type=int, default=pipeline.QUEUE_SIZE, help="Maximum number of diagrams waiting between two stages")
+    parser.add_argument("--layout", type=str, choices=manifest.LAYOUTS, default="flat", help="'sharded' spreads the output over 256 subfolders by a hash of the name")
+    parser.set_defaults(func=run_pipeline)
+
+    parser = subparsers.add_parser("analyse-data-clumps", help="Write a data-clump report per extracted diagram.")
+    parser.add_argument('--projects_directory', type=str, required=True, help="The directory containing project folders.")
+    parser.add_argument('--output_directory', type=str, required=True, help="The directory to save output files.")
+    parser.add_argument('--engine', type=str, choices=["node", "native"], default="node", help="'node' runs the data-clumps-doctor analyzer, 'native' the in-process Python detector.")
+    parser.add_argument('--analyzer_path', type=str, default=runner.DEFAULT_ANALYZER_PATH, help="Path to the data-clumps-doctor 'analyse' package containing build/ignoreCoverage/cli.js.")
+    parser.add_argument('--batch_size', type=int, default=runner.DEFAULT_BATCH_SIZE, help="At most this many projects per Node process, batches shrink towards the end of the run. Use 1 to start one process per project.")
+    parser.add_argument('--max_workers', type=int, default=None, help="Number of projects or batches analysed in parallel.")
+    parser.add_argument('--skip_duplicates', type=str, default=None, help="Fingerprint index written by fingerprint-diagrams, duplicate diagrams are not analysed.")
+    parser.set_defaults(func=run_analyse_data_clumps)
+
+    parser = subparsers.add_parser("fix-reports", help="Set the source specific project_info of existing data-clump reports.")
+    parser.add_argument('--projects_directory', type=str, required=True, help="The directory containing the report files.")
+    parser.add_argument('--streaming', action='store_true', help="Patch only the project_info region instead of re-serializing whole reports.")
+    parser.add_argument('--json_backend', type=str, choices=["auto", "json", "orjson"], default="auto", help="JSON library used for full rewrites, 'auto' prefers orjson when installed.")
+    parser.add_argument('--max_workers', type=int, default=None, help="Number of worker processes.")
+    parser.set_defaults(func=run_fix_reports)
+
+    parser = subparsers.add_parser("mine-data-clumps", help="Find data clumps recurring across the diagrams of an extracted dataset using MinHash/LSH.")
+    parser.add_argument('--extracted_directory', type=str, required=True, help="The 3_Extracted-Class-Informations folder.")
+    parser.add_argument('--output_file', type=str, default="corpus_data_clumps.json", help="Where to write the recurring data clumps.")
+    parser.add_argument('--bands', type=int, default=miner.NUM_BANDS, help="Number of LSH bands.")
+    parser.add_argument('--rows_per_band', type=int, default=miner.ROWS_PER_BAND, help="MinHash values per band, more rows mean stricter candidates.")
+    parser.add_argument('--min_shared', type=int, default=miner.MIN_SHARED_VARIABLES, help="Minimum number of shared variables of a data clump.")
+    parser.add_argument('--min_diagrams', type=int, default=2, help="Only report clumps found in at least this many diagrams.")
+    parser.add_argument('--max_bucket_size', type=int, default=miner.MAX_BUCKET_SIZE, help="Buckets with more variable sets are not expanded into pairs.")
+    parser.add_argument('--ignore_case', action='store_true', help="Compare variable names case-insensitively.")
+    parser.add_argument('--max_workers', type=int, default=None, help="Number of processes computing signatures.")
+    parser.add_argument('--skip_duplicates', type=str, default=None, help="Fingerprint index written by fingerprint-diagrams, duplicate diagrams are not analysed.")
+    parser.set_defaults(func=run_mine_data_clumps)
+
+    parser = subparsers.add_parser("fingerprint-diagrams", help="Group the class diagrams of one or more sources by structure to find duplicates.")
+    parser.add_argument('--class_diagrams_directory', type=str, required=True, help="The 2_UML-Class-Diagrams folder of this source.")
+    parser.add_argument('--compare_with', type=str, nargs='*', default=[], help="2_UML-Class-Diagrams folders of other sources, their members of a group count as duplicates of this source's.")
+    parser.add_argument('--output_file', type=str, default=fingerprint.DEFAULT_INDEX_FILE, help="Where to write the fingerprint index.")
+    parser.add_argument('--max_workers', type=int, default=None, help="Number of processes parsing the diagrams.")
+    parser.set_defaults(func=run_fingerprint_diagrams)
+
+    parser = subparsers.add_parser("stats", help="Count the diagrams of each stage and the size, class, field and method distributions for the README.")
+    parser.add_argument('--raw_directory', type=str, default=None, help="The 1_UML-Diagrams folder.")
+    parser.add_argument('--class_diagrams_directory', type=str, default=None, help="The 2_UML-Class-Diagrams folder.")
+    parser.add_argument('--extracted_directory', type=str, default=None, help="The 3_Extracted-Class-Informations folder, only diagrams changed since the last run are read.")
+    parser.add_argument('--output_file', type=str, default=None, help="Where to write the stats, defaults to <source>_stats.json.")
+    parser.add_argument('--include', type=str, nargs='*', default=[], help="Stats files of other sources to add to the printed figures.")
+    parser.add_argument('--max_workers', type=int, default=None, help="Number of processes reading the class files.")
+    if hasattr(source, "add_stats_arguments"):
+        source.add_stats_arguments(parser)
+    parser.set_defaults(func=run_stats)
+
+    parser = subparsers.add_parser("merge-shards", help="Combine the output folders and stats files of a stage run with --shard on several machines.")
+    parser.add_argument('shard_folders', type=str, nargs='*', help="Output folders of the same stage, one per shard.")
+    parser.add_argument('--output_folder', type=str, default=None, help="Folder to merge the shard folders into.")
+    parser.add_argument('--layout', type=str, choices=manifest.LAYOUTS, default=None, help="Layout of a new output folder, defaults to the layout of the first shard folder.")
+    parser.add_argument('--move', action='store_true', help="Move the entries instead of copying them.")
+    parser.add_argument('--stats_files', type=str, nargs='*', default=[], help="Stats files written by the stats command of each shard.")
+    parser.add_argument('--stats_output', type=str, default=None, help="Where to write the merged stats, defaults to <source>_stats.json.")
+    parser.set_defaults(func=run_merge_shards)
+
+    parser = subparsers.add_parser("export-graph", help="Export the classes, generalizations and associations of all class diagrams as CSR arrays (needs NumPy).")
+    parser.add_argument('--class_diagrams_directory', type=str, required=True, help="The 2_UML-Class-Diagrams folder, the extracted JSON holds no types or generalizations.")
+    parser.add_argument('--output_directory', type=str, default=None, help="Where to write the graph, defaults to <source>_graph.")
+    parser.add_argument('--max_workers', type=int, default=None, help="Number of processes parsing the diagrams.")
+    parser.set_defaults(func=run_export_graph)
+
+    parser = subparsers.add_parser("pack-dataset", help="Pack an extracted dataset into one memory-mapped file for uml_dataset.dataset.open_dataset.")
+    parser.add_argument('--extracted_directory', type=str, required=True, help="The 3_Extracted-Class-Informations folder.")
+    parser.add_argument('--output_file', type=str, default=None, help="Where to write the pack, defaults to <source>.umlpack.")
+    parser.set_defaults(func=run_pack_dataset)
+
+    parser = subparsers.add_parser("build-search-index", help="Index the class, field, method and parameter names of an extracted dataset.")
+    parser.add_argument('--extracted_directory', type=str, required=True, help="The 3_Extracted-Class-Informations folder.")
+    parser.add_argument('--index_file', type=str, default=search.DEFAULT_INDEX_FILE, help="Where to write the index.")
+    parser.add_argument('--max_workers', type=int, default=None, help="Number of processes reading the class files.")
+    parser.set_defaults(func=run_build_search_index)
+
+    parser = subparsers.add_parser("search", help="Find the classes matching all query terms, e.g. 'class:Customer field:address method:get*'.")
+    parser.add_argument('query', type=str, nargs='+', help="Terms as kind:name with kind class, field, method or parameter (any kind when omitted), a trailing * matches a prefix.")
+    parser.add_argument('--index_file', type=str, default=search.DEFAULT_INDEX_FILE, help="Index written by build-search-index.")
+    parser.add_argument('--limit', type=int, default=search.DEFAULT_LIMIT, help="Number of matches to print, 0 for all.")
+    parser.add_argument('--json', action='store_true', help="Print the matches as JSON.")
+    parser.set_defaults(func=run_search)
+
+def add_global_arguments(parser, suppress=False):
+    # The command parsers take the same options with suppressed defaults, so they can also follow the
+    # command (as with the wrapper scripts) without overwriting a value given before the source
+    default = lambda value: argparse.SUPPRESS if suppress else value
+    parser.add_argument("--xml_backend", type=str, choices=["auto", "lxml", "etree"], default=default(None), help="XML parser, 'auto' (default) uses lxml when it is installed")
+    parser.add_argument("--refresh_manifest", action="store_true", default=default(False), help="Rescan input folders instead of using the cached file listings")
+    parser.add_argument("--shard", type=sharding.parse_shard, default=default(None), help="Only handle the diagrams of shard i of n (e.g. 2/4), chosen by a stable hash of the file name")
+    parser.add_argument("--no_prefilter", action="store_true", default=default(False), help="Parse every file instead of rejecting files without a uml:Class marker first")
+    parser.add_argument("--trace", action="store_true", default=default(False), help="Print the time spent per stage (read, parse, detect, extract, write, HTTP) and the slowest files")
+    parser.add_argument("--timings_file", type=str, default=default(None), help="Write the stage timings of every file as CSV, implies --trace")
+    parser.add_argument("--profile", type=str, choices=["cprofile", "sampling"], default=default(None), help="Profile the command, 'sampling' also covers the download and writer threads")
+    parser.add_argument("--profile_output", type=str, default=default(None), help="cProfile stats file or collapsed stacks of the sampling profiler")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m uml_dataset", description="Download, filter and extract UML class diagrams of the dataset sources.")
+    add_global_arguments(parser)
+    source_parsers = parser.add_subparsers(dest="source", required=True, metavar="source")
+    for name, source in SOURCES.items():
+        source_parser = source_parsers.add_parser(name, help=f"Process the {name} corpus.")
+        source_parser.set_defaults(source_module=source)
+        command_parsers = source_parser.add_subparsers(dest="command", required=True, metavar="command")
+        add_command_parsers(command_parsers, source)
+        for command_parser in command_parsers.choices.values():
+            add_global_arguments(command_parser, suppress=True)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.xml_backend:
+        # The environment variable carries the choice into worker processes
+        os.environ[BACKEND_ENVIRONMENT_VARIABLE] = args.xml_backend
+        xmi.set_default_backend(args.xml_backend)
+    if args.refresh_manifest:
+        manifest.refresh = True
+    if args.no_prefilter:
+        prefilter.disable()
+    if args.shard:
+        sharding.shard = args.shard
+    if args.trace or args.timings_file:
+        instrumentation.enable()
+
+    with instrumentation.profile(args.profile, args.profile_output):
+        args.func(args, args.source_module)
+
+    if instrumentation.enabled:
+        instrumentation.report(args.timings_file)
@@ -0,0 +1 @@
+"""Data-clump analysis of extracted diagrams: analyzer runner, native detector, corpus miner and report fix-ups."""
@@ -0,0 +1,59 @@
+// Runs the data-clumps-doctor CLI for many projects inside one Node process.
+// Usage: node cli_batch.js <path/to/build/ignoreCoverage/cli.js>
+// Jobs are read from stdin, one JSON object per line: {"argv": ["--output", ..., "--path_to_project", ...]}
+// One JSON line per job is written to stdout: {"job": <index>, "ok": true} or {"job": <index>, "ok": false, "error": "..."}
+//
+// Every job runs in its own worker thread, which saves the start of a Node process per project while
+// keeping the projects apart: a worker has its own module registry and globals, so no analyzer state
+// leaks into the next project. process.exit() inside a worker only ends that worker, a non-zero exit
+// code or an uncaught error becomes the failure of that job and the batch continues.
+//
+// The analyzer has to run as a CommonJS main script that reads its options from process.argv, the
+// worker gets the job arguments appended to its argv. Workers cannot call process.chdir(), which is
+// why the runner passes absolute paths. Checked with Node.js 20 against CLI stand-ins that finish
+// asynchronously, call process.exit() with and without a code and throw; the analyzer output is
+// drained, the runner discards it anyway.
+const path = require("path");
+const { Worker } = require("worker_threads");
+
+const cliPath = path.resolve(process.argv[2]);
+
+function runJob(job) {
+    return new Promise((resolve) => {
+        let error = null;
+        const worker = new Worker(cliPath, { argv: job.argv, stdout: true, stderr: true });
+        worker.stdout.resume();
+        worker.stderr.resume();
+        worker.on("error", (workerError) => {
+            error = `${workerError}`;
+        });
+        worker.on("exit", (code) => {
+            if (error === null && code !== 0) {
+                error = `Analyzer exited with code ${code}`;
+            }
+            resolve(error);
+        });
+    });
+}
+
+async function runJobs(jobs) {
+    for (let index = 0; index < jobs.length; index++) {
+        let error;
+        try {
+            error = await runJob(jobs[index]);
+        } catch (startError) {  // e.g. the CLI file does not exist
+            error = `${startError}`;
+        }
+        process.stdout.write(JSON.stringify(error === null ? { job: index, ok: true } : { job: index, ok: false, error: error }) + "\n");
+    }
+}
+
+let input = "";
+process.stdin.setEncoding("utf8");
+process.stdin.on("data", (chunk) => {
+    input += chunk;
+});
+process.stdin.on("end", () => {
+    const jobs = input.split("\n").filter((line) => line.trim().length > 0).map((line) => JSON.parse(line));
+    runJobs(jobs);
+});
@@ -0,0 +1,209 @@
+import os
+import json
+from datetime import datetime, timezone
+
+from .report_metadata import TARGET_LANGUAGE, apply_project_metadata
+
+# In-process replacement for the data-clumps-doctor "ast" analysis of one extracted diagram.
+# Reads the class JSON files written by extract_class_details and writes the same report layout
+# the Node analyzer produces (and fix_informations.py post-processes).
+
+DETECTOR_NAME = "uml-class-diagram-dataset-native"
+DETECTOR_VERSION = "0.1.0"
+REPORT_VERSION = "0.1.0"
+MIN_SHARED_VARIABLES = 3
+
+FIELDS_TO_FIELDS = "fields_to_fields_data_clump"
+PARAMETERS_TO_FIELDS = "parameters_to_fields_data_clump"
+PARAMETERS_TO_PARAMETERS = "parameters_to_parameters_data_clump"
+
+def load_project_classes(project_path):
+    classes = []
+    for filename in sorted(os.listdir(project_path)):
+        if filename.endswith(".json"):
+            with open(os.path.join(project_path, filename), 'r', encoding='utf-8') as f:
+                classes.append(json.load(f))
+    return classes
+
+def variable_signature(variable):
+    # Variables match when name and type match, the UML extraction leaves most types as None
+    return (variable["name"], variable.get("type"))
+
+def class_owners(classes):
+    owners = []
+    for class_details in classes:
+        variables = {variable_signature(field): field for field in class_details.get("fields", {}).values()}
+        owners.append({"class": class_details, "method": None, "variables": variables})
+    return owners
+
+def method_owners(classes):
+    owners = []
+    for class_details in classes:
+        for method in class_details.get("methods", {}).values():
+            variables = {variable_signature(parameter): parameter for parameter in method.get("parameters", [])}
+            owners.append({"class": class_details, "method": method, "variables": variables})
+    return owners
+
+def build_inverted_index(owners):
+    """Maps each (name, type) signature to the indexes of all owners declaring it."""
+    index = {}
+    for owner_index, owner in enumerate(owners):
+        for signature in owner["variables"]:
+            index.setdefault(signature, []).append(owner_index)
+    return index
+
+def find_candidate_pairs(from_owners, to_owners, min_shared=MIN_SHARED_VARIABLES):
+    """Yields (from_owner, to_owner, shared_signatures) for every pair sharing at least min_shared variables.
+
+    Only owners that appear together in a posting list are ever counted, so the cost depends on the
+    number of shared variables instead of the number of owner pairs.
+    """
+    to_index = build_inverted_index(to_owners)
+    for from_owner in from_owners:
+        if len(from_owner["variables"]) < min_shared:
+            continue
+        shared_counts = {}
+        for signature in from_owner["variables"]:
+            for to_owner_index in to_index.get(signature, ()):
+                shared_counts[to_owner_index] = shared_counts.get(to_owner_index, 0) + 1
+
+        for to_owner_index, shared_count in shared_counts.items():
+            to_owner = to_owners[to_owner_index]
+            if shared_count < min_shared or to_owner is from_owner:
+                continue
+            if to_owner["class"] is from_owner["class"] and (from_owner["method"] is None or to_owner["method"] is None):
+                continue  # fields of a class always "match" themselves and its own setters/constructors
+            shared_signatures = [signature for signature in from_owner["variables"] if signature in to_owner["variables"]]
+            yield from_owner, to_owner, shared_signatures
+
+def describe_variable(variable):
+    return {
+        "key": variable.get("key"),
+        "name": variable["name"],
+        "type": variable.get("type"),
+        "modifiers": variable.get("modifiers", []),
+        "position": variable.get("position")
+    }
+
+def build_data_clump(data_clump_type, from_owner, to_owner, shared_signatures):
+    from_class, to_class = from_owner["class"], to_owner["class"]
+    from_method, to_method = from_owner["method"], to_owner["method"]
+
+    data_clump_data = {}
+    for signature in shared_signatures:
+        from_variable = from_owner["variables"][signature]
+        to_variable = to_owner["variables"][signature]
+        variable_details = describe_variable(from_variable)
+        variable_details["probability"] = 1
+        variable_details["to_variable"] = describe_variable(to_variable)
+        data_clump_data[from_variable.get("key") or from_variable["name"]] = variable_details
+
+    key = "-".join(str(part) for part in [
+        data_clump_type,
+        from_class.get("file_path"), to_class.get("file_path"),
+        from_class.get("key"), to_class.get("key"),
+        from_method["key"] if from_method else None, to_method["key"] if to_method else None
+    ])
+
+    return key, {
+        "type": "data_clump",
+        "key": key,
+        "probability": 1,
+        "from_file_path": from_class.get("file_path"),
+        "from_class_or_interface_name": from_class.get("name"),
+        "from_class_or_interface_key": from_class.get("key"),
+        "from_method_name": from_method["name"] if from_method else None,
+        "from_method_key": from_method["key"] if from_method else None,
+        "to_file_path": to_class.get("file_path"),
+        "to_class_or_interface_name": to_class.get("name"),
+        "to_class_or_interface_key": to_class.get("key"),
+        "to_method_name": to_method["name"] if to_method else None,
+        "to_method_key": to_method["key"] if to_method else None,
+        "data_clump_type": data_clump_type,
+        "data_clump_data": data_clump_data
+    }
+
+def detect_data_clumps(classes, min_shared=MIN_SHARED_VARIABLES):
+    """Returns all data clumps of one project as a dict keyed like the analyzer report."""
+    fields = class_owners(classes)
+    methods = method_owners(classes)
+
+    data_clumps = {}
+    for data_clump_type, from_owners, to_owners in [
+        (FIELDS_TO_FIELDS, fields, fields),
+        (PARAMETERS_TO_FIELDS, methods, fields),
+        (PARAMETERS_TO_PARAMETERS, methods, methods)
+    ]:
+        for from_owner, to_owner, shared_signatures in find_candidate_pairs(from_owners, to_owners, min_shared):
+            key, data_clump = build_data_clump(data_clump_type, from_owner, to_owner, shared_signatures)
+            data_clumps[key] = data_clump
+    return data_clumps
+
+def build_report(project_name, classes, data_clumps, min_shared=MIN_SHARED_VARIABLES):
+    amount_per_type = {FIELDS_TO_FIELDS: 0, PARAMETERS_TO_FIELDS: 0, PARAMETERS_TO_PARAMETERS: 0}
+    files_with_data_clumps = set()
+    methods_with_data_clumps = set()
+    for data_clump in data_clumps.values():
+        amount_per_type[data_clump["data_clump_type"]] += 1
+        files_with_data_clumps.add(data_clump["from_file_path"])
+        if data_clump["from_method_key"] is not None:
+            methods_with_data_clumps.add(data_clump["from_method_key"])
+
+    all_methods = [method for class_details in classes for method in class_details.get("methods", {}).values()]
+
+    return {
+        "report_version": REPORT_VERSION,
+        "report_timestamp": datetime.now(timezone.utc).isoformat(),
+        "target_language": TARGET_LANGUAGE,
+        "report_summary": {
+            "amount_data_clumps": len(data_clumps),
+            "amount_files_with_data_clumps": len(files_with_data_clumps),
+            "amount_methods_with_data_clumps": len(methods_with_data_clumps),
+            "fields_to_fields_data_clump": amount_per_type[FIELDS_TO_FIELDS],
+            "parameters_to_fields_data_clump": amount_per_type[PARAMETERS_TO_FIELDS],
+            "parameters_to_parameters_data_clump": amount_per_type[PARAMETERS_TO_PARAMETERS],
+            "additional": {}
+        },
+        "project_info": {
+            "project_url": None,
+            "project_name": project_name,
+            "project_version": None,
+            "project_commit_hash": None,
+            "project_tag": None,
+            "project_commit_date": None,
+            "number_of_files": len(classes),
+            "number_of_classes_or_interfaces": len(classes),
+            "number_of_methods": len(all_methods),
+            "number_of_data_fields": sum(len(class_details.get("fields", {})) for class_details in classes),
+            "number_of_method_parameters": sum(len(method.get("parameters", [])) for method in all_methods),
+            "additional": {}
+        },
+        "detector": {
+            "name": DETECTOR_NAME,
+            "version": DETECTOR_VERSION,
+            "options": {
+                "sharedFieldsToFieldsAmountMinimum": min_shared,
+                "sharedParametersToFieldsAmountMinimum": min_shared,
+                "sharedParametersToParametersAmountMinimum": min_shared
+            }
+        },
+        "data_clumps": data_clumps
+    }
+
+def analyse_project(project_name, folder_path, output_directory, min_shared=MIN_SHARED_VARIABLES, metadata_provider=None):
+    output_path = os.path.join(output_directory, f"{project_name}.json")
+
+    # Skip if the output file already exists
+    if os.path.isfile(output_path):
+        return f"Skipping {project_name}, output file already exists."
+
+    classes = load_project_classes(os.path.join(folder_path, project_name))
+    data_clumps = detect_data_clumps(classes, min_shared)
+    report = build_report(project_name, classes, data_clumps, min_shared)
+    if metadata_provider is not None:
+        # Source specific project_info (URLs, commit fields) so the report needs no fix-up pass
+        apply_project_metadata(report, metadata_provider(project_name))
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return f"Processed {project_name}"
@@ -0,0 +1,86 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ..progress import format_eta
+from .report_metadata import apply_project_metadata, patch_report_file, temporary_file_next_to, replace_file
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FILES_PER_TASK = 64
+
+def load_json_bytes(content, backend):
+    if backend == "orjson":
+        return orjson.loads(content)
+    return json.loads(content)
+
+def dump_json_bytes(data, backend):
+    # orjson only knows a 2 space indent, which is what the reports use anyway
+    if backend == "orjson":
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+def write_atomically(file_path, content):
+    # Write next to the target and rename over it, a crash leaves either the old or the new report
+    with temporary_file_next_to(file_path) as tmp_file:
+        tmp_file.write(content)
+    replace_file(tmp_file.name, file_path)
+
+def process_json_file(file_path, metadata_provider, backend="json"):
+    with open(file_path, 'rb') as f:
+        data = load_json_bytes(f.read(), backend)
+
+    # Replace project_url, set project_version and project_commit_hash to null and add the download URL
+    project_name = data['project_info']['project_name']
+    apply_project_metadata(data, metadata_provider(project_name))
+
+    # Save the modified data back to the file
+    write_atomically(file_path, dump_json_bytes(data, backend))
+
+def patch_json_file(file_path, metadata_provider, backend="json"):
+    # Only the project_info region is rewritten, data_clumps is copied through without parsing
+    patch_report_file(file_path, metadata_provider)
+
+def process_json_files(file_paths, metadata_provider, streaming=False, backend="json"):
+    """Worker task: rewrites a batch of reports, returns the failures instead of aborting the batch."""
+    process_file = patch_json_file if streaming else process_json_file
+    errors = []
+    for file_path in file_paths:
+        try:
+            process_file(file_path, metadata_provider, backend)
+        except Exception as e:
+            errors.append(f"{file_path}: {e}")
+    return errors
+
+def resolve_backend(backend):
+    if backend == "auto":
+        return "orjson" if orjson is not None else "json"
+    if backend == "orjson" and orjson is None:
+        print("orjson is not installed, falling back to json")
+        return "json"
+    return backend
+
+def fix_reports(folder_path, metadata_provider, streaming=False, backend="auto", max_workers=None):
+    json_files = [os.path.join(folder_path, name) for name in os.listdir(folder_path) if name.endswith('.json')]
+    total_projects = len(json_files)
+    print(f"Total projects: {total_projects}")
+    backend = resolve_backend(backend)
+
+    start_time = time.time()
+    processed_projects = 0
+    errors_list = []
+    # json.load/json.dump hold the GIL, so the batches run in separate processes
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        batches = [json_files[i:i + FILES_PER_TASK] for i in range(0, total_projects, FILES_PER_TASK)]
+        future_to_batch = {executor.submit(process_json_files, batch, metadata_provider, streaming, backend): batch for batch in batches}
+        for future in as_completed(future_to_batch):
+            errors_list.extend(future.result())
+            processed_projects += len(future_to_batch[future])
+            print(f"{processed_projects}/{total_projects} projects processed - {format_eta(processed_projects, total_projects, start_time)}")
+
+    for error in errors_list:
+        print(error)
@@ -0,0 +1,142 @@
+import os
+import json
+import random
+import zlib
+import time
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+from ..progress import format_time
+from ..manifest import list_diagram_folders
+
+# Corpus-wide data-clump mining over a 3_Extracted-Class-Informations folder.
+# Every class field-name set and every method parameter-name set is encoded as a MinHash signature.
+# Locality-sensitive hashing (banding) then only compares sets that collide in at least one band,
+# so recurring variable groups across diagrams are found without comparing all diagram pairs.
+
+MIN_SHARED_VARIABLES = 3
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+MAX_BUCKET_SIZE = 2000
+SEED = 42
+MERSENNE_PRIME = (1 << 61) - 1
+
+def make_permutations(num_permutations, seed=SEED):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_permutations)]
+
+def minhash_signature(names, permutations):
+    # crc32 is stable across processes, unlike the builtin hash() of str
+    tokens = [zlib.crc32(name.encode('utf-8')) for name in names]
+    return [min((a * token + b) % MERSENNE_PRIME for token in tokens) for a, b in permutations]
+
+def band_keys(signature, rows_per_band):
+    return [hash(tuple(signature[i:i + rows_per_band])) for i in range(0, len(signature), rows_per_band)]
+
+def normalize_name(name, ignore_case):
+    return name.lower() if ignore_case else name
+
+def collect_variable_sets(diagram_path, ignore_case=False, min_shared=MIN_SHARED_VARIABLES):
+    """Yields (class_name, method_name, names) for every field set and parameter list of one diagram."""
+    for filename in sorted(os.listdir(diagram_path)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(diagram_path, filename), 'r', encoding='utf-8') as f:
+            class_details = json.load(f)
+
+        field_names = frozenset(normalize_name(field["name"], ignore_case) for field in class_details.get("fields", {}).values())
+        if len(field_names) >= min_shared:
+            yield class_details.get("name"), None, field_names
+
+        for method in class_details.get("methods", {}).values():
+            parameter_names = frozenset(normalize_name(parameter["name"], ignore_case) for parameter in method.get("parameters", []))
+            if len(parameter_names) >= min_shared:
+                yield class_details.get("name"), method.get("name"), parameter_names
+
+def signatures_for_diagram(diagram_path, permutations, rows_per_band, ignore_case, min_shared):
+    diagram = os.path.basename(diagram_path)
+    results = []
+    try:
+        for class_name, method_name, names in collect_variable_sets(diagram_path, ignore_case, min_shared):
+            signature = minhash_signature(names, permutations)
+            results.append((diagram, class_name, method_name, names, band_keys(signature, rows_per_band)))
+    except Exception as e:
+        print(f"An error occurred while reading diagram {diagram}: {e}")
+    return results
+
+def _signatures_for_diagram(arguments):
+    return signatures_for_diagram(*arguments)
+
+def mine_corpus(folder_path, num_bands=NUM_BANDS, rows_per_band=ROWS_PER_BAND, min_shared=MIN_SHARED_VARIABLES,
+                min_diagrams=2, ignore_case=False, max_bucket_size=MAX_BUCKET_SIZE, max_workers=None, skip=None):
+    start_time = time.time()
+    permutations = make_permutations(num_bands * rows_per_band)
+
+    diagram_paths = [os.path.join(parent, name) for name, parent in list_diagram_folders(folder_path) if not skip or name not in skip]
+    total_diagrams = len(diagram_paths)
+    print(f"Total diagrams: {total_diagrams}")
+
+    # Identical variable sets are merged first, LSH only runs over the distinct sets
+    set_ids = {}
+    distinct_sets = []
+    occurrences = []
+    buckets = {}
+
+    processed_diagrams = 0
+    arguments = ((path, permutations, rows_per_band, ignore_case, min_shared) for path in diagram_paths)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for results in executor.map(_signatures_for_diagram, arguments, chunksize=64):
+            for diagram, class_name, method_name, names, keys in results:
+                set_id = set_ids.get(names)
+                if set_id is None:
+                    set_id = len(distinct_sets)
+                    set_ids[names] = set_id
+                    distinct_sets.append(names)
+                    occurrences.append([])
+                    for band_index, key in enumerate(keys):
+                        buckets.setdefault((band_index, key), []).append(set_id)
+                occurrences[set_id].append({"diagram": diagram, "class": class_name, "method": method_name})
+
+            processed_diagrams += 1
+            if processed_diagrams % 1000 == 0 or processed_diagrams == total_diagrams:
+                elapsed_time = time.time() - start_time
+                print(f"Signed {processed_diagrams}/{total_diagrams} diagrams - distinct variable sets: {len(distinct_sets)} - Elapsed: {format_time(elapsed_time)}")
+
+    # Candidate pairs only come from sets sharing a bucket, the shared names of a pair form the clump
+    clumps = {}
+    skipped_buckets = 0
+    for set_id, names in enumerate(distinct_sets):
+        clumps.setdefault(names, set()).add(set_id)
+    checked_pairs = set()
+    for bucket in buckets.values():
+        if len(bucket) < 2:
+            continue
+        if len(bucket) > max_bucket_size:
+            skipped_buckets += 1
+            continue
+        for first, second in combinations(bucket, 2):
+            if (first, second) in checked_pairs:
+                continue
+            checked_pairs.add((first, second))
+            shared_names = distinct_sets[first] & distinct_sets[second]
+            if len(shared_names) >= min_shared:
+                clumps.setdefault(shared_names, set()).update((first, second))
+
+    report = []
+    for names, members in clumps.items():
+        clump_occurrences = [occurrence for set_id in sorted(members) for occurrence in occurrences[set_id]]
+        diagrams = {occurrence["diagram"] for occurrence in clump_occurrences}
+        if len(diagrams) >= min_diagrams:
+            report.append({
+                "variables": sorted(names),
+                "amount_diagrams": len(diagrams),
+                "amount_occurrences": len(clump_occurrences),
+                "occurrences": clump_occurrences
+            })
+    report.sort(key=lambda clump: (-clump["amount_diagrams"], -len(clump["variables"]), clump["variables"]))
+
+    elapsed_time = time.time() - start_time
+    if skipped_buckets > 0:
+        print(f"Skipped {skipped_buckets} buckets with more than {max_bucket_size} variable sets")
+    print(f"Found {len(report)} recurring data clumps in {len(checked_pairs)} candidate pairs - Total elapsed: {format_time(elapsed_time)}")
+    return report
@@ -0,0 +1,155 @@
+import os
+import re
+import json
+import mmap
+import shutil
+import tempfile
+import contextlib
+
+# Source specific project metadata for data-clump reports.
+# The per-source provider is get_project_metadata of the source adapters (uml_dataset.sources),
+# apply_project_metadata injects it into a report before it is written and patch_report_file fixes
+# already written reports by rewriting only the "project_info" and "target_language" values
+# instead of re-serializing the whole report.
+
+TARGET_LANGUAGE = "UML Class Diagram"
+
+def apply_project_metadata(report, metadata):
+    report["target_language"] = metadata["target_language"]
+    report["project_info"].update(metadata["project_info"])
+    return report
+
+_STRUCTURE_TOKEN = re.compile(rb'[{}\[\]"]')
+_SCALAR_END = re.compile(rb'[,}\]\s]')
+_WHITESPACE = b" \t\r\n"
+
+def _skip_whitespace(buffer, position, extra=b""):
+    skipped = _WHITESPACE + extra
+    while position < len(buffer) and buffer[position] in skipped:
+        position += 1
+    return position
+
+def _skip_string(buffer, position):
+    # position is the opening quote, returns the index after the closing quote
+    position += 1
+    while True:
+        position = buffer.find(b'"', position)
+        if position == -1:
+            raise ValueError("Unterminated string in report")
+        backslashes = 0
+        while buffer[position - 1 - backslashes] == 0x5c:
+            backslashes += 1
+        position += 1
+        if backslashes % 2 == 0:
+            return position
+
+def _skip_value(buffer, position):
+    first = buffer[position:position + 1]
+    if first == b'"':
+        return _skip_string(buffer, position)
+    if first in (b"{", b"["):
+        depth = 0
+        while True:
+            match = _STRUCTURE_TOKEN.search(buffer, position)
+            if match is None:
+                raise ValueError("Unterminated object in report")
+            token = match.group()
+            if token == b'"':
+                position = _skip_string(buffer, match.start())
+                continue
+            position = match.end()
+            depth += 1 if token in (b"{", b"[") else -1
+            if depth == 0:
+                return position
+    match = _SCALAR_END.search(buffer, position)
+    return match.start() if match else len(buffer)
+
+def find_top_level_values(buffer, keys):
+    """Returns {key: (start, end)} byte ranges of the given top-level values, stops once all are found."""
+    wanted = {json.dumps(key).encode('utf-8'): key for key in keys}
+    found = {}
+    position = _skip_whitespace(buffer, 0)
+    if buffer[position:position + 1] != b"{":
+        raise ValueError("Report is not a JSON object")
+    position += 1
+    while len(found) < len(wanted):
+        position = _skip_whitespace(buffer, position, b",")
+        if buffer[position:position + 1] != b'"':
+            break
+        key_end = _skip_string(buffer, position)
+        key = buffer[position:key_end]
+        value_start = _skip_whitespace(buffer, _skip_whitespace(buffer, key_end) + 1)
+        value_end = _skip_value(buffer, value_start)
+        if key in wanted:
+            found[wanted[key]] = (value_start, value_end)
+        position = value_end
+    return found
+
+def _line_indent(buffer, position):
+    line_start = buffer.rfind(b"\n", 0, position) + 1
+    indent = buffer[line_start:position]
+    # Keep only the leading whitespace of the line that holds the key
+    return indent[:len(indent) - len(indent.lstrip())].decode('utf-8')
+
+@contextlib.contextmanager
+def temporary_file_next_to(file_path):
+    """Opens a temporary file in the folder of file_path for writing, it is removed again if the block fails."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    with tempfile.NamedTemporaryFile('wb', dir=directory, suffix=".tmp", delete=False) as tmp_file:
+        try:
+            yield tmp_file
+        except BaseException:
+            tmp_file.close()
+            os.remove(tmp_file.name)
+            raise
+
+def replace_file(tmp_path, file_path):
+    """Renames a temporary file over file_path, a crash leaves either the old or the new file behind."""
+    # NamedTemporaryFile creates 0600 files, keep the mode of the replaced file (or that of a new file)
+    if os.path.exists(file_path):
+        shutil.copymode(file_path, tmp_path)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+    os.replace(tmp_path, file_path)
+
+def patch_report_file(file_path, metadata_provider):
+    """Rewrites only the project_info and target_language values of an existing report.
+
+    metadata_provider is called with the project_name of the report's project_info, not the file name.
+    """
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            ranges = find_top_level_values(buffer, ["project_info", "target_language"])
+            if "project_info" not in ranges:
+                raise ValueError(f"No project_info in report {file_path}")
+
+            start, end = ranges["project_info"]
+            project_info = json.loads(buffer[start:end])
+            metadata = metadata_provider(project_info["project_name"])
+            project_info.update(metadata["project_info"])
+            indent = _line_indent(buffer, start)
+            if b"\n" in buffer[start:end]:
+                serialized_project_info = json.dumps(project_info, indent=2).replace("\n", "\n" + indent)
+            else:
+                serialized_project_info = json.dumps(project_info)  # keep compact reports compact
+            replacements = [(start, end, serialized_project_info.encode('utf-8'))]
+            target_language = json.dumps(metadata["target_language"]).encode('utf-8')
+            if "target_language" in ranges:
+                start, end = ranges["target_language"]
+                replacements.append((start, end, target_language))
+            else:
+                object_start = buffer.find(b"{") + 1
+                replacements.append((object_start, object_start, b"\n" + indent.encode('utf-8') + b'"target_language": ' + target_language + b","))
+            replacements.sort()
+
+            # Write next to the report and swap it in, a crash never leaves a truncated report behind
+            with temporary_file_next_to(file_path) as tmp_file:
+                position = 0
+                for start, end, replacement in replacements:
+                    tmp_file.write(buffer[position:start])
+                    tmp_file.write(replacement)
+                    position = end
+                tmp_file.write(buffer[position:])
+    replace_file(tmp_file.name, file_path)
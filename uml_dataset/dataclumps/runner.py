@@ -0,0 +1,116 @@
+import os
+import json
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from ..progress import format_time, format_eta
+from . import detector
+from .report_metadata import patch_report_file
+from ..manifest import list_diagram_folders
+from .. import sharding
+from .. import scheduling
+
+# Location of the data-clumps-doctor "analyse" package; override with --analyzer_path or DATA_CLUMPS_DOCTOR_PATH
+DEFAULT_ANALYZER_PATH = os.environ.get("DATA_CLUMPS_DOCTOR_PATH", "/Users/nilsbaumgartner/Documents/GitHub/data-clumps-doctor/analyse")
+CLI_RELATIVE_PATH = os.path.join("build", "ignoreCoverage", "cli.js")
+BATCH_DRIVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli_batch.js")
+DEFAULT_BATCH_SIZE = 50
+
+def build_cli_arguments(project_name, folder_path, output_directory):
+    # Paths must be absolute, the analyzer runs with its own package as working directory
+    project_path = os.path.abspath(os.path.join(folder_path, project_name))
+    output_path = os.path.abspath(os.path.join(output_directory, f"{project_name}.json"))
+    return ["--output", output_path, "--path_to_project", project_path, "--project_name", project_name, "--source_type", "ast"]
+
+def is_already_analysed(project_name, output_directory):
+    return os.path.isfile(os.path.join(output_directory, f"{project_name}.json"))
+
+def inject_project_metadata(project_name, output_directory, metadata_provider):
+    # The Node analyzer writes the report itself, patch its project_info while the file is still hot
+    output_path = os.path.join(output_directory, f"{project_name}.json")
+    if metadata_provider is not None and os.path.isfile(output_path):
+        patch_report_file(output_path, metadata_provider)
+
+def run_command(project_name, folder_path, output_directory, analyzer_path=DEFAULT_ANALYZER_PATH, metadata_provider=None):
+    # Skip if the output file already exists
+    if is_already_analysed(project_name, output_directory):
+        return f"Skipping {project_name}, output file already exists."
+
+    command = ["node", CLI_RELATIVE_PATH] + build_cli_arguments(project_name, folder_path, output_directory)
+    subprocess.run(command, cwd=analyzer_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    inject_project_metadata(project_name, output_directory, metadata_provider)
+    return f"Processed {project_name}"
+
+def run_batch(projects, output_directory, analyzer_path=DEFAULT_ANALYZER_PATH, metadata_provider=None):
+    """Analyse several (project name, parent folder) pairs with a single Node process fed over stdin by cli_batch.js."""
+    pending = [(name, parent) for name, parent in projects if not is_already_analysed(name, output_directory)]
+    if not pending:
+        return f"Skipping batch of {len(projects)}, output files already exist."
+
+    jobs = "".join(json.dumps({"argv": build_cli_arguments(name, parent, output_directory)}) + "\n" for name, parent in pending)
+    command = ["node", BATCH_DRIVER_PATH, os.path.join(analyzer_path, CLI_RELATIVE_PATH)]
+    try:
+        completed = subprocess.run(command, cwd=analyzer_path, input=jobs, text=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        output, exit_status = completed.stdout, f"exit code {completed.returncode}"
+    except OSError as e:  # e.g. node is not installed or the analyzer path does not exist
+        output, exit_status = "", f"{e}"
+
+    # The driver reports one line per job, the analyzer output itself is not forwarded
+    errors = {}
+    for line in output.splitlines():
+        try:
+            result = json.loads(line)
+            job, ok = result["job"], result["ok"]
+        except (ValueError, KeyError, TypeError):
+            print(f"Ignoring unexpected analyzer output: {line[:200]}")
+            continue
+        if isinstance(job, int) and 0 <= job < len(pending):
+            errors[job] = None if ok else result.get("error")
+    for job in range(len(pending)):
+        if job not in errors:  # The driver stopped before this job, e.g. it crashed or never started
+            errors[job] = f"No result from the batch driver ({exit_status})"
+
+    failed = 0
+    for job, (name, _) in enumerate(pending):
+        if errors[job] is None:
+            inject_project_metadata(name, output_directory, metadata_provider)
+        else:
+            failed += 1
+            print(f"Analyzer failed for {name}: {errors[job]}")
+    return f"Processed batch of {len(pending)} - failed: {failed}"
+
+def run_command_for_projects(folder_path, output_directory, analyzer_path=DEFAULT_ANALYZER_PATH, batch_size=1, max_workers=None, engine="node", metadata_provider=None, skip=None):
+    start_time = time.time()
+
+    # (project name, parent folder), the parent is a shard folder when the extraction used the sharded layout
+    projects = sharding.select(list_diagram_folders(folder_path), key=lambda project: project[0])
+    if skip:
+        unique_projects = [(name, parent) for name, parent in projects if name not in skip]
+        print(f"Skipping {len(projects) - len(unique_projects)} duplicate diagrams")
+        projects = unique_projects
+    total_projects = len(projects)
+    print(f"Total projects: {total_projects}")
+
+    # Largest diagrams first, so no large one is left running alone at the end
+    sizes = {project: scheduling.folder_size(os.path.join(project[1], project[0])) for project in projects}
+    projects = scheduling.largest_first(projects, sizes.get)
+
+    processed_projects = 0
+    # The native detector is CPU-bound Python, the Node analyzer runs in its own processes anyway
+    executor_class = ProcessPoolExecutor if engine == "native" else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        if engine == "native":
+            future_to_project = {executor.submit(detector.analyse_project, project, parent, output_directory, metadata_provider=metadata_provider): [project] for project, parent in projects}
+        elif batch_size > 1:
+            batches = scheduling.guided_batches(projects, sizes.get, max_workers or os.cpu_count(), batch_size)
+            future_to_project = {executor.submit(run_batch, batch, output_directory, analyzer_path, metadata_provider): batch for batch in batches}
+        else:
+            future_to_project = {executor.submit(run_command, project, parent, output_directory, analyzer_path, metadata_provider): [project] for project, parent in projects}
+        for future in as_completed(future_to_project):
+            result = future.result()
+            processed_projects += len(future_to_project[future])
+            print(f"{processed_projects}/{total_projects} projects processed - {format_eta(processed_projects, total_projects, start_time)}")
+
+    elapsed_time = time.time() - start_time
+    print(f"All projects processed - Total elapsed: {format_time(elapsed_time)}")
@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+from bisect import bisect_left, bisect_right
+
+from .progress import format_time
+from .manifest import list_diagram_folders
+from .model import ClassModel
+from .sources import SOURCES
+
+# Random-access reader for extracted datasets.
+#
+# open_dataset accepts 3_Extracted-Class-Informations folders (flat or sharded) and pack files written
+# by pack_dataset. A pack holds every diagram's classes as one JSON array, followed by a table of blob
+# offsets and the diagram IDs. It is memory mapped and the tables are used in place, so opening a pack
+# does not depend on its size and a scan reads the file sequentially instead of opening one file per class.
+# Diagrams and their classes are only loaded when accessed.
+#
+#   with open_dataset("genmymodel.umlpack", "modelsdb/3_Extracted-Class-Informations") as dataset:
+#       for diagram in dataset.filter(source="modelsdb"):
+#           for uml_class in diagram.classes: ...
+
+PACK_MAGIC = b"UMLPACK\x00"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<8sIIQQI")  # magic, version, diagrams, offsets table, names table, metadata length
+DEFAULT_PACK_EXTENSION = ".umlpack"
+
+def guess_source(path):
+    """The source a dataset folder belongs to, from a data/<source>/... path."""
+    for part in reversed(os.path.abspath(path).split(os.sep)):
+        if part in SOURCES:
+            return part
+    return None
+
+class FolderPart:
+    """A 3_Extracted-Class-Informations folder, one JSON file per class."""
+
+    def __init__(self, path, source=None):
+        self.source = source or guess_source(path)
+        self.folders = list_diagram_folders(path)
+        self.positions = None
+
+    def __len__(self):
+        return len(self.folders)
+
+    def name(self, index):
+        return self.folders[index][0]
+
+    def index_of(self, name):
+        if self.positions is None:
+            self.positions = {name: index for index, (name, _) in enumerate(self.folders)}
+        return self.positions.get(name)
+
+    def class_details(self, index):
+        name, parent = self.folders[index]
+        diagram_path = os.path.join(parent, name)
+        classes = []
+        for filename in sorted(os.listdir(diagram_path)):
+            if filename.endswith(".json"):
+                with open(os.path.join(diagram_path, filename), 'r', encoding='utf-8') as f:
+                    classes.append(json.load(f))
+        return classes
+
+    def close(self):
+        pass
+
+class PackPart:
+    """A pack file, memory mapped when the platform allows it."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # Empty or not mappable (e.g. some network file systems), read it instead
+            self.buffer = self.file.read()
+        try:
+            header = PACK_HEADER.unpack_from(self.buffer, 0) if len(self.buffer) >= PACK_HEADER.size else None
+            if header is None or header[0] != PACK_MAGIC or header[1] != PACK_VERSION:
+                raise ValueError(f"{path} is not a version {PACK_VERSION} dataset pack")
+            _, _, count, offsets_position, names_position, metadata_length = header
+            self.metadata = json.loads(bytes(self.buffer[PACK_HEADER.size:PACK_HEADER.size + metadata_length]))
+            if self.metadata["byteorder"] != sys.byteorder:
+                raise ValueError(f"{path} was packed on a platform with another byte order, pack it again")
+        except Exception:
+            if isinstance(self.buffer, mmap.mmap):
+                self.buffer.close()
+            self.file.close()
+            raise
+        self.source = self.metadata.get("source")
+        self.count = count
+
+        self.view = memoryview(self.buffer)
+        self.offsets = self.view[offsets_position:offsets_position + 8 * (count + 1)].cast('Q')
+        self.name_offsets = self.view[names_position:names_position + 4 * (count + 1)].cast('I')
+        self.names_start = names_position + 4 * (count + 1)
+
+    def __len__(self):
+        return self.count
+
+    def name(self, index):
+        start = self.names_start + self.name_offsets[index]
+        return bytes(self.buffer[start:self.names_start + self.name_offsets[index + 1]]).decode('utf-8')
+
+    def index_of(self, name):
+        # pack_dataset stores the diagrams sorted by ID, so the name table is searched in place
+        index = bisect_left(PackNames(self), name)
+        return index if index < self.count and self.name(index) == name else None
+
+    def class_details(self, index):
+        return json.loads(bytes(self.buffer[self.offsets[index]:self.offsets[index + 1]]))
+
+    def close(self):
+        for view in (self.offsets, self.name_offsets, self.view):  # The map cannot be closed while viewed
+            view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+class PackNames:
+    """The diagram IDs of a pack as a sequence, decoded one at a time for bisect."""
+
+    def __init__(self, part):
+        self.part = part
+
+    def __len__(self):
+        return self.part.count
+
+    def __getitem__(self, index):
+        return self.part.name(index)
+
+class Diagram:
+    """One diagram of a dataset, its classes are read on first access."""
+
+    def __init__(self, part, index):
+        self.part = part
+        self.index = index
+        self.id = part.name(index)
+        self.source = part.source
+        self._classes = None
+
+    def class_details(self):
+        """The classes as the JSON dicts written by the extract stage."""
+        return self.part.class_details(self.index)
+
+    @property
+    def classes(self):
+        if self._classes is None:
+            self._classes = [ClassModel.from_dict(details) for details in self.class_details()]
+        return self._classes
+
+    def __len__(self):
+        return len(self.classes)
+
+    def __iter__(self):
+        return iter(self.classes)
+
+    def __repr__(self):
+        return f"Diagram({self.id!r}, source={self.source!r})"
+
+class Dataset:
+    """Diagrams of one or more parts, indexable by position or diagram ID."""
+
+    def __init__(self, parts, owns_parts=True):
+        self.parts = parts
+        self.owns_parts = owns_parts  # A filtered view shares the parts of its dataset and leaves them open
+        self.starts = []
+        total = 0
+        for part in parts:
+            self.starts.append(total)
+            total += len(part)
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def locate(self, key):
+        if isinstance(key, str):
+            for part in self.parts:
+                index = part.index_of(key)
+                if index is not None:
+                    return part, index
+            raise KeyError(key)
+        if key < 0:
+            key += self.total
+        if not 0 <= key < self.total:
+            raise IndexError(f"Diagram index {key} out of range for {self.total} diagrams")
+        part_number = bisect_right(self.starts, key) - 1
+        return self.parts[part_number], key - self.starts[part_number]
+
+    def __getitem__(self, key):
+        return Diagram(*self.locate(key))
+
+    def __contains__(self, diagram_id):
+        return any(part.index_of(diagram_id) is not None for part in self.parts)
+
+    def __iter__(self):
+        for part in self.parts:
+            for index in range(len(part)):
+                yield Diagram(part, index)
+
+    def ids(self):
+        for part in self.parts:
+            for index in range(len(part)):
+                yield part.name(index)
+
+    def iter_classes(self):
+        """Yields (diagram, ClassModel) over the whole dataset."""
+        for diagram in self:
+            for uml_class in diagram.classes:
+                yield diagram, uml_class
+
+    def filter(self, source):
+        return Dataset([part for part in self.parts if part.source == source], owns_parts=False)
+
+    def sources(self):
+        return sorted({part.source for part in self.parts if part.source})
+
+    def close(self):
+        if self.owns_parts:
+            for part in self.parts:
+                part.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_dataset(*paths, source=None):
+    """Opens extracted folders and pack files as one Dataset, source labels folders that are not below data/<source>."""
+    parts = []
+    try:
+        for path in paths:
+            parts.append(FolderPart(path, source) if os.path.isdir(path) else PackPart(path))
+    except Exception:
+        for part in parts:
+            part.close()
+        raise
+    return Dataset(parts)
+
+def pack_dataset(folder_path, pack_path, source=None):
+    """Writes the diagrams of an extracted folder into one pack file."""
+    start_time = time.time()
+    part = FolderPart(folder_path, source)
+    total_diagrams = len(part)
+    metadata = json.dumps({"source": part.source, "byteorder": sys.byteorder, "folder": os.path.abspath(folder_path)}).encode('utf-8')
+
+    offsets = []
+    names = []
+    temporary_path = f"{pack_path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(b"\0" * PACK_HEADER.size)  # Written once the tables are placed
+        f.write(metadata)
+        for index in range(total_diagrams):
+            offsets.append(f.tell())
+            f.write(json.dumps(part.class_details(index), separators=(',', ':')).encode('utf-8'))
+            names.append(part.name(index).encode('utf-8'))
+            if (index + 1) % 1000 == 0 or index + 1 == total_diagrams:
+                print(f"Packed {index + 1}/{total_diagrams} diagrams - Elapsed: {format_time(time.time() - start_time)}")
+        offsets.append(f.tell())
+
+        f.write(b"\0" * (-f.tell() % 8))  # The tables are read in place and stay aligned
+        offsets_position = f.tell()
+        f.write(struct.pack(f"={len(offsets)}Q", *offsets))
+        names_position = f.tell()
+        name_offsets = [0]
+        for name in names:
+            name_offsets.append(name_offsets[-1] + len(name))
+        f.write(struct.pack(f"={len(name_offsets)}I", *name_offsets))
+        f.write(b"".join(names))
+
+        f.seek(0)
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, total_diagrams, offsets_position, names_position, len(metadata)))
+    os.replace(temporary_path, pack_path)
+    print(f"Packed {total_diagrams} diagrams into {pack_path} - Total elapsed: {format_time(time.time() - start_time)}")
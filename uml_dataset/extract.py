@@ -0,0 +1,108 @@
+import os
+import shutil
+import json
+import time
+
+from .progress import format_eta
+from .instrumentation import file_record, span, count_bytes
+from .manifest import load_manifest, output_path, prepare_layout, load_verdicts, has_class_verdict
+from .xmi import is_uml_class_diagram, extract_class_details
+from . import sharding
+
+def diagram_name(filename):
+    # Kept as rstrip for stable folder names across re-runs of the published dataset
+    # (it strips any trailing '.', 'x', 'm', 'i' characters, not just the extension)
+    return filename.rstrip('.xmi')
+
+def write_class_details(class_details, output_directory_path, filename, errors_list):
+    """Writes one JSON file per class, returns (amount_classes, error_in_parsing)."""
+    os.makedirs(output_directory_path, exist_ok=True)
+
+    error_in_parsing = False
+    amount_classes = 0
+
+    for class_name, details in class_details.items():
+        class_name_file_path = details["file_path"]
+        amount_classes += 1
+        class_file_path = os.path.join(output_directory_path, f"{class_name_file_path}.json")
+        try:
+            with span("serialize"):
+                serialized = json.dumps(details, indent=4)
+            with span("write"), open(class_file_path, 'w') as class_file:
+                class_file.write(serialized)
+        except Exception as e:
+            print("Source Filename: "+filename)
+            print(f"An error occurred: {e}")
+            print("Skipping this file")
+            error_in_parsing = True
+            errors_list.append(f"Source Filename: {filename} - An error occurred: {e}")
+
+    if error_in_parsing and os.path.exists(output_directory_path):
+        shutil.rmtree(output_directory_path)
+    return amount_classes, error_in_parsing
+
+def process_folder(path_to_folder, output_folder, extensions=(".xmi",), layout="flat"):
+    # Check if output directory exists, if so, delete it
+    if os.path.exists(output_folder):
+        shutil.rmtree(output_folder)
+
+    # Recreate the output directory
+    os.makedirs(output_folder)
+    prepare_layout(output_folder, layout)
+
+    # Initialize counters
+    processed_files = 0
+    processed_classes = 0
+    successfull_processed_classes = 0
+
+    # Start the timer
+    start_time = time.time()
+
+    errors_list = []
+    trusted_verdicts = 0
+
+    # Check if the path exists and it's a directory
+    if os.path.exists(path_to_folder) and os.path.isdir(path_to_folder):
+        # Recursive, so a sharded filter output is read as well
+        relative_paths = sharding.select([entry.path for entry in load_manifest(path_to_folder, extensions, recursive=True)])
+        total_files = len(relative_paths)
+        verdicts = load_verdicts(path_to_folder)  # Written by the filter stage for its output folder
+
+        for relative_path in relative_paths:
+            processed_files += 1  # Update processed files counter
+
+            filepath = os.path.join(path_to_folder, relative_path)
+            filename = os.path.basename(relative_path)
+            with file_record(filepath):
+                with span("read"), open(filepath, 'rb') as file:  # Bytes, decoded by the parser as the XML declaration says
+                    content = file.read()
+                count_bytes(len(content))
+
+                with span("verdict"):  # Hash and lookup only, the parser is not involved
+                    is_trusted = has_class_verdict(verdicts, relative_path, content)
+                trusted_verdicts += is_trusted
+
+                if is_trusted or is_uml_class_diagram(content):
+
+                    # Extract class details from the content
+                    class_details = extract_class_details(content)
+
+                    # Create a directory with the filename (without .xmi) inside the output folder
+                    output_directory_path = output_path(output_folder, diagram_name(filename), layout)
+                    amount_classes, error_in_parsing = write_class_details(class_details, output_directory_path, filename, errors_list)
+
+                    processed_classes += amount_classes
+                    if(error_in_parsing==False):
+                        successfull_processed_classes += amount_classes  # Update found diagrams counter
+
+            print(f"Processed {processed_files}/{total_files} files - classes found: {successfull_processed_classes}/{processed_classes} - {format_eta(processed_files, total_files, start_time)}")
+
+        if verdicts:
+            print(f"Skipped the class diagram detection of {trusted_verdicts}/{total_files} files with a matching filter verdict")
+    else:
+        print(f"{path_to_folder} is not a valid directory")
+
+    for error in errors_list:
+        print(error)
+
+    print("Finished")
@@ -0,0 +1,90 @@
+import os
+import shutil
+import time
+
+from .progress import format_eta
+from .instrumentation import file_record, span, count_bytes
+from .xmi import count_class_elements
+from . import prefilter
+from . import sharding
+from .manifest import load_manifest, output_path, prepare_layout, content_hash, write_verdicts
+
+def iter_diagram_files(path_to_folder, extensions):
+    """Yields (relative path, dirpath, filename) of all diagram files below path_to_folder."""
+    for entry in load_manifest(path_to_folder, extensions, recursive=True):
+        relative_directory, filename = os.path.split(entry.path)
+        yield entry.path, os.path.join(path_to_folder, relative_directory), filename
+
+def process_folder(path_to_folder, output_folder, extensions=(".xmi",), layout="flat", known_negatives=None):
+    """known_negatives: paths relative to path_to_folder that a source already classified as no class diagram."""
+    known_negatives = known_negatives or set()
+
+    # Check if output directory exists, if so, delete it
+    if os.path.exists(output_folder):
+        shutil.rmtree(output_folder)
+
+    # Recreate the output directory
+    os.makedirs(output_folder)
+    prepare_layout(output_folder, layout)
+
+    # Initialize counters
+    processed_files = 0
+    found_diagrams = 0
+    rejected_files = 0
+    known_negative_files = 0
+    verdicts = {}
+    start_time = time.time()
+
+    # Check if the path exists and it's a directory
+    if os.path.exists(path_to_folder) and os.path.isdir(path_to_folder):
+        diagram_files = sharding.select(list(iter_diagram_files(path_to_folder, extensions)), key=lambda diagram_file: diagram_file[2])
+        total_files = len(diagram_files)
+
+        for relative_path, dirpath, filename in diagram_files:
+            processed_files += 1  # Update processed files counter
+
+            filepath = os.path.join(dirpath, filename)
+            if relative_path in known_negatives:
+                known_negative_files += 1  # Classified by the source, neither read nor parsed
+            else:
+                try:
+                    with file_record(filepath):
+                        # Files without a class marker are rejected through a memory map, without reading them
+                        with span("prefilter"):
+                            is_candidate = not prefilter.enabled or prefilter.file_may_contain_class(filepath)
+
+                        if not is_candidate:
+                            rejected_files += 1
+                        else:
+                            with span("read"), open(filepath, 'rb') as file:  # Open file in binary mode
+                                raw_content = file.read()
+                            count_bytes(len(raw_content))
+
+                            # The parser decodes the bytes as the XML declaration says
+                            amount_classes = count_class_elements(raw_content, prefiltered=True)
+                            if amount_classes:
+                                found_diagrams += 1  # Update found diagrams counter
+
+                                # Copy UML class diagram files unchanged to the output folder, so the declared encoding stays valid
+                                output_filepath = output_path(output_folder, filename, layout)
+                                with span("write"):
+                                    with open(output_filepath, 'wb') as file:
+                                        file.write(raw_content)
+                                    verdicts[os.path.relpath(output_filepath, output_folder)] = {"hash": content_hash(raw_content), "classes": amount_classes}
+
+                except Exception as e:
+                    print(f"An error occurred while processing file {filename}: {e}")
+
+            # Print progress
+            print(f"Processed {processed_files}/{total_files} files - found class diagrams: {found_diagrams} - {format_eta(processed_files, total_files, start_time)}")
+
+        write_verdicts(output_folder, verdicts)  # Lets the extract stage skip the detection of these files
+
+        if known_negatives:
+            print(f"Rejected {known_negative_files}/{total_files} files by their source verdict without reading them")
+        if prefilter.enabled and total_files:
+            candidates = total_files - known_negative_files - rejected_files
+            hit_rate = found_diagrams / candidates if candidates else 0
+            print(f"Prefilter rejected {rejected_files}/{total_files - known_negative_files} files without parsing - {found_diagrams}/{candidates} candidates were class diagrams ({hit_rate:.1%} hit rate)")
+    else:
+        print(f"{path_to_folder} is not a valid directory")
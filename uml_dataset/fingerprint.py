@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from .progress import format_time
+from .extract import diagram_name
+from .manifest import load_manifest
+from .dataset import guess_source
+from .sources import SOURCES
+from . import xmi
+
+# Structural fingerprints to find the same model in several diagrams, within and across sources.
+#
+# A diagram is reduced to the sorted list of its classes, each with its name, modifiers, sorted fields
+# (name, modifiers), sorted methods (name, modifiers, parameter names in signature order) and the names
+# of the classes it extends. XMI ids and the element order of the file do not take part, generalization
+# targets are resolved to class names first. Diagrams with equal fingerprints have the same structure.
+#
+# The extracted class files carry no generalizations (extends_ is always empty), so the fingerprints are
+# computed from the 2_UML-Class-Diagrams files: the classes as the extract stage would write them plus the
+# generalizations of the same document, like the graph export does.
+#
+# The index groups the diagrams of several datasets by fingerprint. In every group the first member
+# (in the order the datasets were given, then by diagram ID) is kept, the others count as duplicates.
+
+INDEX_VERSION = 2  # 2: read from the XMI with generalizations, version 1 hashed the extracted classes without them
+DEFAULT_INDEX_FILE = "diagram_fingerprints.json"
+DEFAULT_EXTENSIONS = (".xmi", ".uml")  # Folders outside data/<source>/
+
+def canonical_class(details, names_by_key, generals):
+    fields = sorted((field["name"], field["modifiers"]) for field in details["fields"].values())
+    methods = sorted((method["name"], method["modifiers"], [parameter["name"] for parameter in method["parameters"]])
+                     for method in details["methods"].values())
+    # A target outside the diagram has no name here, its id would differ between copies
+    extends = sorted(names_by_key.get(key) or "" for key in generals)
+    return [details["name"], details["modifiers"], fields, methods, extends]
+
+def canonical_diagram(class_details, generalizations):
+    """Returns the id- and order-free structure of a diagram given as class dicts and {class key: general class keys}."""
+    names_by_key = {details["key"]: details["name"] for details in class_details}
+    return sorted(canonical_class(details, names_by_key, generalizations.get(details["key"], [])) for details in class_details)
+
+def diagram_fingerprint(class_details, generalizations):
+    canonical = json.dumps(canonical_diagram(class_details, generalizations), separators=(',', ':'))
+    return hashlib.md5(canonical.encode('utf-8')).hexdigest()
+
+def document_fingerprint(root, backend):
+    """Returns (fingerprint, classes) of a parsed XMI document."""
+    class_details = list(xmi.extract_classes(root, backend).values())
+    return diagram_fingerprint(class_details, xmi.extract_generalization_map(root, backend)), len(class_details)
+
+def fingerprint_file(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            root = xmi.parse_document(f.read(), xmi.default_backend)
+        return document_fingerprint(root, xmi.default_backend)
+    except Exception as e:
+        print(f"An error occurred while reading {os.path.basename(filepath)}: {e}")
+        return None
+
+def build_index(paths, output_file=DEFAULT_INDEX_FILE, source=None, max_workers=None):
+    """Fingerprints every diagram of the given 2_UML-Class-Diagrams folders and groups them.
+
+    source labels the first folder, the others are labelled by their data/<source>/ path.
+    """
+    start_time = time.time()
+    groups = {}
+    datasets = []
+    total_diagrams = 0
+    unreadable_files = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for number, folder_path in enumerate(paths):
+            if not os.path.isdir(folder_path):
+                print(f"{folder_path} is not a valid directory")
+                continue
+            dataset_source = source if number == 0 and source else guess_source(folder_path)
+            extensions = SOURCES[dataset_source].EXTENSIONS if dataset_source in SOURCES else DEFAULT_EXTENSIONS
+            files = sorted((diagram_name(os.path.basename(entry.path)), os.path.join(folder_path, entry.path))
+                           for entry in load_manifest(folder_path, extensions, recursive=True))
+            print(f"{folder_path}: {len(files)} files")
+            diagrams = 0
+            results = executor.map(fingerprint_file, [filepath for _, filepath in files], chunksize=64)
+            for processed_files, ((name, _), result) in enumerate(zip(files, results), 1):
+                if result is None:
+                    unreadable_files += 1
+                elif result[1]:
+                    group = groups.setdefault(result[0], {"classes": result[1], "members": []})
+                    group["members"].append([dataset_source, name])
+                    diagrams += 1
+                if processed_files % 1000 == 0 or processed_files == len(files):
+                    print(f"Fingerprinted {processed_files}/{len(files)} files - distinct: {len(groups)} - Elapsed: {format_time(time.time() - start_time)}")
+            datasets.append({"source": dataset_source, "diagrams": diagrams})
+            total_diagrams += diagrams
+
+    index = [{"fingerprint": fingerprint, **group} for fingerprint, group in groups.items()]
+    index.sort(key=lambda group: (-len(group["members"]), group["fingerprint"]))
+    duplicates = total_diagrams - len(groups)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({"version": INDEX_VERSION, "paths": list(paths), "datasets": datasets, "diagrams": total_diagrams,
+                   "duplicates": duplicates, "groups": index}, f, indent=1)
+
+    cross_source = sum(1 for group in index if len({source for source, _ in group["members"]}) > 1)
+    print(f"{len(groups)} distinct structures in {total_diagrams} diagrams - duplicates: {duplicates} - groups spanning sources: {cross_source} - unreadable files: {unreadable_files} - Total elapsed: {format_time(time.time() - start_time)}")
+    return index
+
+def load_duplicates(index_file, source=None):
+    """Diagram IDs that duplicate an earlier member of their group, only those of source when given."""
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get("version") != INDEX_VERSION:
+        raise ValueError(f"{index_file} was written by another version, rebuild it")
+    return {diagram for group in index["groups"] for member_source, diagram in group["members"][1:]
+            if source is None or member_source == source}
@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import shutil
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy
+except ImportError:  # Optional, only the graph export and its reader need it
+    numpy = None
+
+from .progress import format_time
+from .extract import diagram_name
+from .manifest import load_manifest
+from . import xmi
+
+# Corpus-wide class graph of a 2_UML-Class-Diagrams folder, stored as compressed sparse row (CSR) arrays.
+#
+# Nodes are the uml:Class elements of all diagrams, numbered diagram by diagram (diagrams sorted by name,
+# classes in document order). Edges are directed and typed:
+#   generalization  specific class -> general class
+#   association     class -> class at the other end of an association (owned attribute or association ownedEnd)
+#   attribute       class -> class used as the type of a plain owned attribute
+# Only references to classes of the same diagram become edges; primitive and library types are dropped.
+#
+# The export is a folder of .npy files and graph.json. read_graph memory maps the arrays, so loading does
+# not depend on the corpus size and the graph can go straight into NumPy, SciPy or graph-learning code:
+#
+#   graph = read_graph("genmymodel_graph")
+#   graph.neighbors(node, "generalization"), graph.edge_index(), graph.in_degrees()
+
+GRAPH_VERSION = 1
+METADATA_FILE_NAME = "graph.json"
+EDGE_KINDS = ["generalization", "association", "attribute"]
+GENERALIZATION, ASSOCIATION, ATTRIBUTE = range(len(EDGE_KINDS))
+ARRAYS = ["indptr", "indices", "edge_kinds", "node_diagrams", "node_fields", "node_methods",
+          "node_name_offsets", "node_names", "node_key_offsets", "node_keys",
+          "diagram_nodes", "diagram_name_offsets", "diagram_names"]
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError("The graph export needs NumPy, install it with 'pip install numpy'")
+
+def diagram_graph(root, backend):
+    """Returns ([(key, name, fields, methods)], sorted [(source, target, kind)]) with positions in the class list."""
+    classes = []
+    positions = {}
+    for elem in xmi.unique_class_elements(root, backend):
+        class_name = xmi.getName(elem)
+        if class_name is None:
+            continue
+        class_key = xmi.getIdOfElem(elem)
+        positions.setdefault(class_key, len(classes))
+        classes.append((elem, class_key, class_name))
+
+    edges = set()
+    property_types = {}  # property id -> [type id], for the ends of associations
+    all_generalizations = xmi.extract_generalizations(root, backend)
+    for source, (elem, class_key, _) in enumerate(classes):
+        # The same generalizations the fingerprints cover, the extract stage leaves extends_ empty
+        for general in xmi.extract_class_generalizations(elem, class_key, all_generalizations, backend):
+            if general in positions:
+                edges.add((source, positions[general], GENERALIZATION))
+        for attribute_elem in backend.find_owned_attributes(elem):
+            types = xmi.references(attribute_elem, 'type')
+            property_types[xmi.getIdOfElem(attribute_elem)] = types
+            kind = ASSOCIATION if xmi.references(attribute_elem, 'association') else ATTRIBUTE
+            for target in types:
+                if target in positions:
+                    edges.add((source, positions[target], kind))
+
+    # An end owned by the association is seen from the class at the other end(s)
+    association_elements = backend.find_association_elements(root, 'xsi') + backend.find_association_elements(root, 'xmi')
+    for association_elem in dict.fromkeys(association_elements):
+        owned_ends = [(xmi.getIdOfElem(end_elem), xmi.references(end_elem, 'type')) for end_elem in backend.find_owned_ends(association_elem)]
+        property_types.update(owned_ends)
+        member_ends = xmi.references(association_elem, 'memberEnd') or [end_id for end_id, _ in owned_ends]
+        for end_id, end_types in owned_ends:
+            for other_id in member_ends:
+                if other_id == end_id:
+                    continue
+                for source in property_types.get(other_id, []):
+                    for target in end_types:
+                        if source in positions and target in positions:
+                            edges.add((positions[source], positions[target], ASSOCIATION))
+
+    nodes = [(class_key, class_name, len(backend.find_owned_attributes(elem)), len(backend.find_owned_operations(elem)))
+             for elem, class_key, class_name in classes]
+    return nodes, sorted(edges)
+
+def graph_file(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            root = xmi.parse_document(f.read(), xmi.default_backend)
+        return diagram_graph(root, xmi.default_backend)
+    except Exception as e:
+        print(f"An error occurred while reading {os.path.basename(filepath)}: {e}")
+        return None
+
+class StringTable:
+    """UTF-8 strings concatenated into one byte array, string i is bytes[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self):
+        self.offsets = array('q', [0])
+        self.data = bytearray()
+
+    def append(self, value):
+        self.data += (value or "").encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def arrays(self):
+        return numpy.frombuffer(self.offsets, dtype=numpy.int64), numpy.frombuffer(bytes(self.data), dtype=numpy.uint8)
+
+def export_graph(folder_path, output_folder, extensions=(".xmi",), max_workers=None, source=None):
+    require_numpy()
+    start_time = time.time()
+    if not (os.path.exists(folder_path) and os.path.isdir(folder_path)):
+        print(f"{folder_path} is not a valid directory")
+        return
+
+    files = sorted((diagram_name(os.path.basename(entry.path)), entry.path) for entry in load_manifest(folder_path, extensions, recursive=True))
+    total_files = len(files)
+    print(f"Total files: {total_files}")
+
+    node_diagrams, node_fields, node_methods = array('i'), array('i'), array('i')
+    node_names, node_keys, diagram_names = StringTable(), StringTable(), StringTable()
+    diagram_nodes = array('q', [0])
+    edge_sources, edge_targets, edge_kinds = array('q'), array('q'), array('B')
+    failed_files = 0
+    paths = (os.path.join(folder_path, relative_path) for _, relative_path in files)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for processed_files, ((name, _), result) in enumerate(zip(files, executor.map(graph_file, paths, chunksize=64)), 1):
+            if result is None:
+                failed_files += 1
+            elif result[0]:
+                nodes, edges = result
+                first_node = diagram_nodes[-1]
+                diagram_index = len(diagram_nodes) - 1
+                for class_key, class_name, fields, methods in nodes:
+                    node_diagrams.append(diagram_index)
+                    node_fields.append(fields)
+                    node_methods.append(methods)
+                    node_names.append(class_name)
+                    node_keys.append(class_key)
+                for source_node, target_node, kind in edges:
+                    edge_sources.append(first_node + source_node)
+                    edge_targets.append(first_node + target_node)
+                    edge_kinds.append(kind)
+                diagram_names.append(name)
+                diagram_nodes.append(first_node + len(nodes))
+            if processed_files % 1000 == 0 or processed_files == total_files:
+                print(f"Read {processed_files}/{total_files} files - classes: {len(node_diagrams)} - edges: {len(edge_kinds)} - Elapsed: {format_time(time.time() - start_time)}")
+
+    total_nodes = len(node_diagrams)
+    index_type = numpy.int32 if total_nodes < 2 ** 31 else numpy.int64
+    # Edges arrive grouped by diagram and sorted within it, so the sources are already ascending
+    sources = numpy.frombuffer(edge_sources, dtype=numpy.int64)
+    indptr = numpy.zeros(total_nodes + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(sources, minlength=total_nodes), out=indptr[1:])
+    node_name_offsets, node_name_bytes = node_names.arrays()
+    node_key_offsets, node_key_bytes = node_keys.arrays()
+    diagram_name_offsets, diagram_name_bytes = diagram_names.arrays()
+    arrays = {
+        "indptr": indptr,
+        "indices": numpy.frombuffer(edge_targets, dtype=numpy.int64).astype(index_type),
+        "edge_kinds": numpy.frombuffer(edge_kinds, dtype=numpy.uint8),
+        "node_diagrams": numpy.frombuffer(node_diagrams, dtype=numpy.int32),
+        "node_fields": numpy.frombuffer(node_fields, dtype=numpy.int32),
+        "node_methods": numpy.frombuffer(node_methods, dtype=numpy.int32),
+        "node_name_offsets": node_name_offsets,
+        "node_names": node_name_bytes,
+        "node_key_offsets": node_key_offsets,
+        "node_keys": node_key_bytes,
+        "diagram_nodes": numpy.frombuffer(diagram_nodes, dtype=numpy.int64),
+        "diagram_name_offsets": diagram_name_offsets,
+        "diagram_names": diagram_name_bytes,
+    }
+    edge_counts = numpy.bincount(arrays["edge_kinds"], minlength=len(EDGE_KINDS))
+    metadata = {"version": GRAPH_VERSION, "source": source, "folder": os.path.abspath(folder_path), "edge_kinds": EDGE_KINDS,
+                "diagrams": len(diagram_nodes) - 1, "nodes": total_nodes, "edges": len(edge_kinds),
+                "edges_per_kind": dict(zip(EDGE_KINDS, edge_counts.tolist()))}
+
+    # Written next to the target and renamed, so a reader never sees a half written graph
+    temporary_folder = f"{output_folder.rstrip('/')}.{os.getpid()}.tmp"
+    if os.path.exists(temporary_folder):
+        shutil.rmtree(temporary_folder)
+    os.makedirs(temporary_folder)
+    for name, values in arrays.items():
+        numpy.save(os.path.join(temporary_folder, name + ".npy"), values)
+    with open(os.path.join(temporary_folder, METADATA_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    if os.path.exists(output_folder):
+        shutil.rmtree(output_folder)
+    os.replace(temporary_folder, output_folder)
+
+    counts = ", ".join(f"{kind}: {count}" for kind, count in metadata["edges_per_kind"].items())
+    print(f"Exported {total_nodes} classes of {metadata['diagrams']} diagrams with {len(edge_kinds)} edges ({counts}) to {output_folder} - unreadable files: {failed_files} - Total elapsed: {format_time(time.time() - start_time)}")
+    return metadata
+
+class ClassGraph:
+    """The arrays of an exported graph, memory mapped unless mmap_mode is None."""
+
+    def __init__(self, folder_path, mmap_mode='r'):
+        require_numpy()
+        with open(os.path.join(folder_path, METADATA_FILE_NAME), 'r', encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        if self.metadata.get("version") != GRAPH_VERSION:
+            raise ValueError(f"{folder_path} was exported by another version, export it again")
+        for name in ARRAYS:
+            setattr(self, name, numpy.load(os.path.join(folder_path, name + ".npy"), mmap_mode=mmap_mode))
+        self.source = self.metadata["source"]
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def kind_code(self, kind):
+        return EDGE_KINDS.index(kind) if isinstance(kind, str) else kind
+
+    def neighbors(self, node, kind=None):
+        """Targets of the outgoing edges of a node, only those of one edge kind when given."""
+        start, end = self.indptr[node], self.indptr[node + 1]
+        targets = self.indices[start:end]
+        if kind is None:
+            return numpy.asarray(targets)
+        return numpy.asarray(targets[self.edge_kinds[start:end] == self.kind_code(kind)])
+
+    def edge_index(self, kind=None):
+        """The edges as a 2 x E array of (source, target) rows."""
+        sources = numpy.repeat(numpy.arange(self.num_nodes, dtype=self.indices.dtype), numpy.diff(self.indptr))
+        edges = numpy.stack([sources, self.indices])
+        return edges if kind is None else edges[:, self.edge_kinds == self.kind_code(kind)]
+
+    def out_degrees(self, kind=None):
+        if kind is None:
+            return numpy.diff(self.indptr)
+        return numpy.bincount(self.edge_index(kind)[0], minlength=self.num_nodes)
+
+    def in_degrees(self, kind=None):
+        targets = self.indices if kind is None else self.indices[self.edge_kinds == self.kind_code(kind)]
+        return numpy.bincount(targets, minlength=self.num_nodes)
+
+    def to_scipy(self, kind=None):
+        """The adjacency matrix as scipy.sparse.csr_matrix (SciPy has to be installed)."""
+        from scipy.sparse import csr_matrix
+        if kind is None:
+            return csr_matrix((numpy.ones(self.num_edges, dtype=numpy.int8), self.indices, self.indptr), shape=(self.num_nodes, self.num_nodes))
+        sources, targets = self.edge_index(kind)
+        return csr_matrix((numpy.ones(len(sources), dtype=numpy.int8), (sources, targets)), shape=(self.num_nodes, self.num_nodes))
+
+    def node_name(self, node):
+        return bytes(self.node_names[self.node_name_offsets[node]:self.node_name_offsets[node + 1]]).decode('utf-8')
+
+    def node_key(self, node):
+        return bytes(self.node_keys[self.node_key_offsets[node]:self.node_key_offsets[node + 1]]).decode('utf-8')
+
+    @property
+    def num_diagrams(self):
+        return len(self.diagram_nodes) - 1
+
+    def diagram_name(self, diagram):
+        return bytes(self.diagram_names[self.diagram_name_offsets[diagram]:self.diagram_name_offsets[diagram + 1]]).decode('utf-8')
+
+    def diagram_of(self, node):
+        return int(self.node_diagrams[node])
+
+    def diagram_node_range(self, diagram):
+        """The nodes of one diagram, they are numbered consecutively."""
+        return range(int(self.diagram_nodes[diagram]), int(self.diagram_nodes[diagram + 1]))
+
+def read_graph(folder_path, mmap_mode='r'):
+    return ClassGraph(folder_path, mmap_mode)
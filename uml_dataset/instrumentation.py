@@ -0,0 +1,207 @@
+import os
+import sys
+import csv
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+import statistics
+from collections import Counter
+
+from .progress import format_time
+
+# Per-file stage timings and opt-in profiling for the processing commands.
+#
+# A file_record(path) groups the spans measured while that file is processed, span(stage) adds the
+# time spent in one stage to the current record of the thread. Tracing is off by default and both
+# then return a shared no-op context, so the instrumented code paths cost one function call.
+# Worker processes trace as well (the flag is passed on through the environment) and return a
+# detached record that the parent merges with merge_record.
+
+TRACE_ENVIRONMENT_VARIABLE = "UML_DATASET_TRACE"
+STAGES = ["read", "decode", "prefilter", "verdict", "parse", "detect", "extract", "serialize", "write", "http_ttfb", "http_body"]
+OUTLIER_FACTOR = 100  # Files that took this many times the median are listed in the report
+MAX_REPORTED_FILES = 20
+PROFILE_TOP_FUNCTIONS = 25
+SAMPLING_INTERVAL = 0.005
+
+enabled = os.environ.get(TRACE_ENVIRONMENT_VARIABLE) == "1"
+records = {}  # path -> {"bytes": ..., "total": ..., stage: seconds}
+
+_no_op = contextlib.nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+
+def enable():
+    global enabled
+    enabled = True
+    os.environ[TRACE_ENVIRONMENT_VARIABLE] = "1"
+
+@contextlib.contextmanager
+def _file_record(path, detached):
+    if detached:
+        record = {}
+    else:
+        with _lock:
+            record = records.setdefault(path, {})
+    previous = getattr(_local, "record", None)
+    _local.record = record
+    start_time = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["total"] = record.get("total", 0.0) + time.perf_counter() - start_time
+        _local.record = previous
+
+def file_record(path, detached=False):
+    """Attributes the spans of the current thread to path; detached records are only returned, not kept."""
+    if not enabled:
+        return _no_op
+    return _file_record(path, detached)
+
+@contextlib.contextmanager
+def _span(stage):
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = getattr(_local, "record", None)
+        if record is not None:
+            record[stage] = record.get(stage, 0.0) + time.perf_counter() - start_time
+
+def span(stage):
+    if not enabled:
+        return _no_op
+    return _span(stage)
+
+def count_bytes(amount):
+    record = getattr(_local, "record", None) if enabled else None
+    if record is not None:
+        record["bytes"] = record.get("bytes", 0) + amount
+
+def merge_record(path, worker_record):
+    """Adds a record returned by a worker process to the record of path."""
+    if not worker_record:
+        return
+    with _lock:
+        record = records.setdefault(path, {})
+        for key, value in worker_record.items():
+            record[key] = record.get(key, 0) + value
+
+def timed_get(session, url, **kwargs):
+    """session.get (or requests.get) that records the time to the response headers and the body download.
+
+    requests does not expose the connect time, it is part of http_ttfb when a new connection is opened.
+    """
+    if not enabled:
+        return session.get(url, **kwargs)
+    with span("http_ttfb"):
+        response = session.get(url, stream=True, **kwargs)
+    with span("http_body"):
+        count_bytes(len(response.content))
+    return response
+
+def write_timings(file_path):
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "bytes", "total"] + STAGES)
+        for path, record in records.items():
+            writer.writerow([path, record.get("bytes", "")] + [f"{record[key]:.6f}" if key in record else "" for key in ["total"] + STAGES])
+
+def report(timings_file=None):
+    """Prints the time per stage and the files that took OUTLIER_FACTOR times the median, optionally writes the per-file CSV."""
+    if timings_file:
+        write_timings(timings_file)
+        print(f"Per-file timings written to {timings_file}")
+    if not records:
+        return
+
+    stage_totals = {stage: sum(record.get(stage, 0.0) for record in records.values()) for stage in STAGES}
+    measured_time = sum(stage_totals.values())
+    print(f"Time per stage over {len(records)} files:")
+    for stage, seconds in stage_totals.items():
+        if seconds > 0:
+            print(f"  {stage:<10} {format_time(seconds)} {seconds:>10.3f} s {seconds / measured_time:>6.1%}")
+
+    totals = [record.get("total", 0.0) for record in records.values()]
+    median = statistics.median(totals)
+    outliers = sorted(((record.get("total", 0.0), path) for path, record in records.items()
+                       if median > 0 and record.get("total", 0.0) >= OUTLIER_FACTOR * median), reverse=True)
+    print(f"Median time per file: {median * 1000:.2f} ms - files over {OUTLIER_FACTOR}x the median: {len(outliers)}")
+    for seconds, path in outliers[:MAX_REPORTED_FILES]:
+        print(f"  {seconds:>10.3f} s {seconds / median:>8.0f}x {path}")
+
+class SamplingProfiler:
+    """Samples the stacks of all threads every interval, cheaper than cProfile on long runs."""
+
+    def __init__(self, interval=SAMPLING_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        own_thread_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def report(self, output_path=None):
+        # Collapsed stacks ("root;...;leaf count") can be rendered with flamegraph.pl or speedscope
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            print(f"Collapsed stacks written to {output_path}")
+
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        samples = sum(leaves.values())
+        print(f"{samples} samples, functions most often on top of the stack:")
+        for function, count in leaves.most_common(PROFILE_TOP_FUNCTIONS):
+            print(f"  {count / samples:>6.1%} {function}")
+
+@contextlib.contextmanager
+def profile(mode=None, output_path=None):
+    """Profiles the block with "cprofile" (calling thread only) or "sampling" (all threads of this process)."""
+    if mode is None:
+        yield
+        return
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if output_path:
+                profiler.dump_stats(output_path)
+                print(f"cProfile stats written to {output_path}")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    elif mode == "sampling":
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            profiler.report(output_path)
+    else:
+        raise ValueError(f"Unknown profile mode '{mode}', expected cprofile or sampling")
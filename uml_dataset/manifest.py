@@ -0,0 +1,146 @@
+import os
+import json
+import hashlib
+from collections import namedtuple
+
+# Single-pass directory listings shared by the stages, cached between runs.
+#
+# scan_folder walks a folder once with os.scandir and keeps size and mtime of every matching file.
+# load_manifest stores that listing in the cache folder and reuses it while the modification times
+# of all scanned directories are unchanged (adding, removing or renaming a file changes them).
+# Files rewritten in place keep their directory mtime, use --refresh_manifest after editing files.
+#
+# Output folders can use a sharded layout: every entry goes into a subfolder named after the first
+# hex digits of the MD5 of its name, which keeps directories small and evenly filled (the IDs of a
+# source often share a prefix, e.g. "_" or "https___github.com_"). A marker file records the layout.
+#
+# The filter stage leaves a verdict file in its output folder: the content hash and number of
+# class elements of every diagram it copied. The extract stage trusts a verdict whose hash matches
+# the file it reads and skips the class diagram detection, which would otherwise parse it again.
+
+CACHE_FOLDER = os.environ.get("UML_DATASET_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "uml_dataset"))
+MANIFEST_VERSION = 1
+LAYOUT_FILE_NAME = ".uml_dataset_layout"
+VERDICTS_FILE_NAME = ".uml_dataset_verdicts.json"
+LAYOUTS = ["flat", "sharded"]
+SHARD_PREFIX_LENGTH = 2
+
+refresh = False  # Set by --refresh_manifest to ignore cached listings
+
+ManifestEntry = namedtuple("ManifestEntry", ["path", "size", "mtime_ns"])  # path is relative to the scanned folder
+
+def scan_folder(path_to_folder, extensions, recursive=False):
+    """Returns (entries sorted by path, {relative directory: mtime_ns}) in one os.scandir pass."""
+    entries = []
+    directories = {}
+    pending = [""]
+    while pending:
+        relative_directory = pending.pop()
+        directory = os.path.join(path_to_folder, relative_directory)
+        directories[relative_directory] = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                relative_path = os.path.join(relative_directory, entry.name) if relative_directory else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(relative_path)
+                elif entry.name.endswith(extensions) and entry.is_file():
+                    stat = entry.stat()
+                    entries.append(ManifestEntry(relative_path, stat.st_size, stat.st_mtime_ns))
+    entries.sort()
+    return entries, directories
+
+def cache_path(path_to_folder, extensions, recursive):
+    key = json.dumps([os.path.abspath(path_to_folder), sorted(extensions), recursive])
+    return os.path.join(CACHE_FOLDER, hashlib.md5(key.encode('utf-8')).hexdigest() + ".json")
+
+def is_up_to_date(path_to_folder, directories):
+    try:
+        return all(os.stat(os.path.join(path_to_folder, directory)).st_mtime_ns == mtime_ns for directory, mtime_ns in directories.items())
+    except OSError:
+        return False
+
+def load_manifest(path_to_folder, extensions, recursive=False):
+    """Returns the ManifestEntry list of a folder, from the cache when the folder did not change."""
+    extensions = tuple(extensions)
+    manifest_path = cache_path(path_to_folder, extensions, recursive)
+    if not refresh:
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest["version"] == MANIFEST_VERSION and is_up_to_date(path_to_folder, manifest["directories"]):
+                return [ManifestEntry(*entry) for entry in manifest["files"]]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    entries, directories = scan_folder(path_to_folder, extensions, recursive)
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        temporary_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "directories": directories, "files": entries}, f)
+        os.replace(temporary_path, manifest_path)
+    except OSError as e:
+        print(f"Could not cache the listing of {path_to_folder}: {e}")
+    return entries
+
+def shard_name(name):
+    return hashlib.md5(name.encode('utf-8')).hexdigest()[:SHARD_PREFIX_LENGTH]
+
+def output_path(output_folder, name, layout="flat"):
+    """Path of an output entry: output_folder/name, or output_folder/<shard>/name in the sharded layout."""
+    if layout == "sharded":
+        return os.path.join(output_folder, shard_name(name), name)
+    return os.path.join(output_folder, name)
+
+def prepare_layout(output_folder, layout):
+    """Records the layout of a new output folder and creates all shard folders up front."""
+    if layout == "flat":
+        return
+    with open(os.path.join(output_folder, LAYOUT_FILE_NAME), 'w', encoding='utf-8') as f:
+        f.write(layout)
+    for shard in range(16 ** SHARD_PREFIX_LENGTH):
+        os.makedirs(os.path.join(output_folder, f"{shard:0{SHARD_PREFIX_LENGTH}x}"), exist_ok=True)
+
+def read_layout(folder_path):
+    try:
+        with open(os.path.join(folder_path, LAYOUT_FILE_NAME), 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return "flat"
+
+def list_diagram_folders(folder_path):
+    """Returns (name, parent folder) of every diagram folder of a flat or sharded output folder."""
+    parents = [folder_path]
+    if read_layout(folder_path) == "sharded":
+        with os.scandir(folder_path) as iterator:
+            parents = sorted(entry.path for entry in iterator if entry.is_dir(follow_symlinks=False))
+
+    folders = []
+    for parent in parents:
+        with os.scandir(parent) as iterator:
+            folders += [(entry.name, parent) for entry in iterator if entry.is_dir()]
+    return sorted(folders)  # By name, so both layouts are processed in the same order
+
+def content_hash(content):
+    return hashlib.md5(content).hexdigest()
+
+def write_verdicts(output_folder, verdicts):
+    """Stores {path relative to output_folder: {"hash": ..., "classes": ...}} next to the filtered diagrams."""
+    with open(os.path.join(output_folder, VERDICTS_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "files": verdicts}, f)
+
+def load_verdicts(folder_path):
+    """Returns the verdicts written by the filter stage into folder_path, {} if there are none."""
+    try:
+        with open(os.path.join(folder_path, VERDICTS_FILE_NAME), 'r', encoding='utf-8') as f:
+            verdicts = json.load(f)
+        if verdicts["version"] == MANIFEST_VERSION:
+            return verdicts["files"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def has_class_verdict(verdicts, relative_path, content):
+    verdict = verdicts.get(relative_path)
+    return verdict is not None and verdict["classes"] > 0 and verdict["hash"] == content_hash(content)
@@ -0,0 +1,87 @@
+import os
+import time
+import shutil
+
+from .progress import format_time
+from .manifest import LAYOUT_FILE_NAME, VERDICTS_FILE_NAME, output_path, prepare_layout, read_layout, load_verdicts, write_verdicts
+from .supervisor import FAILURES_FILE_NAME
+
+# Combines the output folders of a stage run with --shard on several machines into one folder.
+#
+# Works for every stage output: raw downloads (also with a folder per sheet), filtered diagrams, extracted
+# diagram folders, quarantine folders and data-clump reports, in the flat or the sharded layout. Entries are
+# placed by the layout of the output folder, the filter verdicts are merged and failure records are appended.
+# Shards never share an entry, an entry found in two of them is kept from the first and reported.
+
+def shard_entries(folder_path):
+    """Returns (name, path) of the entries of a stage output folder, looking into the shard folders of the sharded layout."""
+    if read_layout(folder_path) == "sharded":
+        parents = sorted(entry.path for entry in os.scandir(folder_path) if entry.is_dir(follow_symlinks=False))
+    else:
+        parents = [folder_path]
+    entries = []
+    for parent in parents:
+        with os.scandir(parent) as iterator:
+            entries += [(entry.name, entry.path) for entry in iterator if parent != folder_path or entry.name not in (LAYOUT_FILE_NAME, VERDICTS_FILE_NAME)]
+    return sorted(entries)
+
+def place(source_path, target_path, move, conflicts):
+    """Copies or moves an entry, the contents of folders that exist on both sides (e.g. a sheet folder) are merged."""
+    if not os.path.lexists(target_path):
+        if move:
+            shutil.move(source_path, target_path)
+        elif os.path.isdir(source_path):
+            shutil.copytree(source_path, target_path)
+        else:
+            shutil.copy2(source_path, target_path)
+        return 1
+    if os.path.isdir(source_path) and os.path.isdir(target_path) and not is_diagram_folder(source_path):
+        return sum(place(entry.path, os.path.join(target_path, entry.name), move, conflicts) for entry in os.scandir(source_path))
+    conflicts.append(target_path)
+    return 0
+
+def is_diagram_folder(path):
+    # An extracted diagram holds class files, merging two of them would mix different extractions
+    return any(entry.name.endswith(".json") and entry.is_file() for entry in os.scandir(path))
+
+def append_lines(source_path, target_path):
+    with open(source_path, 'r', encoding='utf-8') as source, open(target_path, 'a', encoding='utf-8') as target:
+        shutil.copyfileobj(source, target)
+
+def merge_shards(shard_folders, output_folder, layout=None, move=False):
+    """Merges the shard output folders into output_folder (created with the layout of the first shard unless given)."""
+    start_time = time.time()
+    layout = layout or read_layout(shard_folders[0])
+    if os.path.exists(output_folder) and os.listdir(output_folder) and read_layout(output_folder) != layout:
+        print(f"{output_folder} already uses the {read_layout(output_folder)} layout, pass --layout {read_layout(output_folder)} to merge into it")
+        return
+    os.makedirs(output_folder, exist_ok=True)
+    prepare_layout(output_folder, layout)
+
+    verdicts = load_verdicts(output_folder)
+    merged_entries = 0
+    conflicts = []
+    for shard_folder in shard_folders:
+        if not os.path.isdir(shard_folder):
+            print(f"{shard_folder} is not a valid directory")
+            continue
+        shard_verdicts = load_verdicts(shard_folder)
+        for relative_path, verdict in shard_verdicts.items():
+            name = os.path.basename(relative_path)
+            verdicts.setdefault(os.path.relpath(output_path(output_folder, name, layout), output_folder), verdict)
+
+        entries = 0
+        for name, path in shard_entries(shard_folder):
+            if name == FAILURES_FILE_NAME:
+                append_lines(path, os.path.join(output_folder, name))
+            else:
+                entries += place(path, output_path(output_folder, name, layout), move, conflicts)
+        merged_entries += entries
+        print(f"Merged {entries} entries of {shard_folder} - Elapsed: {format_time(time.time() - start_time)}")
+
+    if verdicts:
+        write_verdicts(output_folder, verdicts)
+    for conflict in conflicts:
+        print(f"Kept the existing {conflict}, another shard has the same entry")
+    print(f"Merged {merged_entries} entries of {len(shard_folders)} shards into {output_folder} - conflicts: {len(conflicts)} - Total elapsed: {format_time(time.time() - start_time)}")
+    return conflicts
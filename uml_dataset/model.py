@@ -0,0 +1,201 @@
+import sys
+import json
+
+# Compact in-memory form of the extracted class details, for analyses that hold many diagrams at once.
+#
+# The dicts written by extract_classes cost a few hundred bytes per field, method and parameter, most of
+# it for keys and repeated constants. The classes below keep the same values in __slots__, intern the
+# names, share one tuple per distinct modifier list and the empty tuple for empty containers, and reuse
+# the class and method key objects in their members. to_dict() rebuilds the exact JSON schema on demand
+# (same keys in the same order), so model objects can be written or handed to dict-based code unchanged.
+
+_modifier_tuples = {}
+
+def intern_string(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+def intern_modifiers(modifiers):
+    """Returns one shared tuple of interned strings per distinct modifier list."""
+    key = tuple(modifiers)
+    shared = _modifier_tuples.get(key)
+    if shared is None:
+        shared = _modifier_tuples[key] = tuple(intern_string(modifier) for modifier in key)
+    return shared
+
+def shared_key(value, owner_key):
+    # Members point to their owner by key, storing the owner's object avoids a copy per member
+    return owner_key if value == owner_key else value
+
+def frozen_items(mapping):
+    return tuple(mapping.items()) if mapping else ()
+
+class ParameterModel:
+    __slots__ = ("name", "key", "type", "has_type_variable", "position", "modifiers", "ignore", "method_key")
+
+    def __init__(self, name, key, type=None, has_type_variable=False, position=None, modifiers=(), ignore=False, method_key=None):
+        self.name = intern_string(name)
+        self.key = key
+        self.type = intern_string(type)
+        self.has_type_variable = has_type_variable
+        self.position = position
+        self.modifiers = intern_modifiers(modifiers)
+        self.ignore = ignore
+        self.method_key = method_key
+
+    @classmethod
+    def from_dict(cls, details, method_key=None):
+        return cls(details["name"], details["key"], details["type"], details["hasTypeVariable"], details["position"],
+                   details["modifiers"], details["ignore"], shared_key(details["methodKey"], method_key))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "key": self.key,
+            "type": self.type,
+            "hasTypeVariable": self.has_type_variable,
+            "position": self.position,
+            "modifiers": list(self.modifiers),
+            "ignore": self.ignore,
+            "methodKey": self.method_key
+        }
+
+class FieldModel:
+    __slots__ = ("name", "key", "type", "has_type_variable", "position", "modifiers", "ignore", "class_key")
+
+    def __init__(self, name, key, type=None, has_type_variable=False, position=None, modifiers=(), ignore=False, class_key=None):
+        self.name = intern_string(name)
+        self.key = key
+        self.type = intern_string(type)
+        self.has_type_variable = has_type_variable
+        self.position = position
+        self.modifiers = intern_modifiers(modifiers)
+        self.ignore = ignore
+        self.class_key = class_key
+
+    @classmethod
+    def from_dict(cls, details, class_key=None):
+        return cls(details["name"], details["key"], details["type"], details["hasTypeVariable"], details["position"],
+                   details["modifiers"], details["ignore"], shared_key(details["classOrInterfaceKey"], class_key))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "key": self.key,
+            "type": self.type,
+            "hasTypeVariable": self.has_type_variable,
+            "position": self.position,
+            "modifiers": list(self.modifiers),
+            "ignore": self.ignore,
+            "classOrInterfaceKey": self.class_key
+        }
+
+class MethodModel:
+    __slots__ = ("name", "key", "type", "has_type_variable", "position", "modifiers", "override_annotation",
+                 "return_type", "parameters", "class_key")
+
+    def __init__(self, name, key, type=None, has_type_variable=False, position=None, modifiers=(), override_annotation=False,
+                 return_type=None, parameters=(), class_key=None):
+        self.name = intern_string(name)
+        self.key = key
+        self.type = intern_string(type)
+        self.has_type_variable = has_type_variable
+        self.position = position
+        self.modifiers = intern_modifiers(modifiers)
+        self.override_annotation = override_annotation
+        self.return_type = intern_string(return_type)
+        self.parameters = tuple(parameters)
+        self.class_key = class_key
+
+    @classmethod
+    def from_dict(cls, details, class_key=None):
+        key = details["key"]
+        parameters = tuple(ParameterModel.from_dict(parameter, key) for parameter in details["parameters"])
+        return cls(details["name"], key, details["type"], details["hasTypeVariable"], details["position"], details["modifiers"],
+                   details["overrideAnnotation"], details["returnType"], parameters, shared_key(details["classOrInterfaceKey"], class_key))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "key": self.key,
+            "type": self.type,
+            "hasTypeVariable": self.has_type_variable,
+            "position": self.position,
+            "modifiers": list(self.modifiers),
+            "overrideAnnotation": self.override_annotation,
+            "returnType": self.return_type,
+            "parameters": [parameter.to_dict() for parameter in self.parameters],
+            "classOrInterfaceKey": self.class_key
+        }
+
+class ClassModel:
+    __slots__ = ("name", "key", "type", "has_type_variable", "position", "modifiers", "fields", "methods", "file_path",
+                 "anonymous", "auxclass", "implements", "extends", "defined_in_key", "inner_classes", "inner_interfaces", "extra")
+
+    def __init__(self, name, key, type="class", has_type_variable=False, position=None, modifiers=(), fields=(), methods=(),
+                 file_path=None, anonymous=False, auxclass=False, implements=(), extends=(), defined_in_key=None,
+                 inner_classes=(), inner_interfaces=(), extra=None):
+        self.name = intern_string(name)
+        self.key = key
+        self.type = intern_string(type)
+        self.has_type_variable = has_type_variable
+        self.position = position
+        self.modifiers = intern_modifiers(modifiers)
+        self.fields = tuple(fields)
+        self.methods = tuple(methods)
+        self.file_path = file_path
+        self.anonymous = anonymous
+        self.auxclass = auxclass
+        self.implements = tuple(implements)
+        self.extends = tuple(extends)
+        self.defined_in_key = defined_in_key
+        self.inner_classes = tuple(inner_classes)  # (name, details) pairs
+        self.inner_interfaces = tuple(inner_interfaces)
+        self.extra = extra  # Keys outside the extractor's schema, None for its own output
+
+    @classmethod
+    def from_dict(cls, details):
+        key = details["key"]
+        fields = tuple(FieldModel.from_dict(field, key) for field in details["fields"].values())
+        methods = tuple(MethodModel.from_dict(method, key) for method in details["methods"].values())
+        extra = {name: value for name, value in details.items() if name not in CLASS_KEYS} or None
+        return cls(details["name"], key, details["type"], details["hasTypeVariable"], details["position"], details["modifiers"],
+                   fields, methods, details["file_path"], details["anonymous"], details["auxclass"], details["implements_"],
+                   details["extends_"], details["definedInClassOrInterfaceTypeKey"], frozen_items(details["innerDefinedClasses"]),
+                   frozen_items(details["innerDefinedInterfaces"]), extra)
+
+    def to_dict(self):
+        details = {
+            "name": self.name,
+            "key": self.key,
+            "type": self.type,
+            "hasTypeVariable": self.has_type_variable,
+            "position": self.position,
+            "modifiers": list(self.modifiers),
+            "fields": {field.name: field.to_dict() for field in self.fields},
+            "methods": {method.name: method.to_dict() for method in self.methods},
+            "file_path": self.file_path,
+            "anonymous": self.anonymous,
+            "auxclass": self.auxclass,
+            "implements_": list(self.implements),
+            "extends_": list(self.extends),
+            "definedInClassOrInterfaceTypeKey": self.defined_in_key,
+            "innerDefinedClasses": dict(self.inner_classes),
+            "innerDefinedInterfaces": dict(self.inner_interfaces)
+        }
+        if self.extra:
+            details.update(self.extra)
+        return details
+
+    def __repr__(self):
+        return f"ClassModel({self.name!r}, {len(self.fields)} fields, {len(self.methods)} methods)"
+
+CLASS_KEYS = {"name", "key", "type", "hasTypeVariable", "position", "modifiers", "fields", "methods", "file_path", "anonymous",
+              "auxclass", "implements_", "extends_", "definedInClassOrInterfaceTypeKey", "innerDefinedClasses", "innerDefinedInterfaces"}
+
+def models_from_class_details(class_details):
+    """Converts the {class name: details} result of extract_class_details."""
+    return [ClassModel.from_dict(details) for details in class_details.values()]
+
+def load_class_file(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return ClassModel.from_dict(json.load(f))
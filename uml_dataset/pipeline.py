@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .progress import format_time
+from .instrumentation import file_record, span, merge_record, timed_get
+from .extract import diagram_name, write_class_details
+from . import xmi
+from . import prefilter
+from .manifest import output_path, prepare_layout
+
+# Streams every downloaded payload through class-diagram detection and extraction in memory.
+# Stages are connected by bounded queues, so a slow stage throttles the ones before it:
+#
+#   jobs -> [download threads] -> payloads -> [detect + extract processes] -> results -> [writer thread]
+#
+# Only the raw download (1_UML-Diagrams) and the extracted classes (3_Extracted-Class-Informations)
+# are written, the 2_UML-Class-Diagrams copy is skipped.
+
+DOWNLOAD_WORKERS = 20
+QUEUE_SIZE = 256
+DOWNLOAD_TIMEOUT = 30
+_DONE = object()
+
+def fetch_payload(session, url, raw_path):
+    """Returns the diagram bytes, from disk when it was downloaded before, or None on failure."""
+    if os.path.isfile(raw_path):
+        with span("read"), open(raw_path, 'rb') as file:
+            return file.read()
+
+    import requests
+    try:
+        response = timed_get(session, url, timeout=DOWNLOAD_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Request failed: {e}", file=sys.stderr)
+        return None
+    if response.status_code != 200:
+        print(f"Failed to retrieve {url}: {response.status_code}", file=sys.stderr)
+        return None
+
+    os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+    with span("write"), open(raw_path, 'wb') as file:
+        file.write(response.content)
+    return response.content
+
+def process_payload(relative_path, raw_content):
+    """Runs in a worker process: returns (relative_path, class_details or None when no class diagram, stage timings or None)."""
+    with file_record(relative_path, detached=True) as record:
+        with span("prefilter"):
+            is_candidate = not prefilter.enabled or prefilter.may_contain_class(raw_content)
+        class_details = None
+        if is_candidate:
+            # Parsed once for detection and extraction, from the same byte input as the filter stage
+            backend = xmi.default_backend
+            try:
+                root = xmi.parse_document(raw_content, backend)
+                with span("detect"):
+                    is_class_diagram = bool(backend.has_class_element(root))
+                if is_class_diagram:
+                    class_details = {}  # A class diagram whose extraction fails still counts as one
+                    with span("extract"):
+                        class_details = xmi.extract_classes(root, backend)
+            except Exception as e:
+                print(f"An error occurred: {e}")
+    return relative_path, class_details, record
+
+def run_pipeline(jobs, raw_folder, output_folder, download_workers=DOWNLOAD_WORKERS, process_workers=None, queue_size=QUEUE_SIZE, layout="flat"):
+    import requests
+
+    os.makedirs(output_folder, exist_ok=True)
+    prepare_layout(output_folder, layout)
+
+    job_queue = queue.Queue(maxsize=queue_size)
+    payload_queue = queue.Queue(maxsize=queue_size)
+    result_queue = queue.Queue()  # bounded by in_flight below
+    in_flight = threading.BoundedSemaphore(queue_size)
+
+    stats = {"downloaded": 0, "failed": 0, "processed": 0, "class_diagrams": 0, "classes": 0}
+    stats_lock = threading.Lock()
+    errors_list = []
+    start_time = time.time()
+
+    def produce_jobs():
+        try:
+            for job in jobs:
+                job_queue.put(job)
+        finally:
+            for _ in range(download_workers):
+                job_queue.put(_DONE)
+
+    def download_worker():
+        try:
+            session = requests.Session()  # keeps connections to the source alive between diagrams
+            while True:
+                job = job_queue.get()
+                if job is _DONE:
+                    break
+                relative_path, url = job
+                try:
+                    with file_record(relative_path):
+                        content = fetch_payload(session, url, os.path.join(raw_folder, relative_path))
+                except OSError as e:  # e.g. the raw folder cannot be written, the other jobs may still succeed
+                    print(f"Could not store {relative_path}: {e}", file=sys.stderr)
+                    content = None
+                with stats_lock:
+                    stats["downloaded" if content is not None else "failed"] += 1
+                if content is not None:
+                    payload_queue.put((relative_path, content))
+        finally:
+            payload_queue.put(_DONE)  # Also when the thread fails, the main loop counts the finished downloaders
+
+    def write_results():
+        while True:
+            item = result_queue.get()
+            if item is _DONE:
+                break
+            relative_path, class_details, error = item
+            filename = os.path.basename(relative_path)
+            if error is not None:
+                errors_list.append(f"Source Filename: {filename} - An error occurred: {error}")
+            elif class_details is not None:
+                with file_record(relative_path):
+                    amount_classes, error_in_parsing = write_class_details(class_details, output_path(output_folder, diagram_name(filename), layout), filename, errors_list)
+                stats["class_diagrams"] += 1
+                if not error_in_parsing:
+                    stats["classes"] += amount_classes
+            stats["processed"] += 1
+            elapsed_time = time.time() - start_time
+            print(f"Downloaded: {stats['downloaded']} / Failed: {stats['failed']} - processed {stats['processed']} files - class diagrams: {stats['class_diagrams']} - classes: {stats['classes']} - Elapsed: {format_time(elapsed_time)}")
+
+    def on_processed(future):
+        try:
+            relative_path, class_details, record = future.result()
+            merge_record(relative_path, record)
+            result_queue.put((relative_path, class_details, None))
+        except Exception as e:
+            result_queue.put((future.relative_path, None, e))
+        finally:
+            in_flight.release()
+
+    threads = [threading.Thread(target=produce_jobs, daemon=True)]
+    threads += [threading.Thread(target=download_worker, daemon=True) for _ in range(download_workers)]
+    writer = threading.Thread(target=write_results, daemon=True)
+    for thread in threads + [writer]:
+        thread.start()
+
+    with ProcessPoolExecutor(max_workers=process_workers) as executor:
+        finished_downloaders = 0
+        while finished_downloaders < download_workers:
+            item = payload_queue.get()
+            if item is _DONE:
+                finished_downloaders += 1
+                continue
+            in_flight.acquire()
+            future = executor.submit(process_payload, *item)
+            future.relative_path = item[0]
+            future.add_done_callback(on_processed)
+
+    result_queue.put(_DONE)
+    writer.join()
+
+    for error in errors_list:
+        print(error)
+
+    elapsed_time = time.time() - start_time
+    print(f"Finished - {stats['downloaded']} downloaded / {stats['failed']} failed - class diagrams: {stats['class_diagrams']} - classes: {stats['classes']} in {format_time(elapsed_time)}")
+    return stats
@@ -0,0 +1,60 @@
+import os
+import re
+import mmap
+
+# Byte-level quick reject in front of the XML parser.
+#
+# The class queries match packagedElement elements whose xsi:type or xmi:type attribute is the
+# literal 'uml:Class', so a class diagram stored in an ASCII compatible encoding contains the bytes
+# b"uml:Class". Files without them are rejected without parsing. To never reject a class diagram,
+# the marker is also searched after expanding numeric character references, and files that could
+# spell it differently (UTF-16/32, DTD entities) always go on to the full check.
+
+MARKER = b"uml:Class"
+TEXT_MARKER = MARKER.decode('ascii')
+NON_ASCII_BOMS = (b"\xfe\xff", b"\xff\xfe", b"\x00\x00\xfe\xff", b"\x4c\x6f\xa7\x94")  # UTF-16/32, EBCDIC
+CHARACTER_REFERENCE = re.compile(rb"&#(x[0-9a-fA-F]+|[0-9]+);")
+
+# Switched off with --no_prefilter to compare against full parsing. The environment variable carries the
+# choice into worker processes, which do not inherit the module state under the spawn start method.
+ENVIRONMENT_VARIABLE = "UML_DATASET_PREFILTER"
+enabled = os.environ.get(ENVIRONMENT_VARIABLE, "on") != "off"
+
+def disable():
+    global enabled
+    enabled = False
+    os.environ[ENVIRONMENT_VARIABLE] = "off"
+
+def expand_character_reference(match):
+    value = match.group(1)
+    code = int(value[1:], 16) if value.startswith(b"x") else int(value)
+    return bytes([code]) if code < 128 else match.group(0)
+
+def may_contain_class(data):
+    """False when data (bytes, mmap or str) cannot be a UML class diagram, True when it has to be parsed."""
+    if isinstance(data, str):
+        if TEXT_MARKER in data:
+            return True
+        if "&#" not in data and "<!ENTITY" not in data:
+            return False
+        data = data.encode('utf-8')
+    elif data.find(MARKER) != -1:
+        return True
+
+    head = data[:4]
+    if head.startswith(NON_ASCII_BOMS) or b"\x00" in head:
+        return True
+    if data.find(b"<!ENTITY") != -1:
+        return True
+    if data.find(b"&#") == -1:
+        return False
+    return MARKER in CHARACTER_REFERENCE.sub(expand_character_reference, bytes(data))
+
+def file_may_contain_class(filepath):
+    """Checks a file through a memory map, without reading it into memory."""
+    with open(filepath, 'rb') as file:
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return may_contain_class(mapped)
+        except ValueError:  # Empty files cannot be mapped and cannot be parsed
+            return False
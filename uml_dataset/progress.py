@@ -0,0 +1,16 @@
+import time
+
+def format_time(seconds):
+    # Convert seconds to hours, minutes, and seconds, then format as XXh YYm ZZs
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02d}h {int(minutes):02d}m {int(seconds):02d}s"
+
+def format_eta(processed, total, start_time):
+    """Returns the "Time left: ... - Elapsed: ..." suffix of the progress lines."""
+    elapsed_time = time.time() - start_time
+    if processed > 1:  # Avoid a meaningless estimate on the first item
+        estimated_total_time = elapsed_time / processed * total
+        time_left = estimated_total_time - elapsed_time
+        return f"Time left: {format_time(time_left)} - Elapsed: {format_time(elapsed_time)}"
+    return f"Elapsed: {format_time(elapsed_time)}"
@@ -0,0 +1,47 @@
+import os
+
+# Work ordering for the parallel stages.
+#
+# Workers take the next task whenever they finish one, so the run only ends late when a large task is
+# handed out last and every other worker idles while it finishes. Handing out the largest tasks first
+# (longest processing time first) leaves the small ones to fill the gaps at the end, and batches that
+# shrink towards the end (guided scheduling) keep the startup cost of batching low without a long last
+# batch. The size of a file or diagram folder is the cost estimate, the stages already know it from
+# their manifests or get it from one os.scandir per folder.
+
+GUIDED_FACTOR = 2  # A batch takes at most 1/(factor * workers) of the remaining work
+
+def largest_first(items, size):
+    """Returns the items sorted by descending size, equal sizes keep their order."""
+    return sorted(items, key=lambda item: -size(item))
+
+def folder_size(path):
+    """Bytes of the files directly inside a folder, e.g. the class files of an extracted diagram."""
+    try:
+        with os.scandir(path) as iterator:
+            return sum(entry.stat().st_size for entry in iterator if entry.is_file())
+    except OSError:
+        return 0
+
+def guided_batches(items, size, workers, max_batch_size):
+    """Splits items (ordered largest first) into batches of at most max_batch_size items that shrink towards the end.
+
+    A batch is closed once it holds 1/(GUIDED_FACTOR * workers) of the remaining size, so a large item gets a batch
+    of its own and the small ones at the end are grouped until the batches run out with the work.
+    """
+    workers = max(workers or 1, 1)
+    remaining = sum(size(item) for item in items)
+    batches = []
+    batch, batch_size = [], 0
+    for item in items:
+        if not batch:
+            target = remaining / (GUIDED_FACTOR * workers)
+        batch.append(item)
+        batch_size += size(item)
+        if len(batch) >= max_batch_size or batch_size >= target:
+            batches.append(batch)
+            remaining -= batch_size
+            batch, batch_size = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
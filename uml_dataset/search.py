@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+from array import array
+from bisect import bisect_left
+from urllib.request import pathname2url
+from concurrent.futures import ProcessPoolExecutor
+
+from .progress import format_time
+from .manifest import list_diagram_folders
+
+# Inverted index over the class, field, method and parameter names of a 3_Extracted-Class-Informations folder.
+#
+# Every class JSON file is one document. For every (kind, lowercased name) the index stores the sorted ids
+# of the documents containing it as a packed uint32 postings list in an SQLite file, so a query reads only
+# the postings it needs from disk instead of loading the index. Prefix terms are a range scan over the
+# primary key. Conjunctive queries start from the smallest clause and check its documents against the
+# other postings with a binary search (or a set when both are large), which keeps frequent terms like field:id cheap.
+#
+# Query syntax: "class:Customer field:address method:get* parameter:id", a term without kind matches any
+# kind. All clauses have to match the same class, matching is case-insensitive.
+
+INDEX_VERSION = 1
+KINDS = ["class", "field", "method", "parameter"]
+DEFAULT_INDEX_FILE = "search_index.sqlite"
+DEFAULT_LIMIT = 20
+POSTING_TYPE = 'I'  # uint32 document ids
+BISECT_RATIO = 16  # Candidates are binary searched in postings lists this many times longer
+
+def class_terms(class_details):
+    """Returns {kind: set of lowercased names} of one class."""
+    terms = {kind: set() for kind in KINDS}
+    if class_details.get("name"):
+        terms["class"].add(class_details["name"].lower())
+    for field in class_details.get("fields", {}).values():
+        terms["field"].add(field["name"].lower())
+    for method in class_details.get("methods", {}).values():
+        terms["method"].add(method["name"].lower())
+        for parameter in method.get("parameters", []):
+            terms["parameter"].add(parameter["name"].lower())
+    return terms
+
+def index_diagram(diagram_path, folder_path):
+    """Returns (relative path, class key, class name, terms) of every class file of one diagram."""
+    documents = []
+    try:
+        for filename in sorted(os.listdir(diagram_path)):
+            if not filename.endswith(".json"):
+                continue
+            file_path = os.path.join(diagram_path, filename)
+            with open(file_path, 'r', encoding='utf-8') as f:
+                class_details = json.load(f)
+            documents.append((os.path.relpath(file_path, folder_path), class_details.get("key"), class_details.get("name"), class_terms(class_details)))
+    except Exception as e:
+        print(f"An error occurred while reading diagram {os.path.basename(diagram_path)}: {e}")
+    return documents
+
+def _index_diagram(arguments):
+    return index_diagram(*arguments)
+
+def build_index(folder_path, index_path=DEFAULT_INDEX_FILE, max_workers=None):
+    start_time = time.time()
+    diagrams = list_diagram_folders(folder_path)
+    total_diagrams = len(diagrams)
+    print(f"Total diagrams: {total_diagrams}")
+
+    documents = []  # (diagram, class key, class name, relative path), the list index is the document id
+    postings = {}  # (kind, term) -> array of document ids, ascending because ids are handed out in order
+    processed_diagrams = 0
+    arguments = ((os.path.join(parent, name), folder_path) for name, parent in diagrams)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for (name, _), diagram_documents in zip(diagrams, executor.map(_index_diagram, arguments, chunksize=64)):
+            for relative_path, class_key, class_name, terms in diagram_documents:
+                document_id = len(documents)
+                documents.append((name, class_key, class_name, relative_path))
+                for kind, names in terms.items():
+                    for term in names:
+                        posting = postings.get((kind, term))
+                        if posting is None:
+                            posting = postings[(kind, term)] = array(POSTING_TYPE)
+                        posting.append(document_id)
+
+            processed_diagrams += 1
+            if processed_diagrams % 1000 == 0 or processed_diagrams == total_diagrams:
+                print(f"Indexed {processed_diagrams}/{total_diagrams} diagrams - classes: {len(documents)} - terms: {len(postings)} - Elapsed: {format_time(time.time() - start_time)}")
+
+    # Written next to the target and renamed, so an open index is never half written
+    temporary_path = f"{index_path}.{os.getpid()}.tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    connection = sqlite3.connect(temporary_path)
+    try:
+        connection.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE documents (id INTEGER PRIMARY KEY, diagram TEXT, class_key TEXT, class_name TEXT, path TEXT);
+            CREATE TABLE postings (kind TEXT, term TEXT, documents BLOB, PRIMARY KEY (kind, term)) WITHOUT ROWID;
+        """)
+        connection.executemany("INSERT INTO metadata VALUES (?, ?)", [
+            ("version", str(INDEX_VERSION)), ("folder", os.path.abspath(folder_path)),
+            ("diagrams", str(total_diagrams)), ("posting_type", POSTING_TYPE), ("byteorder", sys.byteorder)])
+        connection.executemany("INSERT INTO documents VALUES (?, ?, ?, ?, ?)",
+                               ((document_id,) + document for document_id, document in enumerate(documents)))
+        connection.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                               ((kind, term, posting.tobytes()) for (kind, term), posting in sorted(postings.items())))
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(temporary_path, index_path)
+
+    print(f"Indexed {len(documents)} classes of {total_diagrams} diagrams with {len(postings)} terms into {index_path} - Total elapsed: {format_time(time.time() - start_time)}")
+
+def parse_query(query):
+    """Returns [(kinds, term, is_prefix)] of a query string or list of query terms."""
+    tokens = query.split() if isinstance(query, str) else [token for part in query for token in part.split()]
+    clauses = []
+    for token in tokens:
+        kind, separator, term = token.partition(":")
+        if not separator:
+            kinds, term = KINDS, kind
+        elif kind in KINDS:
+            kinds = [kind]
+        else:
+            raise ValueError(f"Unknown kind '{kind}' in '{token}', expected one of: {', '.join(KINDS)}")
+        is_prefix = term.endswith("*")
+        term = term.rstrip("*").lower()
+        if not term and not is_prefix:
+            raise ValueError(f"Empty term in '{token}'")
+        clauses.append((kinds, term, is_prefix))
+    return clauses
+
+class SearchIndex:
+    """Read access to an index written by build_index, usable as a context manager."""
+
+    def __init__(self, index_path=DEFAULT_INDEX_FILE):
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No search index at {index_path}, build it with build-search-index")
+        self.connection = sqlite3.connect(f"file:{pathname2url(os.path.abspath(index_path))}?mode=ro", uri=True)
+        metadata = dict(self.connection.execute("SELECT key, value FROM metadata"))
+        if int(metadata["version"]) != INDEX_VERSION or metadata["byteorder"] != sys.byteorder:
+            raise ValueError(f"{index_path} was built by another version or on another platform, rebuild it")
+        self.metadata = metadata
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def postings(self, kinds, term, is_prefix=False):
+        """Returns the postings lists (arrays of document ids) of all terms a clause matches."""
+        placeholders = ", ".join("?" * len(kinds))
+        if is_prefix:
+            rows = self.connection.execute(f"SELECT documents FROM postings WHERE kind IN ({placeholders}) AND term >= ? AND term < ?",
+                                           (*kinds, term, term + "\U0010ffff"))
+        else:
+            rows = self.connection.execute(f"SELECT documents FROM postings WHERE kind IN ({placeholders}) AND term = ?", (*kinds, term))
+        lists = []
+        for (blob,) in rows:
+            posting = array(POSTING_TYPE)
+            posting.frombytes(blob)
+            lists.append(posting)
+        return lists
+
+    def match(self, query):
+        """Returns the sorted ids of the documents matching all clauses of a query."""
+        clauses = [self.postings(*clause) for clause in parse_query(query)]
+        if not clauses:
+            return []
+        clauses.sort(key=lambda lists: sum(len(posting) for posting in lists))
+        if not clauses[0]:
+            return []
+
+        # The smallest clause gives the candidates, they are looked up in the larger ones
+        candidates = list(clauses[0][0]) if len(clauses[0]) == 1 else sorted(set().union(*clauses[0]))
+        for lists in clauses[1:]:
+            if len(candidates) * BISECT_RATIO < sum(len(posting) for posting in lists):
+                candidates = [document_id for document_id in candidates if any(contains(posting, document_id) for posting in lists)]
+            else:  # Comparable sizes, hashing the postings is cheaper than a binary search per candidate
+                members = set().union(*lists)
+                candidates = [document_id for document_id in candidates if document_id in members]
+        return candidates
+
+    def documents(self, document_ids):
+        """Returns {"diagram", "class_key", "class_name", "path"} of every document id, in the given order."""
+        results = {}
+        for offset in range(0, len(document_ids), 500):  # Stays below the SQLite variable limit
+            chunk = document_ids[offset:offset + 500]
+            rows = self.connection.execute(f"SELECT id, diagram, class_key, class_name, path FROM documents WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            for document_id, diagram, class_key, class_name, path in rows:
+                results[document_id] = {"diagram": diagram, "class_key": class_key, "class_name": class_name, "path": path}
+        return [results[document_id] for document_id in document_ids]
+
+    def query(self, query, limit=DEFAULT_LIMIT):
+        """Returns (number of matching classes, the first limit of them)."""
+        document_ids = self.match(query)
+        return len(document_ids), self.documents(document_ids[:limit] if limit else document_ids)
+
+def contains(posting, document_id):
+    index = bisect_left(posting, document_id)
+    return index < len(posting) and posting[index] == document_id
+
+def search(index_path, query, limit=DEFAULT_LIMIT, as_json=False):
+    start_time = time.perf_counter()
+    with SearchIndex(index_path) as index:
+        total, results = index.query(query, limit)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    if as_json:
+        print(json.dumps({"total": total, "results": results}, indent=2))
+        return
+    for result in results:
+        print(f"{result['diagram']}  {result['class_name']}  {os.path.join(index.metadata['folder'], result['path'])}")
+    print(f"{total} matching classes, showing {len(results)} - {elapsed_ms:.1f} ms")
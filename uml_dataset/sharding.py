@@ -0,0 +1,42 @@
+import os
+import hashlib
+import argparse
+
+# Deterministic partitioning of a corpus over several machines, without a coordination service.
+#
+# With --shard i/n every stage only handles the diagrams whose key hashes to shard i of n. The key is the
+# file name without its .xmi ending (as extract.diagram_name names the output folder), so a project ID,
+# its download, its filtered copy, its extracted folder and its data-clump report fall into the same shard
+# on every machine, and a node can run all stages on its own share. merge-shards combines the outputs.
+
+shard = None  # (index, count) set by --shard, index counts from 1
+
+def parse_shard(value):
+    """argparse type of --shard: "i/n" with 1 <= i <= n."""
+    index, separator, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not separator or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"'{value}' is no shard, expected i/n with 1 <= i <= n, e.g. 1/4")
+    return index, count
+
+def shard_key(name):
+    return os.path.basename(name.rstrip("/\\")).rstrip('.xmi')
+
+def shard_of(name, count):
+    """The shard (1 to count) of a file name, project ID or diagram folder, the same on every machine."""
+    digest = hashlib.md5(shard_key(name).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def in_shard(name):
+    return shard is None or shard_of(name, shard[1]) == shard[0]
+
+def select(items, key=lambda item: item):
+    """Returns the items of the current shard, all items without --shard."""
+    if shard is None:
+        return items
+    selected = [item for item in items if in_shard(key(item))]
+    print(f"Shard {shard[0]}/{shard[1]}: {len(selected)} of {len(items)} items")
+    return selected
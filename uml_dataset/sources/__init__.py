@@ -0,0 +1,27 @@
+"""Source adapters, one module per corpus.
+
+Every adapter module provides:
+
+- ``NAME`` and ``EXTENSIONS`` (the diagram file endings of the corpus)
+- ``add_download_arguments(parser)`` and ``download(args)`` for stage 1
+- ``get_project_metadata(project_name)`` for the data-clump reports
+
+Optionally, ``add_filter_arguments(parser)`` and ``filter_known_negatives(args)`` let stage 2 reject
+files the source already classified as no class diagram, without reading them. ``add_stats_arguments(parser)``
+and ``uml_diagram_files(args)`` give the stats command the downloads the source knows to be UML diagrams.
+
+To add a corpus, add a module with these names and register it in ``SOURCES``.
+"""
+from . import genmymodel, modelsdb, lindholmendb
+
+SOURCES = {
+    genmymodel.NAME: genmymodel,
+    modelsdb.NAME: modelsdb,
+    lindholmendb.NAME: lindholmendb,
+}
+
+def get_source(name):
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown source '{name}', expected one of: {', '.join(SOURCES)}")
@@ -0,0 +1,171 @@
+# Print "getting information about amount projects"
+# Get the amount of all pages/diagrams
+
+
+# 1. Get total amount of projects from: https://app.genmymodel.com/api/projects/public?limit=12&page=0&type=UML&minDataSize=10000
+# Example answer
+# {"links":[{"rel":"next","href":"https:?limit=12&page=1"}],"elements":[{"links":[{"rel":"self","href":"https://app.genmymodel.com/api/projects/_ytpisGxPEe6A45N60iXn8g"},....],"totalPages":13002,"pageNumber":0,"rowsPerPage":0,"totalElements":156017}
+# Print totalElements
+
+
+# Now loop over all pages/items:
+    # Print progress: Fetching: #Project / #TotalProjects - #Page/#TotalPages
+
+    # Try Catch
+
+        # #URL from GenMyModel:
+            # https://app.genmymodel.com/api/projects/public?limit=12&page=0&type=UML&minDataSize=10000
+
+
+        # Example element: "href":"https://app.genmymodel.com/api/projects/_ytpisGxPEe6A45N60iXn8g"
+
+
+        # Now get the xmi file content from url: https://app.genmymodel.com/api/projects/_ytpisGxPEe6A45N60iXn8g/custom-xmi
+        # Replace "_ytpisGxPEe6A45N60iXn8g" with the current key of the project
+
+    # Print success of current save or not
+
+    # Save it into the folder "UML-Diagrams"
+
+import os
+import sys
+import time
+import concurrent.futures
+from threading import Lock
+
+from ..progress import format_eta
+from ..instrumentation import file_record, span, timed_get
+from ..dataclumps.report_metadata import TARGET_LANGUAGE
+from .. import sharding
+
+# requests is imported inside the download functions, so filtering and extraction
+# work without the download dependencies installed
+
+NAME = "genmymodel"
+EXTENSIONS = (".xmi",)
+
+ITEMS_PER_PAGE = 100
+MAX_CONCURRENT_DOWNLOADS = 20
+START_PAGE = 0  # You can change this value to your desired starting page
+OUTPUT_FOLDER = "1_UML-Diagrams"
+API_URL = os.environ.get("GENMYMODEL_API_URL", "https://app.genmymodel.com/api")  # benchmarks/mock_server.py points this to a local server
+PROJECTS_URL = API_URL + "/projects/public?limit={limit}&page={page}&type=UML&minDataSize=10000"
+XMI_URL = API_URL + "/projects/{project_id}/custom-xmi"
+
+def save_xmi_file(project_id, counter, lock, output_folder=OUTPUT_FOLDER):
+    import requests
+
+    file_path = os.path.join(output_folder, f"{project_id}.xmi")
+    if not os.path.exists(file_path):  # Check if file does not exist
+        xmi_url = XMI_URL.format(project_id=project_id)
+        try:
+            with file_record(file_path):
+                response = timed_get(requests, xmi_url)
+                if response.status_code == 200:
+                    with span("write"), open(file_path, 'wb') as file:
+                        file.write(response.content)
+            if response.status_code == 200:
+                with lock:  # Synchronize the counter increment
+                    counter[0] += 1
+                    print(f"Saved XMI for project {project_id}. Processed count: {counter[0]}")
+            else:
+                print(f"Failed to retrieve XMI for project {project_id}: {response.status_code}")
+        except requests.RequestException as e:
+            print(f"Request failed: {e}", file=sys.stderr)
+    else:
+        print(f"XMI file for project {project_id} already exists. Skipping download.")
+
+def get_total_projects():
+    import requests
+
+    print("Getting information about the amount of projects")
+    url = PROJECTS_URL.format(limit=ITEMS_PER_PAGE, page=0)
+    try:
+        response = requests.get(url)
+        data = response.json()
+        return data['totalElements'], data['totalPages']
+    except requests.RequestException as e:
+        print(f"Request failed: {e}", file=sys.stderr)
+    except ValueError as e:
+        print(f"Invalid response: {e}", file=sys.stderr)
+
+def crawl(start_page=START_PAGE, output_folder=OUTPUT_FOLDER):
+    import requests
+
+    total_projects, total_pages = get_total_projects()
+    print(f"Total projects: {total_projects}")
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    counter = [0]
+    lock = Lock()
+
+    start_time = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS) as executor:
+        for page in range(start_page, total_pages):
+            page_url = PROJECTS_URL.format(limit=ITEMS_PER_PAGE, page=page)
+            try:
+                response = requests.get(page_url)
+                projects = response.json()
+
+                # Every node reads all listing pages, the projects of a page shift as projects are published
+                project_ids = [project['links'][0]['href'].split('/')[-1] for project in projects['elements']]
+                futures = [executor.submit(save_xmi_file, project_id, counter, lock, output_folder) for project_id in project_ids if sharding.in_shard(project_id)]
+                concurrent.futures.wait(futures)
+
+                pages_processed = page - start_page + 1
+                total_pages_from_start = total_pages - start_page
+                progress_percentage = (pages_processed / total_pages_from_start) * 100
+                print(f"Completed Page {page+1}/{total_pages} - {progress_percentage:.2f}% - {format_eta(pages_processed, total_pages_from_start, start_time)}")
+
+            except requests.RequestException as e:
+                print(f"Request failed: {e}", file=sys.stderr)
+            except ValueError as e:
+                print(f"Invalid response: {e}", file=sys.stderr)
+
+def iter_download_jobs(start_page=START_PAGE):
+    """Yields (file_name, url) for every project of the public listing, page by page."""
+    import requests
+
+    total_projects, total_pages = get_total_projects()
+    print(f"Total projects: {total_projects}")
+    for page in range(start_page, total_pages):
+        try:
+            response = requests.get(PROJECTS_URL.format(limit=ITEMS_PER_PAGE, page=page))
+            projects = response.json()
+        except requests.RequestException as e:
+            print(f"Request failed: {e}", file=sys.stderr)
+            continue
+        except ValueError as e:
+            print(f"Invalid response: {e}", file=sys.stderr)
+            continue
+
+        for project in projects['elements']:
+            project_id = project['links'][0]['href'].split('/')[-1]
+            if sharding.in_shard(project_id):
+                yield f"{project_id}.xmi", XMI_URL.format(project_id=project_id)
+
+def download_jobs(args):
+    return args.output_folder, iter_download_jobs(args.start_page)
+
+def add_download_arguments(parser):
+    parser.add_argument("start_page", type=int, nargs="?", default=START_PAGE, help="Page of the public project listing to start from")
+    parser.add_argument("--output_folder", type=str, default=OUTPUT_FOLDER, help="Path to the output folder")
+
+def download(args):
+    crawl(args.start_page, args.output_folder)
+
+def get_project_metadata(project_name):
+    return {
+        "target_language": TARGET_LANGUAGE,
+        "project_info": {
+            "project_url": f"https://app.genmymodel.com/explore/{project_name}",
+            "project_version": None,
+            "project_commit_hash": None,
+            "project_commit_date": None,
+            "additional": {
+                "download": XMI_URL.format(project_id=project_name)
+            }
+        }
+    }
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+
+from ..progress import format_time
+from ..instrumentation import file_record, span, timed_get
+from ..dataclumps.report_metadata import TARGET_LANGUAGE
+from .. import sharding
+
+# pandas and requests are imported inside the download functions, so filtering and extraction
+# work without the download dependencies installed
+
+NAME = "lindholmendb"
+EXTENSIONS = (".xmi", ".uml")
+
+MAX_CONCURRENT_DOWNLOADS = 5
+FAILED_DOWNLOADS_PATH = "failed_downloads.txt"
+DOWNLOAD_EXTENSIONS = ['.xml', '.xmi', '.uml']
+RAW_GITHUB_URL = os.environ.get("GITHUB_RAW_URL", "https://raw.githubusercontent.com")  # benchmarks/mock_server.py points this to a local server
+
+def github_url_to_raw(url):
+    # from https://github.com/0003088/libelektra-qt-gui-test/tree/master/doc/images/overview_plugins.xmi
+    # to   https://raw.githubusercontent.com/0003088/libelektra-qt-gui-test/master/doc/images/overview_plugins.xmi
+    parts = url.split('/')
+
+    # Check if URL is a valid GitHub URL
+    if not url.startswith("https://www.github.com/") and not url.startswith("https://github.com/"):
+        print("Not valid github URL")
+        raise ValueError("URL must start with 'https://www.github.com/' or 'https://github.com/'")
+
+    # Extract the parts of the URL needed to construct the raw URL
+    user = parts[3]
+    repository = parts[4]
+    branch = parts[parts.index("tree") + 1]
+
+    # Construct the path to the file
+    file_path = '/'.join(parts[parts.index(branch) + 1:])
+
+    return f"{RAW_GITHUB_URL}/{user}/{repository}/{branch}/{file_path}"
+
+def url_to_file_name(url):
+    return url.replace(":", "_").replace("/", "_")
+
+def download_file(url, output_path):
+    import requests
+
+    # Check if url ends with .xml .xmi .uml
+    _, extension = os.path.splitext(url)
+    if extension.lower() not in DOWNLOAD_EXTENSIONS:
+        return "skipped"
+
+    try:
+        raw_url = github_url_to_raw(url)
+        file_path = os.path.join(output_path, url_to_file_name(url))
+
+        if os.path.isfile(file_path):
+            return "exists"
+
+        with file_record(file_path):
+            response = timed_get(requests, raw_url, timeout=10)
+            response.raise_for_status()
+
+            with span("write"), open(file_path, 'wb') as f:
+                f.write(response.content)
+
+        return "downloaded"
+    except requests.RequestException as e:
+        return "failed"
+
+def download_url(url, output_path, download_stats, lock, total_files, start_time):
+    result = download_file(url, output_path)
+    current_time = time.time()
+
+    with lock:  # Ensure thread-safe operations
+        if result == "downloaded":
+            download_stats["downloaded"] += 1
+        elif result == "exists":
+            download_stats["exists"] += 1
+        elif result == "skipped":
+            download_stats["skipped"] += 1
+        else:
+            download_stats["failed"] += 1
+            download_stats["failed_urls"].add(url)
+
+        elapsed_time = current_time - start_time
+        completed = download_stats['downloaded'] + download_stats['exists'] + download_stats['failed'] + download_stats['skipped']
+        estimated_total_time = elapsed_time / completed * total_files if completed > 0 else 0
+        estimated_remaining_time = estimated_total_time - elapsed_time
+
+        message = f"Skipped: {download_stats['skipped']} - Downloaded: {download_stats['downloaded']} / Already downloaded: {download_stats['exists']} / Failed: {download_stats['failed']} - completed {completed} out of {total_files} files."
+        message += f" Elapsed time: {format_time(elapsed_time)}. Estimated time remaining: {format_time(estimated_remaining_time)}."
+
+        print(message)
+
+def process_csv_file(file_path, output_path, download_stats, lock, start_time):
+    import pandas as pd
+
+    try:
+        print(f"Read file {file_path}")
+        df = pd.read_csv(file_path)
+        urls = sharding.select(list(df['Model Link - Github']), key=url_to_file_name)
+        total_files = len(urls)
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS) as executor:
+            futures = [executor.submit(download_url, url, output_path, download_stats, lock, total_files, start_time) for url in urls]
+            for future in as_completed(futures):
+                future.result()  # This will re-raise any exceptions caught
+    except Exception as e:
+        with lock:  # Ensure thread-safe operation on the shared download_stats object
+            download_stats["failed_urls"].add(str(file_path) + ": " + str(e))
+
+def download_all(csv_file_path, output_path, failed_downloads_path=FAILED_DOWNLOADS_PATH):
+    start_time = time.time()
+
+    if not os.path.exists(csv_file_path):
+        print(f"Error: The specified CSV file does not exist: {csv_file_path}")
+        sys.exit(1)
+
+    download_stats = {"downloaded": 0, "skipped": 0, "exists": 0, "failed": 0, "failed_urls": set()}
+    lock = Lock()  # Lock for synchronizing access to download_stats
+
+    os.makedirs(output_path, exist_ok=True)
+    print(f"Start process csv file")
+    process_csv_file(csv_file_path, output_path, download_stats, lock, start_time)
+
+    # Write the failed downloads to a file
+    with open(failed_downloads_path, 'w') as f:
+        for item in download_stats["failed_urls"]:
+            f.write("%s\n" % item)
+
+    elapsed_time = time.time() - start_time
+    print(f"{download_stats['downloaded']} downloaded / {download_stats['exists']} already existed / {download_stats['failed']} failed in {format_time(elapsed_time)}.")
+
+def iter_download_jobs(csv_file_path):
+    """Yields (file_name, raw_url) for every diagram link of the CSV file."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_file_path)
+    for url in sharding.select(list(df['Model Link - Github']), key=url_to_file_name):
+        _, extension = os.path.splitext(url)
+        if extension.lower() not in DOWNLOAD_EXTENSIONS:
+            continue
+        try:
+            yield url_to_file_name(url), github_url_to_raw(url)
+        except ValueError as e:
+            print(f"Skipping {url}: {e}", file=sys.stderr)
+
+def download_jobs(args):
+    return args.output_path, iter_download_jobs(args.csv_file_path)
+
+def add_download_arguments(parser):
+    parser.add_argument("csv_file_path", type=str, help="CSV file with a 'Model Link - Github' column")
+    parser.add_argument("output_path", type=str, help="Path to the output folder")
+
+def download(args):
+    download_all(args.csv_file_path, args.output_path)
+
+def get_project_metadata(project_name):
+    # Diagrams are stored under their GitHub URL with ":" and "/" replaced by "_", which cannot be reversed safely
+    return {
+        "target_language": TARGET_LANGUAGE,
+        "project_info": {
+            "project_url": None,
+            "project_version": None,
+            "project_commit_hash": None,
+            "project_commit_date": None,
+            "additional": {
+                "source": NAME,
+                "encoded_url": project_name
+            }
+        }
+    }
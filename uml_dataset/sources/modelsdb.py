@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from threading import Lock
+
+from ..progress import format_time
+from ..instrumentation import file_record, span, timed_get
+from ..dataclumps.report_metadata import TARGET_LANGUAGE
+from .. import manifest
+from .. import sharding
+
+# pandas and requests are imported inside the download functions, so filtering and extraction
+# work without the download dependencies installed
+
+NAME = "modelsdb"
+EXTENSIONS = (".xmi", ".uml")
+
+MAX_CONCURRENT_DOWNLOADS = 5
+FAILED_DOWNLOADS_PATH = "failed_downloads.txt"
+
+# The Summary-*.xlsx files of the xml_is_uml check list every URL in InputXMIs or ".uml files" and
+# sort the checked ones into verdict sheets. A URL gets the verdict code of its most specific sheet,
+# a URL that is in NoOMGXMIorUML and in a UML/XMI/MOF sheet as well is disputed and has no verdict.
+VERDICT_SHEETS = {"uml": "u", "mof": "m", "xmi": "x", "NoOMGXMIorUML": "n", "notDownloaded": "d"}
+POSITIVE_VERDICTS = "umx"  # In precedence order
+NOT_UML = "n"
+NOT_DOWNLOADED = "d"
+DOWNLOAD_PRIORITY = {"u": 0, "m": 1, "x": 2, None: 3, NOT_DOWNLOADED: 4, NOT_UML: 5}
+
+def download_file(url, output_path):
+    import requests
+
+    try:
+        file_name = file_name_of(url)
+        file_path = os.path.join(output_path, file_name)
+
+        if os.path.isfile(file_path):
+            return "exists"
+
+        with file_record(file_path):
+            response = timed_get(requests, url, timeout=10)
+            response.raise_for_status()
+
+            with span("write"), open(file_path, 'wb') as f:
+                f.write(response.content)
+
+        return "downloaded"
+    except requests.RequestException as e:
+        return "failed"
+
+def download_url(url, output_path, download_stats, lock, total_files, start_time):
+    result = download_file(url, output_path)
+    current_time = time.time()
+
+    with lock:  # Ensure thread-safe operations
+        if result == "downloaded":
+            download_stats["downloaded"] += 1
+        elif result == "exists":
+            download_stats["exists"] += 1
+        else:
+            download_stats["failed"] += 1
+            download_stats["failed_urls"].add(url)
+
+        elapsed_time = current_time - start_time
+        completed = download_stats['downloaded'] + download_stats['exists'] + download_stats['failed']
+        estimated_total_time = elapsed_time / completed * total_files if completed > 0 else 0
+        estimated_remaining_time = estimated_total_time - elapsed_time
+
+        message = f"Downloaded: {download_stats['downloaded']} / Already downloaded: {download_stats['exists']} / Failed: {download_stats['failed']} - completed {completed} out of {total_files} files."
+        message += f" Elapsed time: {format_time(elapsed_time)}. Estimated time remaining: {format_time(estimated_remaining_time)}."
+
+        print(message)
+
+def sheet_folder_name(sheet_name):
+    return sheet_name.replace(" ", "_").replace(".", "_")
+
+def sheet_output_path(output_path, sheet_name):
+    return os.path.join(output_path, sheet_folder_name(sheet_name))
+
+def summary_files(input_path):
+    return [os.path.join(input_path, f) for f in sorted(os.listdir(input_path)) if f.endswith(".xlsx")]
+
+def read_summary_rows(input_path):
+    """Returns [sheet name, url] of every row of the Summary-*.xlsx files, cached while the files are unchanged."""
+    files = summary_files(input_path)
+    key = json.dumps([[path, os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in map(os.path.abspath, files)])
+    cache_path = os.path.join(manifest.CACHE_FOLDER, "summary-" + hashlib.md5(key.encode('utf-8')).hexdigest() + ".json")
+    if not manifest.refresh:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    import pandas as pd
+
+    rows = []
+    for file_path in files:
+        xls = pd.ExcelFile(file_path)
+        for sheet_name in xls.sheet_names:
+            df = pd.read_excel(xls, sheet_name=sheet_name, header=None)  # No header as columns are unnamed
+            if len(df.columns):  # Empty sheets have no column
+                rows += [[sheet_name, url] for url in df.iloc[:, 0] if isinstance(url, str)]
+
+    try:
+        os.makedirs(manifest.CACHE_FOLDER, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f)
+    except OSError as e:
+        print(f"Could not cache the rows of {input_path}: {e}")
+    return rows
+
+def build_verdicts(rows):
+    """Returns the compact lookup table {url: verdict code} of the verdict sheets."""
+    sheets = {}
+    for sheet_name, url in rows:
+        if sheet_name in VERDICT_SHEETS:
+            sheets.setdefault(url, set()).add(VERDICT_SHEETS[sheet_name])
+
+    verdicts = {}
+    for url, codes in sheets.items():
+        positives = [code for code in POSITIVE_VERDICTS if code in codes]
+        if positives:
+            if NOT_UML not in codes:
+                verdicts[url] = positives[0]
+        elif NOT_UML in codes:
+            verdicts[url] = NOT_UML
+        else:
+            verdicts[url] = NOT_DOWNLOADED
+    return verdicts
+
+def file_name_of(url):
+    return os.path.basename(urlparse(url).path)
+
+def summary_jobs(input_path, skip_known_negatives=False):
+    """Returns (sheet name, url) of all rows, the URLs most likely to be UML first."""
+    rows = read_summary_rows(input_path)
+    verdicts = build_verdicts(rows)
+    rows = sharding.select(rows, key=lambda row: file_name_of(row[1]))
+    if skip_known_negatives:
+        rows = [row for row in rows if verdicts.get(row[1]) not in (NOT_UML, NOT_DOWNLOADED)]
+    return sorted(rows, key=lambda row: DOWNLOAD_PRIORITY[verdicts.get(row[1])])  # Stable, keeps the sheet order otherwise
+
+def file_verdicts(input_path):
+    """Returns {path relative to the download folder: verdict codes of all URLs downloaded to it}."""
+    rows = read_summary_rows(input_path)
+    verdicts = build_verdicts(rows)
+    codes_by_path = {}
+    for sheet_name, url in rows:
+        relative_path = os.path.join(sheet_folder_name(sheet_name), file_name_of(url))
+        codes_by_path.setdefault(relative_path, set()).add(verdicts.get(url))
+    return codes_by_path
+
+def known_negative_files(input_path):
+    """Paths (relative to the download folder) of files the summaries classify as neither OMG XMI nor UML.
+
+    Several URLs share a file name, so a file only counts when every URL downloaded to it has that verdict.
+    """
+    return {relative_path for relative_path, codes in file_verdicts(input_path).items() if codes == {NOT_UML}}
+
+def known_uml_files(input_path):
+    """Paths of files every URL of which the summaries classify as UML, MOF or XMI."""
+    return {relative_path for relative_path, codes in file_verdicts(input_path).items() if codes <= set(POSITIVE_VERDICTS)}
+
+def download_all(input_path, output_path, failed_downloads_path=FAILED_DOWNLOADS_PATH, skip_known_negatives=False):
+    start_time = time.time()
+
+    if not os.path.exists(input_path):
+        print(f"Error: The specified input path does not exist: {input_path}")
+        sys.exit(1)
+
+    download_stats = {"downloaded": 0, "exists": 0, "failed": 0, "failed_urls": set()}
+    lock = Lock()  # Lock for synchronizing access to download_stats
+
+    try:
+        jobs = summary_jobs(input_path, skip_known_negatives)
+    except Exception as e:
+        print(f"Error: Could not read the summary files in {input_path}: {e}")
+        sys.exit(1)
+    total_files = len(jobs)
+    print(f"Total items found to download/check: {total_files}")
+
+    for sheet_name in dict.fromkeys(sheet_name for sheet_name, _ in jobs):
+        os.makedirs(sheet_output_path(output_path, sheet_name), exist_ok=True)  # Once per sheet instead of once per URL
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS) as executor:
+        futures = [executor.submit(download_url, url, sheet_output_path(output_path, sheet_name), download_stats, lock, total_files, start_time)
+                   for sheet_name, url in jobs]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                with lock:  # Ensure thread-safe operation on the shared download_stats object
+                    download_stats["failed_urls"].add(str(e))
+
+    # Write the failed downloads to a file
+    with open(failed_downloads_path, 'w') as f:
+        for item in download_stats["failed_urls"]:
+            f.write("%s\n" % item)
+
+    elapsed_time = time.time() - start_time
+    print(f"{download_stats['downloaded']} downloaded / {download_stats['exists']} already existed / {download_stats['failed']} failed out of {total_files} files processed in {format_time(elapsed_time)}.")
+
+def iter_download_jobs(input_path, skip_known_negatives=False):
+    """Yields (file_name, url) for every URL listed in the Summary-*.xlsx sheets, the file lands in a folder per sheet."""
+    for sheet_name, url in summary_jobs(input_path, skip_known_negatives):
+        yield os.path.join(sheet_folder_name(sheet_name), file_name_of(url)), url
+
+def download_jobs(args):
+    return args.output_path, iter_download_jobs(args.input_path, args.skip_known_negatives)
+
+def add_download_arguments(parser):
+    parser.add_argument("input_path", type=str, help="Folder with the Summary-*.xlsx files")
+    parser.add_argument("output_path", type=str, help="Path to the output folder")
+    parser.add_argument("--skip_known_negatives", action="store_true", help="Skip URLs the summaries list as not downloadable or as neither OMG XMI nor UML")
+
+def download(args):
+    download_all(args.input_path, args.output_path, skip_known_negatives=args.skip_known_negatives)
+
+def add_filter_arguments(parser):
+    parser.add_argument("--summary_path", type=str, default=None, help="Folder with the Summary-*.xlsx files, files they classify as neither OMG XMI nor UML are rejected without parsing")
+
+def filter_known_negatives(args):
+    return known_negative_files(args.summary_path) if args.summary_path else None
+
+def add_stats_arguments(parser):
+    parser.add_argument("--summary_path", type=str, default=None, help="Folder with the Summary-*.xlsx files, downloads they classify as UML, MOF or XMI count as UML diagrams")
+
+def uml_diagram_files(args):
+    return known_uml_files(args.summary_path) if args.summary_path else None
+
+def get_project_metadata(project_name):
+    # Diagrams are stored under the basename of their raw.githubusercontent.com URL, the repository is not recoverable
+    return {
+        "target_language": TARGET_LANGUAGE,
+        "project_info": {
+            "project_url": None,
+            "project_version": None,
+            "project_commit_hash": None,
+            "project_commit_date": None,
+            "additional": {
+                "source": NAME,
+                "file_name": project_name
+            }
+        }
+    }
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import hashlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .progress import format_time
+from . import manifest
+from . import sharding
+
+# Corpus statistics for the figures in the README, computed from what the stages already recorded.
+#
+# The raw and class diagram folders are counted from their cached manifests (size without opening a
+# file), the classes per class diagram come from the filter verdicts, and a source can name the
+# downloads it knows to be UML (modelsdb: the Summary spreadsheets). Only the extracted folder has to
+# be read for the field and method counts; the counts of every diagram folder are cached with its
+# mtime, so a later run reads just the diagrams that were added or re-extracted since.
+#
+# Every distribution is kept as a histogram {value: count}. Histograms of several runs or sources add
+# up, so --include merges the stats files of other sources into corpus-wide figures.
+
+STATS_VERSION = 1
+DEFAULT_STATS_FILE = "dataset_stats.json"
+FIGURES = [
+    ("crawled", "Total Diagrams Crawled"),
+    ("uml", "UML Diagrams Identified"),
+    ("class_diagrams", "UML Class Diagrams Found"),
+    ("parsed", "UML Class Diagrams Parsed"),
+    ("classes", "Classes"),
+    ("fields", "Fields"),
+    ("methods", "Methods"),
+]
+DISTRIBUTIONS = [
+    ("raw_bytes", "Bytes per crawled diagram"),
+    ("class_diagram_bytes", "Bytes per class diagram"),
+    ("classes_per_class_diagram", "Classes per class diagram (filter verdicts)"),
+    ("classes_per_diagram", "Classes per parsed diagram"),
+    ("fields_per_class", "Fields per class"),
+    ("methods_per_class", "Methods per class"),
+]
+
+def summarize(histogram):
+    """Returns count, total, min, max, mean and quantiles of a {value: count} histogram."""
+    count = sum(histogram.values())
+    if not count:
+        return {"count": 0}
+    values = sorted(histogram)
+    summary = {"count": count, "total": sum(value * number for value, number in histogram.items()), "min": values[0], "max": values[-1]}
+    summary["mean"] = round(summary["total"] / count, 2)
+    quantiles = {"median": 0.5, "p90": 0.9, "p99": 0.99}
+    seen = 0
+    pending = list(quantiles.items())
+    for value in values:
+        seen += histogram[value]
+        while pending and seen >= pending[0][1] * count:
+            summary[pending.pop(0)[0]] = value
+    return summary
+
+def read_diagram_counts(diagram_path):
+    """Returns [fields, methods] of every class file of an extracted diagram folder."""
+    counts = []
+    try:
+        for filename in sorted(os.listdir(diagram_path)):
+            if filename.endswith(".json"):
+                with open(os.path.join(diagram_path, filename), 'r', encoding='utf-8') as f:
+                    class_details = json.load(f)
+                counts.append([len(class_details.get("fields", {})), len(class_details.get("methods", {}))])
+    except Exception as e:
+        print(f"An error occurred while reading diagram {os.path.basename(diagram_path)}: {e}")
+    return counts
+
+def cache_path(folder_path):
+    return os.path.join(manifest.CACHE_FOLDER, "stats-" + hashlib.md5(os.path.abspath(folder_path).encode('utf-8')).hexdigest() + ".json")
+
+def load_cache(folder_path):
+    if manifest.refresh:
+        return {}
+    try:
+        with open(cache_path(folder_path), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache["version"] == STATS_VERSION:
+            return cache["diagrams"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def save_cache(folder_path, diagrams):
+    path = cache_path(folder_path)
+    try:
+        os.makedirs(manifest.CACHE_FOLDER, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": STATS_VERSION, "folder": os.path.abspath(folder_path), "diagrams": diagrams}, f)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        print(f"Could not cache the stats of {folder_path}: {e}")
+
+def extracted_histograms(folder_path, histograms, max_workers=None):
+    """Adds the class, field and method counts of an extracted folder, reading only uncached diagrams."""
+    start_time = time.time()
+    cached = load_cache(folder_path)
+    diagrams = {}  # path relative to the folder -> [folder mtime_ns, [[fields, methods] per class]]
+    changed = []
+    for name, parent in sharding.select(manifest.list_diagram_folders(folder_path), key=lambda folder: folder[0]):
+        diagram_path = os.path.join(parent, name)
+        relative_path = os.path.relpath(diagram_path, folder_path)
+        mtime_ns = os.stat(diagram_path).st_mtime_ns
+        entry = cached.get(relative_path)
+        if entry is not None and entry[0] == mtime_ns:
+            diagrams[relative_path] = entry
+        else:
+            changed.append((relative_path, diagram_path, mtime_ns))
+
+    total_changed = len(changed)
+    print(f"Diagrams: {len(diagrams) + total_changed} - cached: {len(diagrams)} - to read: {total_changed}")
+    if changed:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(read_diagram_counts, [diagram_path for _, diagram_path, _ in changed], chunksize=64)
+            for processed_diagrams, ((relative_path, _, mtime_ns), counts) in enumerate(zip(changed, results), 1):
+                diagrams[relative_path] = [mtime_ns, counts]
+                if processed_diagrams % 1000 == 0 or processed_diagrams == total_changed:
+                    print(f"Read {processed_diagrams}/{total_changed} diagrams - Elapsed: {format_time(time.time() - start_time)}")
+        save_cache(folder_path, diagrams)
+    elif len(cached) != len(diagrams):  # Only removals, the cache still lists the removed diagrams
+        save_cache(folder_path, diagrams)
+
+    for _, counts in diagrams.values():
+        if counts:
+            histograms["classes_per_diagram"][len(counts)] += 1
+        for fields, methods in counts:
+            histograms["fields_per_class"][fields] += 1
+            histograms["methods_per_class"][methods] += 1
+
+def compute_stats(raw_folder=None, class_diagrams_folder=None, extracted_folder=None, extensions=(".xmi",),
+                  uml_files=None, max_workers=None, source=None):
+    """Returns the figures and histograms of the given stage folders, any of them can be left out."""
+    histograms = {name: Counter() for name, _ in DISTRIBUTIONS}
+    figures = {}
+    if raw_folder:
+        entries = sharding.select(manifest.load_manifest(raw_folder, extensions, recursive=True), key=lambda entry: entry.path)
+        histograms["raw_bytes"].update(entry.size for entry in entries)
+        figures["crawled"] = len(entries)
+        if uml_files is not None:
+            figures["uml"] = sum(1 for entry in entries if entry.path in uml_files)
+    if class_diagrams_folder:
+        entries = sharding.select(manifest.load_manifest(class_diagrams_folder, extensions, recursive=True), key=lambda entry: entry.path)
+        histograms["class_diagram_bytes"].update(entry.size for entry in entries)
+        figures["class_diagrams"] = len(entries)
+        verdicts = manifest.load_verdicts(class_diagrams_folder)
+        histograms["classes_per_class_diagram"].update(verdicts[entry.path]["classes"] for entry in entries if entry.path in verdicts)
+    if extracted_folder:
+        extracted_histograms(extracted_folder, histograms, max_workers)
+        figures["parsed"] = sum(histograms["classes_per_diagram"].values())
+        figures["classes"] = sum(histograms["fields_per_class"].values())
+        figures["fields"] = sum(value * count for value, count in histograms["fields_per_class"].items())
+        figures["methods"] = sum(value * count for value, count in histograms["methods_per_class"].items())
+    return {"version": STATS_VERSION, "sources": [source] if source else [], "figures": figures,
+            "histograms": {name: dict(histogram) for name, histogram in histograms.items()}}
+
+def merge_stats(stats_list):
+    """Adds up the figures and histograms of several stats, e.g. one per source or per shard."""
+    figures = Counter()
+    histograms = {name: Counter() for name, _ in DISTRIBUTIONS}
+    sources = []
+    for stats in stats_list:
+        figures.update(stats["figures"])
+        for name, histogram in stats["histograms"].items():
+            histograms[name].update({int(value): count for value, count in histogram.items()})  # JSON keys are strings
+        sources += [source for source in stats["sources"] if source not in sources]
+    return {"version": STATS_VERSION, "sources": sources, "figures": dict(figures),
+            "histograms": {name: dict(histogram) for name, histogram in histograms.items()}}
+
+def add_summaries(stats):
+    stats["summaries"] = {name: summarize(stats["histograms"][name]) for name, _ in DISTRIBUTIONS}
+    return stats
+
+def load_stats(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        stats = json.load(f)
+    if stats.get("version") != STATS_VERSION:
+        raise ValueError(f"{path} was written by another version, compute it again")
+    return stats
+
+def print_stats(stats):
+    for key, label in FIGURES:
+        if key in stats["figures"]:
+            print(f"- {label}: {stats['figures'][key]:,}")
+    for key, label in DISTRIBUTIONS:
+        summary = stats["summaries"][key]
+        if summary["count"]:
+            print(f"{label}: mean {summary['mean']} - median {summary['median']} - p90 {summary['p90']} - p99 {summary['p99']} - min {summary['min']} - max {summary['max']}")
+
+def corpus_stats(output_file=DEFAULT_STATS_FILE, include=(), **folders):
+    """Computes the stats of one source, writes them to output_file and prints them merged with include."""
+    start_time = time.time()
+    stats = add_summaries(compute_stats(**folders))
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=1)
+
+    if include:
+        stats = add_summaries(merge_stats([stats] + [load_stats(path) for path in include]))
+        print(f"Combined stats of {', '.join(source for source in stats['sources'] if source)}:")
+    print_stats(stats)
+    print(f"Wrote {output_file} - Total elapsed: {format_time(time.time() - start_time)}")
+    return stats
+
+def merge_stats_files(paths, output_file=DEFAULT_STATS_FILE):
+    """Adds up stats files, e.g. those computed by each machine over its shard, into output_file."""
+    stats = add_summaries(merge_stats([load_stats(path) for path in paths]))
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=1)
+    print(f"Merged {len(paths)} stats files:")
+    print_stats(stats)
+    print(f"Wrote {output_file}")
+    return stats
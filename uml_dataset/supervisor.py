@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import shutil
+import multiprocessing
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, the memory limit is then not enforced
+    resource = None
+
+from .progress import format_eta
+from .extract import diagram_name, write_class_details
+from .instrumentation import file_record, span, count_bytes, merge_record
+from .manifest import load_manifest, output_path, prepare_layout
+from . import xmi
+from . import sharding
+from . import scheduling
+
+# Supervised variant of the extract stage for corpora with pathological inputs.
+#
+# Every worker process handles one file at a time and talks to the supervisor over its own pipe,
+# so a worker can be killed without corrupting shared state. A file that exceeds the wall-clock
+# limit, hits the memory limit, crashes its worker or cannot be parsed is copied to the quarantine
+# folder and described by a line in failures.jsonl; the worker is replaced and the batch goes on.
+# Unlike extract_class_details, a parse error is reported instead of being treated as "no classes".
+
+DEFAULT_TIMEOUT = 120  # seconds per file
+DEFAULT_MEMORY_LIMIT = 4096  # MB of address space per worker
+FAILURES_FILE_NAME = "failures.jsonl"
+POLL_INTERVAL = 0.5
+
+def limit_memory(memory_limit):
+    if resource is None or not memory_limit:
+        return
+    limit = memory_limit * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def process_file(filepath, filename, output_folder, layout="flat"):
+    """Returns the outcome of one file: status "ok", "no_class_diagram" or "failed" with reason and error."""
+    result = {"file": filename, "status": "ok", "classes": 0}
+    with file_record(filepath, detached=True) as record:
+        try:
+            with span("read"), open(filepath, 'rb') as file:
+                content = file.read()
+            count_bytes(len(content))
+
+            backend = xmi.default_backend
+            root = xmi.parse_document(content, backend)
+            with span("detect"):
+                is_class_diagram = bool(backend.has_class_element(root))
+            if is_class_diagram:
+                with span("extract"):
+                    class_details = xmi.extract_classes(root, backend)
+                errors_list = []
+                result["classes"], error_in_parsing = write_class_details(class_details, output_path(output_folder, diagram_name(filename), layout), filename, errors_list)
+                if error_in_parsing:
+                    result.update(status="failed", reason="write_error", error="; ".join(errors_list))
+            else:
+                result["status"] = "no_class_diagram"
+        except MemoryError:
+            result.update(status="failed", reason="memory_limit", error="MemoryError")
+        except Exception as e:
+            result.update(status="failed", reason="parse_error", error=f"{type(e).__name__}: {e}")
+    result["record"] = record
+    return result
+
+def worker_main(connection, output_folder, memory_limit, layout):
+    limit_memory(memory_limit)
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        try:
+            result = process_file(task[0], task[1], output_folder, layout)
+        except MemoryError:  # Raised again while handling the first one, the file's memory is released by now
+            result = {"file": task[1], "status": "failed", "classes": 0, "reason": "memory_limit", "error": "MemoryError"}
+        connection.send(result)
+        if result.get("reason") == "memory_limit":
+            break  # The heap may be fragmented up to the limit, a fresh worker takes over
+
+class Worker:
+    def __init__(self, context, output_folder, memory_limit, layout):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_connection, output_folder, memory_limit, layout), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.current = None  # (filepath, filename, start_time) of the file being processed
+
+    def assign(self, filepath, filename):
+        self.current = (filepath, filename, time.time())
+        self.connection.send((filepath, filename))
+
+    def stop(self):
+        if self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+def quarantine(failure, filepath, quarantine_folder):
+    """Copies the offending file next to its structured failure record, under its path relative to the input folder."""
+    try:
+        quarantine_path = os.path.join(quarantine_folder, failure["file"])
+        os.makedirs(os.path.dirname(quarantine_path), exist_ok=True)
+        shutil.copy2(filepath, quarantine_path)
+    except OSError as e:
+        failure["quarantine_error"] = str(e)
+    with open(os.path.join(quarantine_folder, FAILURES_FILE_NAME), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(failure) + "\n")
+
+def process_folder(path_to_folder, output_folder, extensions=(".xmi",), workers=None, timeout=DEFAULT_TIMEOUT,
+                   memory_limit=DEFAULT_MEMORY_LIMIT, quarantine_folder=None, layout="flat"):
+    quarantine_folder = quarantine_folder or output_folder.rstrip("/\\") + "_quarantine"
+    for folder in (output_folder, quarantine_folder):
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        os.makedirs(folder)
+    prepare_layout(output_folder, layout)
+
+    if not (os.path.exists(path_to_folder) and os.path.isdir(path_to_folder)):
+        print(f"{path_to_folder} is not a valid directory")
+        return
+
+    if resource is None and memory_limit:
+        print("The memory limit is not supported on this platform, only the timeout is enforced")
+
+    entries = sharding.select(load_manifest(path_to_folder, extensions, recursive=True), key=lambda entry: entry.path)
+    # Largest files first, a large file handed out last would keep one worker busy while the others idle
+    relative_paths = [entry.path for entry in scheduling.largest_first(entries, lambda entry: entry.size)]
+    total_files = len(relative_paths)
+    pending = iter(relative_paths)
+
+    processed_files = 0
+    class_diagrams = 0
+    classes = 0
+    failures = []
+    start_time = time.time()
+
+    def finish(worker, result):
+        nonlocal processed_files, class_diagrams, classes
+        filepath, filename, file_start_time = worker.current
+        worker.current = None
+        processed_files += 1
+        merge_record(filepath, result.pop("record", None))
+        if result["status"] == "ok":
+            class_diagrams += 1
+            classes += result["classes"]
+        elif result["status"] == "failed":
+            # Files of different subfolders can share a name, the record keeps them apart
+            result["file"] = os.path.relpath(filepath, path_to_folder)
+            result["seconds"] = round(time.time() - file_start_time, 3)
+            result["bytes"] = os.path.getsize(filepath)
+            result["limits"] = {"timeout": timeout, "memory_limit": memory_limit}
+            failures.append(result)
+            quarantine(result, filepath, quarantine_folder)
+            # A killed or failed worker may have left a partial output folder behind
+            output_directory_path = output_path(output_folder, diagram_name(filename), layout)
+            if os.path.exists(output_directory_path):
+                shutil.rmtree(output_directory_path)
+        print(f"Processed {processed_files}/{total_files} files - class diagrams: {class_diagrams} - classes: {classes} - quarantined: {len(failures)} - {format_eta(processed_files, total_files, start_time)}")
+
+    context = multiprocessing.get_context()
+    pool = [Worker(context, output_folder, memory_limit, layout) for _ in range(min(workers or os.cpu_count() or 1, max(total_files, 1)))]
+    try:
+        while True:
+            for worker in pool:
+                if worker.current is None:
+                    relative_path = next(pending, None)
+                    if relative_path is not None:
+                        worker.assign(os.path.join(path_to_folder, relative_path), os.path.basename(relative_path))
+            busy = [worker for worker in pool if worker.current is not None]
+            if not busy:
+                break
+
+            ready = wait([worker.connection for worker in busy], timeout=POLL_INTERVAL)
+            now = time.time()
+            for index, worker in enumerate(pool):
+                if worker.current is None:
+                    continue
+                failure = None
+                if worker.connection in ready:
+                    try:
+                        result = worker.connection.recv()
+                    except (EOFError, OSError):
+                        worker.process.join()
+                        error = f"Worker exited with code {worker.process.exitcode}"
+                        if memory_limit:
+                            error += f", possibly at the memory limit of {memory_limit} MB"
+                        failure = {"reason": "crashed", "error": error}
+                    else:
+                        finish(worker, result)
+                        if not worker.process.is_alive() or result.get("reason") == "memory_limit":
+                            worker.kill()
+                            pool[index] = Worker(context, output_folder, memory_limit, layout)
+                        continue
+                elif now - worker.current[2] > timeout:
+                    failure = {"reason": "timeout", "error": f"No result after {timeout} s"}
+                if failure is not None:
+                    worker.kill()
+                    finish(worker, dict(failure, file=worker.current[1], status="failed"))
+                    pool[index] = Worker(context, output_folder, memory_limit, layout)
+    finally:
+        for worker in pool:
+            worker.stop()
+
+    for failure in failures:
+        print(f"Source Filename: {failure['file']} - {failure['reason']}: {failure.get('error')}")
+    print(f"Finished - quarantined {len(failures)} files in {quarantine_folder}")
+    return failures
@@ -0,0 +1,268 @@
+from .xml_backend import ns, get_backend
+from .instrumentation import span
+from . import prefilter
+
+# Parser backend used when none is passed explicitly, see xml_backend.get_backend
+default_backend = get_backend()
+
+def set_default_backend(name):
+    global default_backend
+    default_backend = get_backend(name)
+
+def parse_document(xmi_content, backend):
+    """Parses str or bytes; bytes are decoded as their XML declaration says.
+
+    Files that do not match their declaration (e.g. Latin-1 bytes declared as UTF-8) fall back to the
+    former decoding with replacement characters, so no diagram that parsed as text is lost. The time
+    goes to the "parse" and "decode" stages, the fallback decode is not counted as parse time.
+    """
+    if isinstance(xmi_content, str):
+        with span("parse"):
+            return backend.parse(xmi_content)
+    try:
+        with span("parse"):
+            return backend.parse(xmi_content)
+    except Exception:
+        with span("decode"):
+            text = xmi_content.decode('utf-8', errors='replace')
+        with span("parse"):
+            return backend.parse(text)
+
+def is_uml_class_diagram(xmi_content, backend=None):
+    backend = backend or default_backend
+    if prefilter.enabled:
+        with span("prefilter"):
+            if not prefilter.may_contain_class(xmi_content):
+                return False
+    try:
+        # Parse the XML content
+        root = parse_document(xmi_content, backend)
+
+        # Search for elements with tag 'packagedElement' and attribute xsi:type or xmi:type as 'uml:Class'
+        with span("detect"):
+            return bool(backend.has_class_element(root))
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return False
+
+def count_class_elements(xmi_content, backend=None, prefiltered=False):
+    """Number of distinct uml:Class elements, 0 when the content is not a UML class diagram.
+
+    prefiltered: the caller already ran the byte prefilter on the same content (e.g. through a memory map).
+    """
+    backend = backend or default_backend
+    if prefilter.enabled and not prefiltered:
+        with span("prefilter"):
+            if not prefilter.may_contain_class(xmi_content):
+                return 0
+    try:
+        root = parse_document(xmi_content, backend)
+        with span("detect"):
+            return len(unique_class_elements(root, backend))
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return 0
+
+def unique_class_elements(root, backend):
+    # An element can match both the xsi:type and the xmi:type query
+    all_elements = backend.find_class_elements(root, 'xsi') + backend.find_class_elements(root, 'xmi')
+    return list({elem: None for elem in all_elements})
+
+
+def getIdOfElem(elem): # TODO maybe check for a more generic approach
+    return elem.get('{http://schema.omg.org/spec/XMI/2.1}id')
+
+XMI_IDREF = f"{{{ns['xmi']}}}idref"
+
+def references(elem, name):
+    """Ids referenced by an attribute (space separated) or by child elements with xmi:idref or an href fragment."""
+    value = elem.attrib.get(name)
+    if value:
+        return value.split()
+    ids = []
+    for child in elem.findall(name):
+        reference = child.get(XMI_IDREF) or (child.get('href') or "").rpartition('#')[2]
+        if reference:
+            ids.append(reference)
+    return ids
+
+def getModifiers(elem):
+    visibility = elem.attrib.get('visibility')
+    if visibility:
+        return [visibility]
+    else:
+        return []
+
+def getName(elem):
+    try:
+        name = elem.attrib['name']
+        name = name.strip().replace(" ", "")
+        return name
+    except Exception as e:
+        return None
+
+def extract_field_details(elem, class_key, backend):
+    fields = {}
+    for field_elem in backend.find_attributes(elem):
+        field_name = getName(field_elem)
+        if(field_name==None):
+            continue
+
+        field_key = getIdOfElem(field_elem)
+        field_type = None  # TODO: Might need to add logic for type extraction if provided in XMI
+        field_hasTypeVariable = False
+        field_modifiers = getModifiers(field_elem)
+
+        fields[field_name] = {
+            "name": field_name,
+            "key": field_key,
+            "type": field_type,
+            "hasTypeVariable": field_hasTypeVariable,
+            "position": None,
+            "modifiers": field_modifiers,
+            "ignore": False,
+            "classOrInterfaceKey": class_key
+        }
+    return fields
+
+def extract_method_parameters(method_elem, method_key, backend):
+    method_parameters = []
+    for param_elem in backend.find_parameters(method_elem):
+        direction = param_elem.attrib.get('direction')
+        signature = param_elem.attrib.get('signature')
+        if(signature):
+            continue
+
+        if(direction!="return"):
+            param_name = getName(param_elem)
+            if(param_name==None):
+                continue
+
+            param_key = getIdOfElem(param_elem)
+            param_type = None  # TODO: Logic for parameter type extraction
+            param_hasTypeVariable = False
+            param_modifiers = getModifiers(param_elem)
+            method_parameters.append({
+                "name": param_name,
+                "key": param_key,
+                "type": param_type,
+                "hasTypeVariable": param_hasTypeVariable,
+                "position": None,
+                "modifiers": param_modifiers,
+                "ignore": False,
+                "methodKey": method_key
+            })
+    return method_parameters
+
+def extract_method_details(elem, class_key, backend):
+    methods = {}
+    for method_elem in backend.find_operations(elem):
+        method_name = getName(method_elem)
+        if(method_name==None):
+            continue
+
+        method_key = getIdOfElem(method_elem)
+        method_type = None  # TODO: Logic for method type extraction if provided in XMI
+        method_hasTypeVariable = False
+        method_modifiers = getModifiers(method_elem)
+
+        method_parameters = extract_method_parameters(method_elem, method_key, backend)
+
+        methods[method_name] = {
+            "name": method_name,
+            "key": method_key,
+            "type": method_type,
+            "hasTypeVariable": method_hasTypeVariable,
+            "position": None,
+            "modifiers": method_modifiers,
+            "overrideAnnotation": False,
+            "returnType": None,
+            "parameters": method_parameters,
+            "classOrInterfaceKey": class_key
+        }
+    return methods
+
+def extract_generalizations(root, backend):
+    """Extract all generalizations from the given XML root."""
+    generalizations = {}
+    for general_elem in backend.find_generalizations(root):
+        specific = general_elem.attrib.get('specific')
+        general = general_elem.attrib.get('general')
+        if specific in generalizations:
+            generalizations[specific].append(general)
+        else:
+            generalizations[specific] = [general]
+    return generalizations
+
+def extract_class_generalizations(elem, class_key, all_generalizations, backend):
+    """Keys of the general classes of a class, from its own generalization elements and those naming it as specific."""
+    generals = list(all_generalizations.get(class_key, []))
+    for general_elem in backend.find_owned_generalizations(elem):
+        generals += references(general_elem, 'general')
+    return list(dict.fromkeys(general for general in generals if general))
+
+def extract_generalization_map(root, backend):
+    """Keys of the general classes of every class of a document, the extract stage does not write them (extends_ stays empty)."""
+    all_generalizations = extract_generalizations(root, backend)
+    return {getIdOfElem(elem): extract_class_generalizations(elem, getIdOfElem(elem), all_generalizations, backend)
+            for elem in unique_class_elements(root, backend)}
+
+def extract_classes(root, backend):
+    """Extracts the class details from a parsed XMI document."""
+    classes = {}
+    all_generalizations = extract_generalizations(root, backend)
+
+    for elem in unique_class_elements(root, backend):
+        class_name = getName(elem)
+        if(class_name==None):
+            continue
+
+        class_key = getIdOfElem(elem)
+
+        class_type = "class"
+        hasTypeVariable = False
+
+        fields = extract_field_details(elem, class_key, backend)
+        methods = extract_method_details(elem, class_key, backend)
+
+        class_extends = all_generalizations.get(class_key, [])
+
+        file_path = class_name.replace("/", "_")
+        if(file_path=="."):
+            file_path = class_key.replace("/", "_")
+
+        classes[class_name] = {
+            # from AstElementTypeContext
+            "name": class_name,
+            "key": class_key,
+            "type": class_type,
+            "hasTypeVariable": hasTypeVariable,
+            "position": None,
+
+            # From ClassOrInterfaceTypeContext
+            "modifiers": getModifiers(elem),
+            "fields": fields,
+            "methods": methods,
+            "file_path": "./"+file_path,
+            "anonymous": False,
+            "auxclass": False,
+            "implements_": [],
+            "extends_": [],
+            "definedInClassOrInterfaceTypeKey": None,
+            "innerDefinedClasses": {},
+            "innerDefinedInterfaces": {}
+        }
+
+    return classes
+
+def extract_class_details(xmi_content, backend=None):
+    """Extracts the class details from the given XMI content."""
+    backend = backend or default_backend
+    try:
+        root = parse_document(xmi_content, backend)
+        with span("extract"):
+            return extract_classes(root, backend)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return {}
@@ -0,0 +1,153 @@
+import os
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# Parser backends for the XMI engine. Both answer the same element queries in document order,
+# the lxml backend evaluates them as precompiled C-level XPath instead of ElementPath in Python.
+# Select one with --xml_backend or the UML_DATASET_XML_BACKEND environment variable ("auto" prefers lxml).
+
+BACKEND_ENVIRONMENT_VARIABLE = "UML_DATASET_XML_BACKEND"
+
+ns = {
+    'xmi': 'http://schema.omg.org/spec/XMI/2.1',
+    'uml': 'http://www.eclipse.org/uml2/5.0.0/UML',
+    'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
+}
+
+CLASS_QUERIES = {
+    'xsi': ".//packagedElement[@xsi:type='uml:Class']",
+    'xmi': ".//packagedElement[@xmi:type='uml:Class']"
+}
+GENERALIZATION_QUERY = ".//generalization"
+ATTRIBUTE_QUERY = ".//ownedAttribute"
+OPERATION_QUERY = ".//ownedOperation"
+PARAMETER_QUERY = ".//ownedParameter"
+ASSOCIATION_QUERIES = {
+    'xsi': ".//packagedElement[@xsi:type='uml:Association']",
+    'xmi': ".//packagedElement[@xmi:type='uml:Association']"
+}
+# Direct children only, the queries above also match the members of nested classes
+OWNED_ATTRIBUTE_QUERY = "ownedAttribute"
+OWNED_OPERATION_QUERY = "ownedOperation"
+OWNED_GENERALIZATION_QUERY = "generalization"
+OWNED_END_QUERY = "ownedEnd"
+
+class ElementTreeBackend:
+    name = "etree"
+
+    def parse(self, xmi_content):
+        return ET.fromstring(xmi_content)
+
+    def find_class_elements(self, root, namespace_prefix):
+        return root.findall(CLASS_QUERIES[namespace_prefix], ns)
+
+    def has_class_element(self, root):
+        return any(root.find(query, ns) is not None for query in CLASS_QUERIES.values())
+
+    def find_generalizations(self, root):
+        return root.findall(GENERALIZATION_QUERY, ns)
+
+    def find_attributes(self, elem):
+        return elem.findall(ATTRIBUTE_QUERY, ns)
+
+    def find_operations(self, elem):
+        return elem.findall(OPERATION_QUERY, ns)
+
+    def find_parameters(self, elem):
+        return elem.findall(PARAMETER_QUERY, ns)
+
+    def find_association_elements(self, root, namespace_prefix):
+        return root.findall(ASSOCIATION_QUERIES[namespace_prefix], ns)
+
+    def find_owned_attributes(self, elem):
+        return elem.findall(OWNED_ATTRIBUTE_QUERY)
+
+    def find_owned_operations(self, elem):
+        return elem.findall(OWNED_OPERATION_QUERY)
+
+    def find_owned_generalizations(self, elem):
+        return elem.findall(OWNED_GENERALIZATION_QUERY)
+
+    def find_owned_ends(self, elem):
+        return elem.findall(OWNED_END_QUERY)
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        self.class_queries = {prefix: lxml_etree.XPath(query, namespaces=ns) for prefix, query in CLASS_QUERIES.items()}
+        self.has_class_query = lxml_etree.XPath(f"boolean({CLASS_QUERIES['xsi']} | {CLASS_QUERIES['xmi']})", namespaces=ns)
+        self.generalization_query = lxml_etree.XPath(GENERALIZATION_QUERY)
+        self.attribute_query = lxml_etree.XPath(ATTRIBUTE_QUERY)
+        self.operation_query = lxml_etree.XPath(OPERATION_QUERY)
+        self.parameter_query = lxml_etree.XPath(PARAMETER_QUERY)
+        self.association_queries = {prefix: lxml_etree.XPath(query, namespaces=ns) for prefix, query in ASSOCIATION_QUERIES.items()}
+        self.owned_attribute_query = lxml_etree.XPath(OWNED_ATTRIBUTE_QUERY)
+        self.owned_operation_query = lxml_etree.XPath(OWNED_OPERATION_QUERY)
+        self.owned_generalization_query = lxml_etree.XPath(OWNED_GENERALIZATION_QUERY)
+        self.owned_end_query = lxml_etree.XPath(OWNED_END_QUERY)
+        # Decoded text has lost its original encoding, so the declaration is overridden with UTF-8
+        self.text_parser = lxml_etree.XMLParser(encoding='utf-8', huge_tree=True, resolve_entities=False)
+        self.bytes_parser = lxml_etree.XMLParser(huge_tree=True, resolve_entities=False)
+
+    def parse(self, xmi_content):
+        if isinstance(xmi_content, str):
+            return lxml_etree.fromstring(xmi_content.encode('utf-8'), self.text_parser)
+        return lxml_etree.fromstring(xmi_content, self.bytes_parser)
+
+    def find_class_elements(self, root, namespace_prefix):
+        return self.class_queries[namespace_prefix](root)
+
+    def has_class_element(self, root):
+        return self.has_class_query(root)
+
+    def find_generalizations(self, root):
+        return self.generalization_query(root)
+
+    def find_attributes(self, elem):
+        return self.attribute_query(elem)
+
+    def find_operations(self, elem):
+        return self.operation_query(elem)
+
+    def find_parameters(self, elem):
+        return self.parameter_query(elem)
+
+    def find_association_elements(self, root, namespace_prefix):
+        return self.association_queries[namespace_prefix](root)
+
+    def find_owned_attributes(self, elem):
+        return self.owned_attribute_query(elem)
+
+    def find_owned_operations(self, elem):
+        return self.owned_operation_query(elem)
+
+    def find_owned_generalizations(self, elem):
+        return self.owned_generalization_query(elem)
+
+    def find_owned_ends(self, elem):
+        return self.owned_end_query(elem)
+
+BACKENDS = {
+    ElementTreeBackend.name: ElementTreeBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+def available_backends():
+    return [name for name in BACKENDS if name != LxmlBackend.name or lxml_etree is not None]
+
+def get_backend(name=None):
+    """Returns a backend instance, name is "auto", "lxml" or "etree" (default: the environment variable or auto)."""
+    name = name or os.environ.get(BACKEND_ENVIRONMENT_VARIABLE, "auto")
+    if name == "auto":
+        name = LxmlBackend.name if lxml_etree is not None else ElementTreeBackend.name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown XML backend '{name}', expected one of: auto, {', '.join(BACKENDS)}")
+    if name == LxmlBackend.name and lxml_etree is None:
+        print("lxml is not installed, falling back to xml.etree.ElementTree")
+        name = ElementTreeBackend.name
+    return BACKENDS[name]()